@@ -0,0 +1,204 @@
+from collections import Counter
+import codecs
+import hashlib
+import tempfile
+
+# Block size for the two-ended palindrome comparison
+PALINDROME_BLOCK = 64 * 1024
+# Longest non-ASCII text StreamingAnalyzer lower-cases whole for the palindrome check
+EXACT_PALINDROME_MAX_LENGTH = 8 * 1024 * 1024
+# Alphabets up to this size are counted with one C-level str.count pass per character
+COUNT_PASS_MAX_ALPHABET = 64
+# Below this length Counter's fixed overhead is cheaper than probing the alphabet
+COUNT_PASS_MIN_LENGTH = 256
+
+
+def character_frequencies(value: str) -> dict:
+    """Map each character to its count, in order of first occurrence.
+
+    Counter walks the string element by element; for the small alphabets of
+    typical text a handful of C-level ``str.count`` scans is several times
+    faster. The alphabet is guessed from a prefix, and the guess is proven
+    complete when the counts add up to the full length.
+    """
+    if len(value) >= COUNT_PASS_MIN_LENGTH:
+        alphabet = set(value[:4096])
+        if len(alphabet) <= COUNT_PASS_MAX_ALPHABET:
+            freq = {ch: value.count(ch) for ch in sorted(alphabet, key=value.index)}
+            if sum(freq.values()) == len(value):
+                return freq
+    return dict(Counter(value))
+
+
+def is_palindrome(value: str) -> bool:
+    """Case-insensitive palindrome check without copying the whole string.
+
+    ASCII input is compared block by block from both ends, so memory stays
+    at two blocks and non-palindromes usually exit on the first block.
+    Lower-casing non-ASCII text can change its length or depend on context
+    (e.g. final sigma), so it keeps the exact full-string comparison.
+    """
+    if not value.isascii():
+        return value.lower() == value[::-1].lower()
+
+    n = len(value)
+    half = n // 2
+    for start in range(0, half, PALINDROME_BLOCK):
+        stop = min(start + PALINDROME_BLOCK, half)
+        head = value[start:stop].lower()
+        tail = value[n - stop:n - start][::-1].lower()
+        if head != tail:
+            return False
+    return True
+
+
+def compute_properties(value: str, sha256_hash: str = None) -> dict:
+    """Compute all required string properties.
+
+    Pass ``sha256_hash`` when the caller already hashed the value to skip
+    hashing it a second time.
+    """
+    if sha256_hash is None:
+        sha256_hash = hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+    # Unique characters fall out of the frequency map's size
+    freq = character_frequencies(value)
+
+    return {
+        "length": len(value),
+        "is_palindrome": is_palindrome(value),
+        "unique_characters": len(freq),
+        "word_count": len(value.split()),
+        "sha256_hash": sha256_hash,  # This will be the same as the id
+        "character_frequency_map": freq,
+    }
+
+
+class PalindromeCheckTooLarge(ValueError):
+    """Non-ASCII text too long for StreamingAnalyzer's exact palindrome check."""
+
+
+class StreamingAnalyzer:
+    """Compute the same properties as ``compute_properties`` over chunks.
+
+    Raw UTF-8 bytes are fed in as they arrive. Everything except the
+    palindrome check is accumulated incrementally; decoded text is spooled
+    as fixed-width UTF-32 so ``finish`` can compare blocks from both ends of
+    the file. Memory stays at a few chunks whatever the input size.
+
+    Like ``is_palindrome``, non-ASCII text is lower-cased whole instead
+    (up to ``exact_max_length`` characters; longer text raises
+    PalindromeCheckTooLarge), since its case mapping can depend on context.
+    """
+
+    # Bytes per code point in the spool file
+    WIDTH = 4
+
+    def __init__(self, spool_max_size=8 * 1024 * 1024, exact_max_length=EXACT_PALINDROME_MAX_LENGTH):
+        self.spool = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        self.exact_max_length = exact_max_length
+        self._sha256 = hashlib.sha256()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._freq = {}
+        self._length = 0
+        self._word_count = 0
+        # Whether the text seen so far ends inside a word
+        self._in_word = False
+        self._ascii = True
+
+    def feed(self, data: bytes):
+        """Consume the next chunk of UTF-8 encoded bytes.
+
+        Raises UnicodeDecodeError if the input is not valid UTF-8.
+        """
+        self._sha256.update(data)
+        self._consume(self._decoder.decode(data))
+
+    def _consume(self, text: str):
+        if not text:
+            return
+
+        self.spool.write(text.encode("utf-32-le"))
+        self._length += len(text)
+        self._ascii = self._ascii and text.isascii()
+
+        for ch, count in character_frequencies(text).items():
+            self._freq[ch] = self._freq.get(ch, 0) + count
+
+        words = len(text.split())
+        # A word split across the chunk boundary was counted on both sides
+        if self._in_word and not text[0].isspace():
+            words -= 1
+        self._word_count += words
+        self._in_word = not text[-1].isspace()
+
+    def finish(self) -> dict:
+        """Flush the decoder and return the computed properties.
+
+        Raises UnicodeDecodeError for truncated UTF-8 and
+        PalindromeCheckTooLarge for overlong non-ASCII text.
+        """
+        self._consume(self._decoder.decode(b"", final=True))
+        return {
+            "length": self._length,
+            "is_palindrome": self._is_palindrome(),
+            "unique_characters": len(self._freq),
+            "word_count": self._word_count,
+            "sha256_hash": self._sha256.hexdigest(),
+            "character_frequency_map": self._freq,
+        }
+
+    def _read(self, start: int, stop: int) -> str:
+        self.spool.seek(start * self.WIDTH)
+        return self.spool.read((stop - start) * self.WIDTH).decode("utf-32-le")
+
+    def _is_palindrome(self) -> bool:
+        if not self._ascii:
+            # Lower-casing blocks independently would miss context-dependent
+            # mappings (final sigma) and ones that change the length
+            if self._length > self.exact_max_length:
+                raise PalindromeCheckTooLarge(
+                    f"Non-ASCII text over {self.exact_max_length} characters can't be checked "
+                    "for palindromes exactly."
+                )
+            return is_palindrome(self.read_value())
+
+        n = self._length
+        half = n // 2
+        for start in range(0, half, PALINDROME_BLOCK):
+            stop = min(start + PALINDROME_BLOCK, half)
+            head = self._read(start, stop).lower()
+            tail = self._read(n - stop, n - start)[::-1].lower()
+            if head != tail:
+                return False
+        return True
+
+    def read_value(self) -> str:
+        """Decode the full spooled text (one copy, needed to store the row)."""
+        self.spool.seek(0)
+        return self.spool.read().decode("utf-32-le")
+
+    def close(self):
+        self.spool.close()
+
+
+def compute_shared_properties(name: str, size: int, sha256_hash: str = None,
+                              analyze=compute_properties) -> dict:
+    """Process-pool entry point: analyze UTF-8 bytes held in shared memory.
+
+    Only the segment name crosses the process boundary, so the payload is
+    never pickled; the hash is taken straight from the shared buffer.
+    ``analyze`` (a module-level function) replaces ``compute_properties``.
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = shm.buf[:size]
+        if sha256_hash is None:
+            sha256_hash = hashlib.sha256(data).hexdigest()
+        value = str(data, "utf-8")
+        data.release()
+    finally:
+        shm.close()
+    return analyze(value, sha256_hash)
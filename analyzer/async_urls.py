@@ -0,0 +1,17 @@
+from django.urls import path
+from .async_views import AsyncStringsView, AsyncStringDetailView, AsyncNaturalLanguageFilterView
+from .urls import urlpatterns as sync_urlpatterns
+
+# Same routes as analyzer.urls, with the hot endpoints swapped for async views.
+# The remaining (sync) views still work under ASGI, run in a thread by Django.
+ASYNC_VIEWS = {
+    'strings': AsyncStringsView.as_view(),
+    'string-detail': AsyncStringDetailView.as_view(),
+    'natural-language-filter': AsyncNaturalLanguageFilterView.as_view(),
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
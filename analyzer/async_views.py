@@ -0,0 +1,267 @@
+"""Async variants of the core views, served through string_analyzer/asgi.py.
+
+They mirror the DRF views in analyzer.views (same parameters, responses and
+status codes) but use Django's async ORM, so a slow query or a large body
+doesn't tie up a worker. DRF's APIView has no async support, hence plain
+Django views returning JSON rendered like DRF's compact renderer.
+"""
+import asyncio
+import urllib.parse
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.urls import reverse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from .cache import aget_detail, aget_query_result, aquery_cache_key, aset_detail, aset_query_result
+from .ingest import WRITE_COALESCING, get_write_coalescer
+from .jobs import enqueue_job
+from .metrics import stage
+from .models import VERIFY_HASH_COLLISIONS, HashCollision, StoredString
+from .offload import acompute_properties, ahash_value
+from .pagination import apaginate, astream_json, astream_ndjson
+from .parsers import loads
+from .projection import Projection
+from .query import (
+    ConflictingFilters, UnsupportedDisjunction, UnsupportedNegation, apply_filters, filters_from_params,
+    parse_query,
+)
+from .renderers import dumps
+from .serializers import StoredStringSerializer
+
+
+# Bodies the DRF views accept through DEFAULT_PARSER_CLASSES besides JSON
+FORM_MEDIA_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+
+class UnsupportedMediaType(ValueError):
+    """The request body has a content type no parser accepts."""
+
+
+def json_response(data, status=200):
+    # Same bytes as the DRF views' renderer
+    with stage("render"):
+        content = dumps(data)
+    return HttpResponse(content, status=status, content_type="application/json")
+
+
+def parse_data(request):
+    """The request body parsed like ``request.data`` in the DRF views.
+
+    JSON, form and multipart bodies are accepted; an empty body is empty
+    data. Raises ValueError for malformed JSON and UnsupportedMediaType for
+    other content types.
+    """
+    if request.content_type in FORM_MEDIA_TYPES:
+        return request.POST
+    if not request.body:
+        return {}
+    if request.content_type != "application/json":
+        content_type = request.META.get("CONTENT_TYPE", "")
+        raise UnsupportedMediaType(f'Unsupported media type "{content_type}" in request.')
+    return loads(request.body)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncStringsView(View):
+    async def post(self, request):
+        """POST /strings - Create and analyze string"""
+        try:
+            data = parse_data(request)
+        except UnsupportedMediaType as exc:
+            return json_response({"detail": str(exc)}, status=415)
+        except ValueError as exc:
+            return json_response({"detail": f"JSON parse error - {exc}"}, status=400)
+
+        value = data.get("value") if isinstance(data, dict) else None
+
+        if value is None:
+            return json_response({"detail": "Missing 'value' field."}, status=400)
+
+        if not isinstance(value, str):
+            return json_response({"detail": "'value' must be a string."}, status=422)
+
+        if request.GET.get("async", "").lower() in ["true", "1", "yes", "on"]:
+            job = await sync_to_async(enqueue_job)([value])
+            return json_response({
+                "job_id": str(job.id),
+                "status": job.status,
+                "status_url": reverse("job-detail", kwargs={"job_id": job.id})
+            }, status=202)
+
+        try:
+            # Duplicates are detected by the primary-key INSERT itself
+            stored = StoredString(value=value)
+            with stage("analyze"):
+                stored.set_properties(await acompute_properties(value))
+            if WRITE_COALESCING:
+                # Share a transaction with other concurrent inserts
+                if await asyncio.wrap_future(get_write_coalescer().submit(stored)) == "conflict":
+                    if VERIFY_HASH_COLLISIONS:
+                        await sync_to_async(stored.check_collision)()
+                    raise IntegrityError(stored.id)
+            else:
+                await stored.asave()
+        except IntegrityError:
+            return json_response({"detail": "String already exists."}, status=409)
+        except HashCollision:
+            return json_response(
+                {"detail": "A different string is already stored under this SHA-256 hash."}, status=500
+            )
+
+        with stage("serialize"):
+            data = StoredStringSerializer(stored).data
+        return json_response(data, status=201)
+
+    async def get(self, request):
+        """GET /strings - Get all strings with filtering"""
+        params = request.GET
+        filters, applied_filters = filters_from_params(params)
+        queryset = apply_filters(StoredString.objects.all(), filters)
+
+        try:
+            projection = Projection.from_params(params)
+        except ValueError as exc:
+            return json_response({"detail": str(exc)}, status=400)
+
+        stream = params.get("stream")
+        if stream is not None:
+            if stream == "ndjson":
+                return StreamingHttpResponse(
+                    astream_ndjson(queryset, projection), content_type="application/x-ndjson"
+                )
+            if stream == "json":
+                return StreamingHttpResponse(
+                    astream_json(queryset, applied_filters, projection), content_type="application/json"
+                )
+            return json_response({"detail": "'stream' must be 'ndjson' or 'json'."}, status=400)
+
+        count_mode = params.get("count", "exact")
+        if count_mode not in ("exact", "none"):
+            return json_response({"detail": "'count' must be 'exact' or 'none'."}, status=400)
+
+        paginated = "limit" in params or "cursor" in params
+        cache_key = await aquery_cache_key(
+            "strings", filters, count=count_mode, paginated=paginated,
+            limit=params.get("limit"), cursor=params.get("cursor"), **projection.cache_options(),
+        )
+        result = await aget_query_result(cache_key)
+
+        if result is None:
+            rows = projection.apply(queryset)
+            if paginated:
+                try:
+                    rows, next_cursor = await apaginate(
+                        rows, params.get("limit"), params.get("cursor")
+                    )
+                except ValueError as exc:
+                    return json_response({"detail": str(exc)}, status=400)
+                with stage("serialize"):
+                    data = await projection.arender_all(rows)
+                result = {
+                    "data": data,
+                    "count": await queryset.acount() if count_mode == "exact" else None,
+                    "next_cursor": next_cursor,
+                }
+            else:
+                data = await projection.arender_all([row async for row in rows])
+                result = {
+                    "data": data,
+                    "count": len(data) if count_mode == "exact" else None,
+                }
+            await aset_query_result(cache_key, result)
+
+        return json_response({**result, "filters_applied": applied_filters})
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncStringDetailView(View):
+    async def get(self, request, string_value):
+        """GET /strings/{string_value} - Get specific string"""
+        try:
+            projection = Projection.from_params(request.GET)
+        except ValueError as exc:
+            return json_response({"detail": str(exc)}, status=400)
+
+        with stage("hash"):
+            sha256_hash = await ahash_value(urllib.parse.unquote(string_value))
+        # The cache holds the default response, without extended properties
+        data = None if projection.extended else await aget_detail(sha256_hash)
+        if data is None:
+            if not projection.is_full:
+                row = await projection.apply(StoredString.objects.filter(pk=sha256_hash)).afirst()
+                if row is None:
+                    return json_response({"detail": "String not found."}, status=404)
+                with stage("serialize"):
+                    data = (await projection.arender_all([row]))[0]
+                return json_response(data)
+            try:
+                obj = await StoredString.objects.aget(pk=sha256_hash)
+            except StoredString.DoesNotExist:
+                return json_response({"detail": "String not found."}, status=404)
+            with stage("serialize"):
+                data = StoredStringSerializer(obj).data
+            await aset_detail(sha256_hash, data)
+        return json_response(projection.project(data))
+
+    async def delete(self, request, string_value):
+        """DELETE /strings/{string_value} - Delete string"""
+        with stage("hash"):
+            sha256_hash = await ahash_value(urllib.parse.unquote(string_value))
+        try:
+            obj = await StoredString.objects.aget(pk=sha256_hash)
+        except StoredString.DoesNotExist:
+            return json_response({"detail": "String not found."}, status=404)
+        await obj.adelete()
+        return HttpResponse(status=204)
+
+
+class AsyncNaturalLanguageFilterView(View):
+    async def get(self, request):
+        """GET /strings/filter-by-natural-language - Natural language filtering"""
+        query = request.GET.get("query", "").lower().strip()
+
+        if not query:
+            return json_response({"error": "Missing 'query' parameter"}, status=400)
+
+        try:
+            projection = Projection.from_params(request.GET)
+        except ValueError as exc:
+            return json_response({"error": str(exc)}, status=400)
+
+        try:
+            filters = parse_query(query)
+        except ConflictingFilters as exc:
+            return json_response({
+                "error": "Conflicting filters in query",
+                "detail": str(exc)
+            }, status=422)
+        except (UnsupportedNegation, UnsupportedDisjunction) as exc:
+            return json_response({
+                "error": "Unable to parse natural language query",
+                "detail": str(exc)
+            }, status=400)
+
+        if not filters:
+            return json_response({"error": "Unable to parse natural language query"}, status=400)
+
+        cache_key = await aquery_cache_key(
+            "strings", filters, count="exact", paginated=False, **projection.cache_options()
+        )
+        result = await aget_query_result(cache_key)
+        if result is None:
+            rows = projection.apply(apply_filters(StoredString.objects.all(), filters))
+            data = await projection.arender_all([row async for row in rows])
+            result = {"data": data, "count": len(data)}
+            await aset_query_result(cache_key, result)
+
+        return json_response({
+            "data": result["data"],
+            "count": result["count"],
+            "interpreted_query": {
+                "original": query,
+                "parsed_filters": filters
+            }
+        })
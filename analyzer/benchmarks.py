@@ -0,0 +1,274 @@
+"""Synthetic data and the benchmark suite behind ``manage.py benchmark``.
+
+Scenarios run in-process through the Django test client, so they cover
+the full request path (middleware, view, query, rendering) without
+network noise. Read scenarios run against whatever rows the database
+holds; ``ensure_rows`` tops it up with synthetic strings to each scale
+being measured. Results are plain dicts, saved as JSON and compared
+against a stored baseline with ``compare``.
+"""
+from datetime import datetime, timezone
+import json
+import platform
+import random
+import statistics
+import time
+from urllib.parse import quote
+
+import django
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from .analysis import compute_properties
+from .cache import bump_data_version, invalidate_detail
+from .fields import decompress_value
+from .ingest import ingest_values
+from .models import StoredString
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog level kayak racecar request timeout "
+    "string analyzer value index query cache window stream batch token rotor civic "
+    "radar refer noon madam zebra jazz quiz"
+).split()
+
+# Properties of the generated corpus, used by the default read scenarios
+GENERATE_DEFAULTS = {"min_words": 1, "max_words": 20, "palindrome_ratio": 0.1}
+
+# compute_properties input sizes, in characters
+ANALYSIS_SIZES = (100, 10 * 1024, 1024 ** 2)
+
+# (name, GET path) measured at every scale; one per GET /strings filter, plus text search
+LIST_QUERIES = (
+    ("list", "/strings?limit=100"),
+    ("list is_palindrome", "/strings?is_palindrome=true&limit=100"),
+    ("list min_length", "/strings?min_length=80&limit=100"),
+    ("list max_length", "/strings?max_length=20&limit=100"),
+    ("list word_count", "/strings?word_count=3&limit=100"),
+    ("list min_word_count", "/strings?min_word_count=15&limit=100"),
+    ("list max_word_count", "/strings?max_word_count=2&limit=100"),
+    ("list contains_character", "/strings?contains_character=z&limit=100"),
+    ("list excludes_character", "/strings?excludes_character=e&limit=100"),
+    ("list combined", "/strings?is_palindrome=false&min_word_count=5&contains_character=q&limit=100"),
+    ("nl filter", "/strings/filter-by-natural-language?query=single%20word%20palindromic%20strings"),
+    ("nl filter letters", "/strings/filter-by-natural-language?query=strings%20containing%20the%20letter%20z"),
+    ("search substring", "/strings/search?q=brown%20fox&limit=100"),
+    ("search prefix", "/strings/search?q=the%20quick&match=prefix&limit=100"),
+    ("search short", "/strings/search?q=zz&limit=100"),
+)
+
+
+def synthetic_values(count, seed=0, start=0, min_words=1, max_words=20, palindrome_ratio=0.1):
+    """``count`` distinct word-like strings, reproducible from ``seed`` and ``start``.
+
+    Each value carries its index, so ranges starting at different
+    ``start`` values never collide. About ``palindrome_ratio`` of them are
+    palindromes.
+    """
+    rng = random.Random(f"{seed}:{start}")
+    values = []
+    for index in range(start, start + count):
+        if rng.random() < palindrome_ratio:
+            half = f"{rng.choice(WORDS)}{index}"
+            values.append(half + half[-2::-1])
+        else:
+            words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words) - 1)]
+            words.insert(rng.randint(0, len(words)), str(index))
+            values.append(" ".join(words))
+    return values
+
+
+def generate(count, seed=0, batch_size=5000, progress=None, **options):
+    """Insert ``count`` new synthetic strings, returning how many were created.
+
+    Indexes continue after the current row count, so repeated calls keep
+    adding fresh values.
+    """
+    created = 0
+    start = StoredString.objects.count()
+    while created < count:
+        size = min(batch_size, count - created)
+        values = synthetic_values(size, seed=seed, start=start, **options)
+        results = ingest_values(values)
+        created += sum(1 for result in results if result["status"] == "created")
+        start += size
+        if progress is not None:
+            progress(created)
+    return created
+
+
+def ensure_rows(total, seed=0, progress=None) -> int:
+    """Top the database up to at least ``total`` rows; returns rows added."""
+    missing = total - StoredString.objects.count()
+    return generate(missing, seed=seed, progress=progress, **GENERATE_DEFAULTS) if missing > 0 else 0
+
+
+def summarize(samples) -> dict:
+    """Timing summary, in milliseconds, of per-operation ``samples`` in seconds."""
+    samples = sorted(samples)
+    index = max(0, round(0.95 * len(samples)) - 1)
+    return {
+        "iterations": len(samples),
+        "min_ms": round(samples[0] * 1000, 4),
+        "median_ms": round(statistics.median(samples) * 1000, 4),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p95_ms": round(samples[index] * 1000, 4),
+    }
+
+
+def measure(operation, iterations, before=None) -> dict:
+    """Time ``operation`` ``iterations`` times after one warm-up call.
+
+    ``before`` runs untimed ahead of each call (e.g. to drop caches).
+    """
+    if before is not None:
+        before()
+    operation()
+    samples = []
+    for _ in range(iterations):
+        if before is not None:
+            before()
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+class Suite:
+    """The service benchmarks; call ``run()`` for the results document."""
+
+    def __init__(self, scales=(10_000,), iterations=20, warm_cache=False, seed=0,
+                 include=None, log=None):
+        self.scales = scales
+        self.iterations = iterations
+        self.warm_cache = warm_cache
+        self.seed = seed
+        self.include = include
+        self.log = log or (lambda message: None)
+        self.client = Client()
+        self.results = {}
+
+    def run(self) -> dict:
+        self.benchmark_analysis()
+        self.benchmark_writes()
+        for scale in self.scales:
+            added = ensure_rows(scale, seed=self.seed, progress=lambda n: self.log(f"  generated {n} rows"))
+            rows = StoredString.objects.count()
+            self.log(f"{rows} rows ({added} generated)")
+            if rows > scale:
+                # Rows are only ever added; use a fresh database per scale for comparable runs
+                self.log(f"note: the table holds more than {scale} rows")
+            self.benchmark_reads(scale, rows)
+        return {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "environment": environment(),
+            "options": {
+                "scales": list(self.scales), "iterations": self.iterations,
+                "warm_cache": self.warm_cache, "seed": self.seed,
+            },
+            "results": self.results,
+        }
+
+    def record(self, name, operation, iterations=None, before=None, **extra):
+        if self.include and not any(part in name for part in self.include):
+            return
+        result = measure(operation, iterations or self.iterations, before)
+        self.results[name] = {**result, **extra}
+        self.log(f"{name:<44} median {result['median_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms")
+
+    def _check(self, response, status=200):
+        if response.status_code != status:
+            raise RuntimeError(f"{response.request['PATH_INFO']} returned {response.status_code}")
+
+    def _drop_caches(self):
+        if not self.warm_cache:
+            bump_data_version()
+
+    def benchmark_analysis(self):
+        for size in ANALYSIS_SIZES:
+            value = ("Never odd or even, a man a plan a canal " * (size // 40 + 1))[:size]
+            # Keep large inputs from dominating the run time
+            iterations = max(3, min(self.iterations, (10 * 1024 ** 2) // (size * 10)))
+            self.record(f"compute_properties {size} chars", lambda: compute_properties(value), iterations)
+
+    def benchmark_writes(self):
+        run_id = time.time_ns()
+        counter = iter(range(10 ** 9))
+        try:
+            def post_single():
+                value = f"benchmark-{run_id}-{next(counter)} the quick brown fox"
+                self._check(self.client.post(
+                    "/strings", {"value": value}, content_type="application/json"
+                ), 201)
+            self.record("POST /strings", post_single)
+
+            def post_bulk():
+                batch = next(counter)
+                items = [{"value": f"benchmark-{run_id}-{batch}-{i} lazy dog"} for i in range(500)]
+                self._check(self.client.post("/strings/bulk", items, content_type="application/json"))
+            self.record("POST /strings/bulk (500 items)", post_bulk, max(3, self.iterations // 4))
+        finally:
+            StoredString.objects.filter(value__startswith=f"benchmark-{run_id}-").delete()
+
+    def benchmark_reads(self, scale, rows):
+        for name, path in LIST_QUERIES:
+            self.record(
+                f"{name} @{scale}", lambda: self._check(self.client.get(path)),
+                before=self._drop_caches, rows=rows,
+            )
+
+        # Detail lookups cycle through rows spread over the table
+        step = max(1, rows // self.iterations)
+        ordered = StoredString.objects.order_by("pk").values_list("pk", "value")
+        sample = [row for offset in range(0, rows, step) for row in ordered[offset:offset + 1]]
+        if not sample:
+            return
+        lookups = iter(sample * (self.iterations // len(sample) + 2))
+
+        def detail():
+            pk, value = next(lookups)
+            if not self.warm_cache:
+                invalidate_detail(pk)
+            self._check(self.client.get(f"/strings/{quote(decompress_value(value), safe='')}"))
+        self.record(f"detail @{scale}", detail, rows=rows)
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "database": connection.vendor,
+        "value_compression": getattr(settings, "ANALYZER_VALUE_COMPRESSION", None),
+    }
+
+
+def compare(results, baseline, threshold=0.2, metric="median_ms", min_delta_ms=0.05):
+    """Scenarios in both documents with their change in ``metric``.
+
+    Returns ``(rows, regressions)``: rows are ``(name, baseline, current,
+    ratio)``; a regression is slower than the baseline by more than
+    ``threshold`` (a fraction) and by at least ``min_delta_ms``. Read
+    scenarios measured over different row counts are left out.
+    """
+    rows, regressions = [], []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None or previous.get("rows") != current.get("rows"):
+            continue
+        before, after = previous[metric], current[metric]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio))
+        if ratio > 1 + threshold and after - before >= min_delta_ms:
+            regressions.append(name)
+    return rows, regressions
+
+
+def load(path) -> dict:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save(document, path):
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(document, handle, indent=2)
+        handle.write("\n")
@@ -0,0 +1,221 @@
+import hashlib
+import json
+import secrets
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.memcached import PyLibMCCache, PyMemcacheCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import transaction
+
+# Cache alias holding serialized detail responses, keyed by SHA-256 id
+DETAIL_CACHE_ALIAS = getattr(settings, "ANALYZER_DETAIL_CACHE_ALIAS", "default")
+# Cache alias holding filtered list results, keyed by data version and filters
+QUERY_CACHE_ALIAS = getattr(settings, "ANALYZER_QUERY_CACHE_ALIAS", "default")
+# Larger result sets are served uncached rather than stored as one huge entry
+QUERY_CACHE_MAX_ROWS = getattr(settings, "ANALYZER_QUERY_CACHE_MAX_ROWS", 1000)
+
+# Cached responses are invalidated through the cache itself, so every worker
+# has to share it. "auto" caches only with such a backend (FileBasedCache is
+# shared by the workers of one host); True also trusts a per-process cache
+# (LocMemCache), which serves stale responses as soon as there is more than
+# one worker.
+RESPONSE_CACHE = getattr(settings, "ANALYZER_RESPONSE_CACHE", "auto")
+SHARED_BACKENDS = (RedisCache, PyMemcacheCache, PyLibMCCache, FileBasedCache)
+
+DATA_VERSION_KEY = "analyzer:data-version"
+
+_stats_lock = threading.Lock()
+_stats = {
+    "hits": 0, "misses": 0, "invalidations": 0,
+    "query_hits": 0, "query_misses": 0, "data_version_bumps": 0,
+}
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+@lru_cache(maxsize=None)
+def _shared_backends() -> bool:
+    return all(
+        isinstance(caches[alias], SHARED_BACKENDS)
+        for alias in (DETAIL_CACHE_ALIAS, QUERY_CACHE_ALIAS)
+    )
+
+
+def enabled() -> bool:
+    """True if detail and query responses are cached (ANALYZER_RESPONSE_CACHE)."""
+    if RESPONSE_CACHE == "auto":
+        return _shared_backends()
+    return bool(RESPONSE_CACHE)
+
+
+def detail_key(pk: str) -> str:
+    return f"analyzer:detail:{pk}"
+
+
+def get_detail(pk: str):
+    """Return the cached serialized string for ``pk``, or None on a miss."""
+    if not enabled():
+        return None
+    data = caches[DETAIL_CACHE_ALIAS].get(detail_key(pk))
+    _count("hits" if data is not None else "misses")
+    return data
+
+
+def set_detail(pk: str, data: dict):
+    if not enabled():
+        return
+    caches[DETAIL_CACHE_ALIAS].set(detail_key(pk), dict(data))
+
+
+async def aget_detail(pk: str):
+    """Async ``get_detail``, for the views in analyzer.async_views."""
+    if not enabled():
+        return None
+    data = await caches[DETAIL_CACHE_ALIAS].aget(detail_key(pk))
+    _count("hits" if data is not None else "misses")
+    return data
+
+
+async def aset_detail(pk: str, data: dict):
+    if not enabled():
+        return
+    await caches[DETAIL_CACHE_ALIAS].aset(detail_key(pk), dict(data))
+
+
+def invalidate_detail(*pks):
+    """Drop cached responses for the given ids (on create and delete)."""
+    if not pks:
+        return
+    caches[DETAIL_CACHE_ALIAS].delete_many([detail_key(pk) for pk in pks])
+    _count("invalidations", len(pks))
+
+
+def new_data_version() -> int:
+    """A data version no worker has used before: the clock plus random low digits."""
+    return time.time_ns() * 1000 + secrets.randbelow(1000)
+
+
+def data_version() -> int:
+    """Current global data version; every StoredString write moves it on."""
+    cache = caches[QUERY_CACHE_ALIAS]
+    version = cache.get(DATA_VERSION_KEY)
+    if version is None:
+        # A lost or evicted version is replaced, never reused
+        cache.add(DATA_VERSION_KEY, new_data_version(), timeout=None)
+        version = cache.get(DATA_VERSION_KEY)
+    return version
+
+
+async def adata_version() -> int:
+    cache = caches[QUERY_CACHE_ALIAS]
+    version = await cache.aget(DATA_VERSION_KEY)
+    if version is None:
+        await cache.aadd(DATA_VERSION_KEY, new_data_version(), timeout=None)
+        version = await cache.aget(DATA_VERSION_KEY)
+    return version
+
+
+def bump_data_version():
+    """Move the data version on by overwriting it with a fresh one.
+
+    Backends without an atomic increment (FileBasedCache) could lose one of
+    two concurrent increments and leave the version where a reader already
+    saw it. Overwriting needs no read: whichever bump lands last, the version
+    is new, and any result cached under an older one is orphaned.
+    """
+    caches[QUERY_CACHE_ALIAS].set(DATA_VERSION_KEY, new_data_version(), timeout=None)
+    _count("data_version_bumps")
+
+
+def _query_digest(scope: str, filters: dict, options: dict) -> str:
+    canonical = {
+        key: sorted(val) if isinstance(val, (list, tuple)) else val
+        for key, val in filters.items()
+    }
+    payload = json.dumps([scope, canonical, options], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def query_cache_key(scope: str, filters: dict, **options):
+    """Key for a filtered query at the current data version (None when not caching).
+
+    Filters are canonicalized, so parameter order doesn't matter. The version
+    is read once here; a result computed while a write lands is stored under
+    the old version and never served afterwards.
+    """
+    if not enabled():
+        return None
+    return f"analyzer:query:{data_version()}:{_query_digest(scope, filters, options)}"
+
+
+def get_query_result(key):
+    if key is None:
+        return None
+    data = caches[QUERY_CACHE_ALIAS].get(key)
+    _count("query_hits" if data is not None else "query_misses")
+    return data
+
+
+def set_query_result(key, result: dict):
+    if key is None or len(result.get("data", ())) > QUERY_CACHE_MAX_ROWS:
+        return
+    caches[QUERY_CACHE_ALIAS].set(key, result)
+
+
+async def aquery_cache_key(scope: str, filters: dict, **options):
+    """Async ``query_cache_key``."""
+    if not enabled():
+        return None
+    return f"analyzer:query:{await adata_version()}:{_query_digest(scope, filters, options)}"
+
+
+async def aget_query_result(key):
+    if key is None:
+        return None
+    data = await caches[QUERY_CACHE_ALIAS].aget(key)
+    _count("query_hits" if data is not None else "query_misses")
+    return data
+
+
+async def aset_query_result(key, result: dict):
+    if key is None or len(result.get("data", ())) > QUERY_CACHE_MAX_ROWS:
+        return
+    await caches[QUERY_CACHE_ALIAS].aset(key, result)
+
+
+def invalidate_strings(*pks):
+    """Invalidate cached reads after StoredString rows were written or deleted.
+
+    Detail entries are dropped by id; list results are orphaned wholesale by
+    moving the data version on, so they can never be served stale.
+
+    Runs once the surrounding transaction commits (right away in autocommit):
+    invalidating earlier would let a concurrent read re-cache the rows the
+    transaction is still replacing, and a rollback has nothing to invalidate.
+    """
+    def invalidate():
+        invalidate_detail(*pks)
+        bump_data_version()
+
+    if enabled():
+        transaction.on_commit(invalidate)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["enabled"] = enabled()
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else None
+    query_lookups = stats["query_hits"] + stats["query_misses"]
+    stats["query_hit_ratio"] = stats["query_hits"] / query_lookups if query_lookups else None
+    return stats
@@ -0,0 +1,35 @@
+"""Per-connection SQLite tuning.
+
+Every new SQLite connection gets the PRAGMAs from settings.SQLITE_PRAGMAS:
+WAL so readers don't block the writer, synchronous=NORMAL (safe with WAL,
+one fsync per checkpoint instead of per commit), a larger page cache, mmap
+reads and a busy timeout so writers queue instead of failing with
+"database is locked".
+"""
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# Applied in this order; journal_mode first since it changes how the rest behaves
+PRAGMA_ORDER = ["journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store"]
+
+
+def sqlite_pragmas() -> dict:
+    return getattr(settings, "SQLITE_PRAGMAS", {})
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    pragmas = sqlite_pragmas()
+    names = [name for name in PRAGMA_ORDER if name in pragmas]
+    names += [name for name in pragmas if name not in PRAGMA_ORDER]
+    with connection.cursor() as cursor:
+        for name in names:
+            value = pragmas[name]
+            if value is None:
+                continue
+            if not name.isidentifier() or not str(value).lstrip("-").isalnum():
+                raise ValueError(f"Invalid SQLite pragma {name}={value!r}")
+            cursor.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,150 @@
+"""Named analyzers for extended string properties.
+
+Beyond the core properties from ``compute_properties``, each registered
+analyzer computes one named property from the value (and the core
+properties, for those derived from the frequency map). Cheap analyzers run
+at save time; the rest run the first time a client asks for them with
+``properties=...`` and are memoized into ``StoredString.properties``.
+Extended properties are only returned when requested.
+"""
+from collections import Counter
+import math
+import unicodedata
+
+from django.conf import settings
+from .analysis import character_frequencies
+
+CORE_PROPERTIES = (
+    "length", "is_palindrome", "unique_characters", "word_count", "sha256_hash",
+    "character_frequency_map",
+)
+_CORE = frozenset(CORE_PROPERTIES)
+
+# Names to compute at save time; None keeps each analyzer's own default
+EAGER_PROPERTIES = getattr(settings, "ANALYZER_EAGER_PROPERTIES", None)
+
+
+class Analyzer:
+    def __init__(self, name, function, eager):
+        self.name = name
+        self.function = function
+        self._eager = eager
+
+    @property
+    def eager(self) -> bool:
+        return self._eager if EAGER_PROPERTIES is None else self.name in EAGER_PROPERTIES
+
+
+ANALYZERS = {}
+
+
+def register(name, eager=False):
+    """Register ``function(value, properties)`` as the analyzer for ``name``.
+
+    ``properties`` holds the core properties; mark an analyzer ``eager``
+    only if it is cheap enough to run on every insert.
+    """
+    def decorator(function):
+        ANALYZERS[name] = Analyzer(name, function, eager)
+        return function
+    return decorator
+
+
+def compute_extended(value: str, properties: dict, names) -> dict:
+    """Run the analyzers for ``names`` over ``value``."""
+    return {name: ANALYZERS[name].function(value, properties) for name in names}
+
+
+def eager_properties(value: str, properties: dict) -> dict:
+    """Extended properties to store along with the core ones at save time."""
+    return compute_extended(value, properties, [a.name for a in ANALYZERS.values() if a.eager])
+
+
+def core_properties(properties: dict) -> dict:
+    """``properties`` without memoized extended properties (the default response)."""
+    if properties is None or len(properties) <= len(CORE_PROPERTIES):
+        return properties
+    return {name: item for name, item in properties.items() if name in _CORE}
+
+
+def _frequencies(value, properties) -> dict:
+    frequencies = properties.get("character_frequency_map")
+    return frequencies if frequencies is not None else character_frequencies(value)
+
+
+@register("line_count", eager=True)
+def line_count(value, properties):
+    # Lines as split on "\n"; a trailing newline does not start another line
+    if not value:
+        return 0
+    return value.count("\n") + (0 if value.endswith("\n") else 1)
+
+
+@register("entropy", eager=True)
+def entropy(value, properties):
+    """Shannon entropy in bits per character."""
+    length = properties.get("length", len(value))
+    if not length:
+        return 0.0
+    return -sum(
+        count / length * math.log2(count / length)
+        for count in _frequencies(value, properties).values()
+    ) + 0.0  # no "-0.0" for single-character strings
+
+
+@register("character_categories", eager=True)
+def character_categories(value, properties):
+    """Counts of letters, digits, whitespace, punctuation and everything else."""
+    categories = {"letters": 0, "digits": 0, "whitespace": 0, "punctuation": 0, "other": 0}
+    # One classification per distinct character, not per character
+    for ch, count in _frequencies(value, properties).items():
+        if ch.isalpha():
+            categories["letters"] += count
+        elif ch.isdigit():
+            categories["digits"] += count
+        elif ch.isspace():
+            categories["whitespace"] += count
+        elif unicodedata.category(ch).startswith("P"):
+            categories["punctuation"] += count
+        else:
+            categories["other"] += count
+    return categories
+
+
+@register("bigrams")
+def bigrams(value, properties):
+    """Counts of each two-character sequence, in order of first occurrence."""
+    return dict(Counter(map(str.__add__, value, value[1:])))
+
+
+@register("trigrams")
+def trigrams(value, properties):
+    """Counts of each three-character sequence, in order of first occurrence."""
+    return dict(Counter(map("".join, zip(value, value[1:], value[2:]))))
+
+
+@register("longest_palindromic_substring")
+def longest_palindromic_substring(value, properties):
+    """The first longest palindromic substring (case-insensitive, like is_palindrome).
+
+    Manacher's algorithm, linear in the length of the value.
+    """
+    if not value:
+        return ""
+    folded = value.lower()
+    # Lower-casing can change the length of non-ASCII text; compare exactly then
+    text = folded if len(folded) == len(value) else value
+    # Odd-length palindromes of "^#a#b#$" cover both parities of the original
+    padded = "^#" + "#".join(text) + "#$"
+    radius = [0] * len(padded)
+    center = right = 0
+    for i in range(1, len(padded) - 1):
+        if i < right:
+            radius[i] = min(right - i, radius[2 * center - i])
+        while padded[i + radius[i] + 1] == padded[i - radius[i] - 1]:
+            radius[i] += 1
+        if i + radius[i] > right:
+            center, right = i, i + radius[i]
+    best = max(range(len(padded)), key=radius.__getitem__)
+    start = (best - radius[best]) // 2
+    return value[start:start + radius[best]]
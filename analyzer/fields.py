@@ -0,0 +1,184 @@
+"""Model fields for the optional compressed storage mode.
+
+With ``ANALYZER_VALUE_COMPRESSION`` set to "zlib" or "lzma", values of at
+least ``ANALYZER_COMPRESS_MIN_LENGTH`` characters are written as a
+compressed BLOB (SQLite keeps either type in the same column), and the
+character frequency map moves out of the properties JSON into a packed
+varint column. Both are decoded on first attribute access, so rows whose
+value or map is never serialized are never decompressed.
+"""
+import lzma
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+VALUE_COMPRESSION = getattr(settings, "ANALYZER_VALUE_COMPRESSION", None)
+COMPRESS_MIN_LENGTH = getattr(settings, "ANALYZER_COMPRESS_MIN_LENGTH", 4096)
+
+FREQUENCY_MAP_KEY = "character_frequency_map"
+
+# One-byte header naming the codec of a compressed value
+_CODECS = {
+    "zlib": (b"z", lambda data: zlib.compress(data, 6), zlib.decompress),
+    "lzma": (b"x", lzma.compress, lzma.decompress),
+}
+_DECOMPRESSORS = {header: decompress for header, _, decompress in _CODECS.values()}
+
+if VALUE_COMPRESSION is not None and VALUE_COMPRESSION not in _CODECS:
+    raise ValueError(f"Unknown ANALYZER_VALUE_COMPRESSION {VALUE_COMPRESSION!r}")
+
+
+def compress_value(value: str):
+    """Return ``value`` as stored: compressed bytes, or the text itself."""
+    if VALUE_COMPRESSION is None or len(value) < COMPRESS_MIN_LENGTH:
+        return value
+    header, compress, _ = _CODECS[VALUE_COMPRESSION]
+    data = value.encode("utf-8")
+    compressed = header + compress(data)
+    # Incompressible values are cheaper to keep as text
+    return compressed if len(compressed) < len(data) else value
+
+
+def decompress_value(data) -> str:
+    """Inverse of ``compress_value``; text passes through unchanged."""
+    if data is None or isinstance(data, str):
+        return data
+    data = bytes(data)
+    return _DECOMPRESSORS[data[:1]](data[1:]).decode("utf-8")
+
+
+def _write_varint(out: bytearray, number: int):
+    while number > 0x7F:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def pack_frequencies(frequencies: dict) -> bytes:
+    """Encode a character frequency map as (code point, count) varint pairs.
+
+    A map like ``{"a": 1234, ...}`` costs 2-4 bytes per character instead of
+    the 10+ its JSON takes. Key order is preserved.
+    """
+    out = bytearray()
+    for ch, count in frequencies.items():
+        _write_varint(out, ord(ch))
+        _write_varint(out, count)
+    return bytes(out)
+
+
+def unpack_frequencies(data) -> dict:
+    """Inverse of ``pack_frequencies``."""
+    numbers = []
+    number = shift = 0
+    for byte in bytes(data):
+        number |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            numbers.append(number)
+            number = shift = 0
+    return {chr(numbers[i]): numbers[i + 1] for i in range(0, len(numbers), 2)}
+
+
+class DecodingAttribute(DeferredAttribute):
+    """Base for descriptors that post-process a loaded column value.
+
+    Defining ``__set__`` makes this a data descriptor, so ``__get__`` runs on
+    every access and not only when the field was deferred.
+    """
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class DecompressingAttribute(DecodingAttribute):
+    """Decompress the raw column value on first access and keep the result."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        value = super().__get__(instance, cls)
+        if isinstance(value, (bytes, memoryview)):
+            value = instance.__dict__[self.field.attname] = decompress_value(value)
+        return value
+
+
+class CompressedTextField(models.TextField):
+    """Text column whose long values may be stored compressed.
+
+    ``values()`` and ``values_list()`` return the raw stored form; pass it
+    through ``decompress_value``.
+    """
+
+    descriptor_class = DecompressingAttribute
+
+    def get_db_prep_save(self, value, connection):
+        value = super().get_db_prep_save(value, connection)
+        return compress_value(value) if isinstance(value, str) else value
+
+
+class PropertiesAttribute(DecodingAttribute):
+    """Merge the packed frequency map back into the properties on first access."""
+
+    def __get__(self, instance, cls=None):
+        if instance is None:
+            return self
+        properties = super().__get__(instance, cls)
+        frequencies_field = self.field.frequencies_field
+        if frequencies_field and isinstance(properties, dict) and FREQUENCY_MAP_KEY not in properties:
+            packed = getattr(instance, frequencies_field)
+            if packed is not None:
+                properties[FREQUENCY_MAP_KEY] = unpack_frequencies(packed)
+        return properties
+
+
+class PropertiesField(models.JSONField):
+    """Properties JSON that leaves the frequency map to ``frequencies_field``
+    when compressed storage is enabled."""
+
+    descriptor_class = PropertiesAttribute
+
+    def __init__(self, *args, frequencies_field=None, **kwargs):
+        self.frequencies_field = frequencies_field
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.frequencies_field is not None:
+            kwargs["frequencies_field"] = self.frequencies_field
+        return name, path, args, kwargs
+
+    def get_db_prep_save(self, value, connection):
+        if VALUE_COMPRESSION is not None and self.frequencies_field and isinstance(value, dict):
+            value = {key: item for key, item in value.items() if key != FREQUENCY_MAP_KEY}
+        return super().get_db_prep_save(value, connection)
+
+
+class PackedFrequenciesField(models.BinaryField):
+    """Packed copy of the frequency map in ``properties_field``, written only
+    when compressed storage is enabled."""
+
+    def __init__(self, *args, properties_field="properties", **kwargs):
+        self.properties_field = properties_field
+        kwargs.setdefault("null", True)
+        kwargs.setdefault("editable", False)
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.properties_field != "properties":
+            kwargs["properties_field"] = self.properties_field
+        kwargs.pop("editable", None)
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        properties = getattr(model_instance, self.properties_field) or {}
+        if VALUE_COMPRESSION is None or FREQUENCY_MAP_KEY not in properties:
+            value = None
+        else:
+            value = pack_frequencies(properties[FREQUENCY_MAP_KEY])
+        setattr(model_instance, self.attname, value)
+        return value
@@ -0,0 +1,161 @@
+from concurrent.futures import Future
+from contextlib import nullcontext
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from . import search
+from .cache import invalidate_strings
+from .models import CharacterPosting, MinHashSignature, StatCounter, StoredString
+
+# Rows per bulk INSERT; keeps each statement well under SQLite's variable limit.
+BULK_CHUNK_SIZE = getattr(settings, "ANALYZER_BULK_CHUNK_SIZE", 500)
+# Route single POST /strings inserts through the WriteCoalescer
+WRITE_COALESCING = getattr(settings, "ANALYZER_WRITE_COALESCING", False)
+
+
+def ingest_values(items, chunk_size=None, on_stored=None):
+    """Analyze and store many strings, returning one result dict per item.
+
+    Each item is either a string or a ``{"value": ...}`` object. Properties
+    are computed once per item and rows are written with ``bulk_create`` in
+    chunks, so a batch costs one lookup and one INSERT per chunk instead of
+    two queries per string.
+
+    ``on_stored``, if given, is called with each chunk's results inside the
+    transaction that stores the chunk, so progress it records commits (or
+    rolls back) together with the rows.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results = [None] * len(items)
+    pending = []  # (index, StoredString) awaiting insert
+    seen = set()
+
+    for index, item in enumerate(items):
+        value = item.get("value") if isinstance(item, dict) else item
+
+        if value is None:
+            results[index] = {"index": index, "status": "invalid", "detail": "Missing 'value' field."}
+            continue
+
+        if not isinstance(value, str):
+            results[index] = {"index": index, "status": "invalid", "detail": "'value' must be a string."}
+            continue
+
+        stored = StoredString.from_value(value)
+        if stored.id in seen:
+            results[index] = {"index": index, "status": "conflict", "id": stored.id}
+            continue
+
+        seen.add(stored.id)
+        pending.append((index, stored))
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        with transaction.atomic() if on_stored is not None else nullcontext():
+            existing = store_batch([stored for _, stored in chunk])
+
+            for index, stored in chunk:
+                status = "conflict" if stored.id in existing else "created"
+                results[index] = {"index": index, "status": status, "id": stored.id}
+            if on_stored is not None:
+                on_stored([results[index] for index, _ in chunk])
+
+    return results
+
+
+def store_batch(stored_strings) -> set:
+    """Insert analyzed, distinct strings in one transaction.
+
+    Returns the ids that already existed (and so were not inserted).
+    """
+    with transaction.atomic():
+        existing = set(
+            StoredString.objects.filter(pk__in=[stored.id for stored in stored_strings])
+            .values_list("pk", flat=True)
+        )
+        created = [stored for stored in stored_strings if stored.id not in existing]
+        StoredString.objects.bulk_create(created, ignore_conflicts=True)
+        CharacterPosting.index(*created)
+        MinHashSignature.index(*created, defer=True)
+        search.index(*created)
+        StatCounter.record(*created)
+    if created:
+        invalidate_strings(*(stored.id for stored in created))
+    return existing
+
+
+class WriteCoalescer:
+    """Group concurrent single-string inserts into shared transactions.
+
+    Request threads hand analyzed StoredString objects to one writer thread,
+    which commits whatever has queued up (up to ``max_batch``, waiting at
+    most ``max_delay`` seconds for company) in a single transaction. Under
+    concurrent POSTs this turns one fsync per string into one per batch.
+    """
+
+    def __init__(self, max_batch=None, max_delay=None):
+        self.max_batch = max_batch or getattr(settings, "ANALYZER_COALESCE_MAX_BATCH", 200)
+        self.max_delay = max_delay if max_delay is not None else getattr(
+            settings, "ANALYZER_COALESCE_MAX_DELAY", 0.002
+        )
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, stored) -> Future:
+        """Queue ``stored`` for insert; the future resolves to "created" or "conflict"."""
+        future = Future()
+        self._ensure_writer()
+        self._queue.put((stored, future))
+        return future
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="write-coalescer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        # Duplicates inside one batch: the first wins, the rest conflict
+        unique = {}
+        for stored, _ in batch:
+            unique.setdefault(stored.id, stored)
+        try:
+            existing = store_batch(list(unique.values()))
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            close_old_connections()
+            return
+        for stored, future in batch:
+            created = stored.id not in existing and unique[stored.id] is stored
+            future.set_result("created" if created else "conflict")
+
+
+_coalescer = None
+_coalescer_lock = threading.Lock()
+
+
+def get_write_coalescer() -> WriteCoalescer:
+    global _coalescer
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = WriteCoalescer()
+        return _coalescer
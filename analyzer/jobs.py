@@ -0,0 +1,217 @@
+"""Background analysis queue persisted in the AnalysisJob table.
+
+POST /strings?async=true and POST /strings/bulk?async=true enqueue a job and
+return 202. Jobs are picked up by an in-process thread pool (the default) or
+by ``manage.py run_analysis_jobs`` when ANALYZER_JOB_RUNNER is "command".
+Workers claim pending jobs in batches and store them through the bulk ingest
+path, so a burst of submissions turns into a few large transactions.
+
+The thread runner also drains the queue when it starts and then polls it,
+so jobs a dead worker left pending (or running) are not stranded until the
+next submission. After the queue, workers sign strings too long to get their
+MinHash signature on the write path (see ``MinHashSignature.index_pending``).
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .ingest import ingest_values
+from .models import AnalysisJob, MinHashSignature
+
+logger = logging.getLogger(__name__)
+
+# "thread" runs jobs inside the web worker; "command" leaves them to run_analysis_jobs
+JOB_RUNNER = getattr(settings, "ANALYZER_JOB_RUNNER", "thread")
+JOB_WORKERS = getattr(settings, "ANALYZER_JOB_WORKERS", 1)
+# Jobs claimed, and ingested together, per batch
+JOB_BATCH_SIZE = getattr(settings, "ANALYZER_JOB_BATCH_SIZE", 100)
+# Running jobs not finished after this long are assumed orphaned and retried
+JOB_STALE_AFTER = timedelta(seconds=getattr(settings, "ANALYZER_JOB_STALE_SECONDS", 600))
+# Seconds between queue checks by the thread runner; None only wakes on submissions
+JOB_POLL_SECONDS = getattr(settings, "ANALYZER_JOB_POLL_SECONDS", 30)
+
+_runner_pid = None
+_runner_lock = threading.Lock()
+_wake = threading.Event()
+
+
+def enqueue_job(items) -> AnalysisJob:
+    """Persist a job for ``items`` and, with the thread runner, schedule it."""
+    job = AnalysisJob.objects.create(payload=list(items))
+    if JOB_RUNNER == "thread":
+        # Only hand off once the row is visible to the worker's connection
+        transaction.on_commit(_schedule)
+    return job
+
+
+def request_signatures():
+    """Have the thread runner sign strings stored without their signature."""
+    if JOB_RUNNER == "thread":
+        _schedule()
+
+
+def start_job_runner():
+    """Start this process's job runner thread (once; a no-op for the command runner).
+
+    It drains the queue right away, then again on every submission and
+    every JOB_POLL_SECONDS.
+    """
+    global _runner_pid
+    if JOB_RUNNER != "thread":
+        return
+    with _runner_lock:
+        # Threads don't survive fork; a forked worker starts its own
+        if _runner_pid == os.getpid():
+            return
+        _runner_pid = os.getpid()
+        executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="analysis-job")
+        threading.Thread(
+            target=_run, args=(executor,), name="analysis-job-runner", daemon=True
+        ).start()
+
+
+def _run(executor):
+    while True:
+        wait([executor.submit(_drain) for _ in range(JOB_WORKERS)])
+        _wake.wait(JOB_POLL_SECONDS)
+        _wake.clear()
+
+
+def _schedule():
+    start_job_runner()
+    _wake.set()
+
+
+def _drain():
+    try:
+        while process_jobs():
+            pass
+        while sign_pending():
+            pass
+    except Exception:
+        logger.exception("Background analysis worker failed")
+    finally:
+        # Worker threads hold their own connections; don't leak them
+        close_old_connections()
+
+
+def claim_jobs(limit=None) -> list:
+    """Mark up to ``limit`` pending (or stale running) jobs as running.
+
+    Each job is claimed with a conditional UPDATE, so concurrent workers
+    never process the same job twice.
+    """
+    limit = limit or JOB_BATCH_SIZE
+    now = timezone.now()
+    candidates = AnalysisJob.objects.filter(status=AnalysisJob.PENDING).values_list("pk", "status")[:limit]
+    stale = AnalysisJob.objects.filter(
+        status=AnalysisJob.RUNNING, started_at__lt=now - JOB_STALE_AFTER
+    ).values_list("pk", "status")[:limit]
+
+    claimed = []
+    for pk, current in [*candidates, *stale][:limit]:
+        updated = AnalysisJob.objects.filter(pk=pk, status=current).update(
+            status=AnalysisJob.RUNNING, started_at=now
+        )
+        if updated:
+            claimed.append(pk)
+    return list(AnalysisJob.objects.filter(pk__in=claimed))
+
+
+def process_jobs(limit=None) -> int:
+    """Claim one batch of jobs and ingest them together; returns jobs handled.
+
+    If the batch fails, its jobs are retried one by one so that only the
+    jobs that fail on their own are marked failed.
+    """
+    jobs = claim_jobs(limit)
+    if not jobs:
+        return 0
+
+    try:
+        _ingest_jobs(jobs)
+    except Exception as exc:
+        if len(jobs) == 1:
+            logger.exception("Analysis job failed")
+            _fail_job(jobs[0], exc)
+            return 1
+        logger.exception("Analysis job batch failed; retrying its jobs one at a time")
+        for job in jobs:
+            # Drop results recorded in memory by a rolled-back chunk
+            job.refresh_from_db(fields=["results"])
+            try:
+                _ingest_jobs([job])
+            except Exception as exc:
+                logger.exception("Analysis job failed")
+                _fail_job(job, exc)
+    return len(jobs)
+
+
+def _ingest_jobs(jobs):
+    """Ingest the items of ``jobs`` not yet stored and mark the jobs done.
+
+    Item results are saved to each job's ``results`` as their chunk
+    commits. A stale job re-claimed after its worker died only ingests the
+    items that worker didn't get to, and keeps the results it recorded, so
+    strings the job itself created are not reported as conflicts.
+    """
+    slots, items = [], []
+    for job in jobs:
+        if not isinstance(job.results, list) or len(job.results) != len(job.payload):
+            job.results = [None] * len(job.payload)
+        for index, item in enumerate(job.payload):
+            if job.results[index] is None:
+                slots.append((job, index))
+                items.append(item)
+
+    def record(results):
+        touched = {}
+        for result in results:
+            job, index = slots[result["index"]]
+            job.results[index] = {**result, "index": index}
+            touched[job.pk] = job
+        AnalysisJob.objects.bulk_update(list(touched.values()), ["results"])
+
+    results = ingest_values(items, on_stored=record)
+    for result in results:
+        job, index = slots[result["index"]]
+        job.results[index] = {**result, "index": index}
+
+    finished_at = timezone.now()
+    for job in jobs:
+        job.status = AnalysisJob.DONE
+        job.finished_at = finished_at
+    AnalysisJob.objects.bulk_update(jobs, ["results", "status", "finished_at"])
+
+
+def _fail_job(job, exc):
+    AnalysisJob.objects.filter(pk=job.pk).update(
+        status=AnalysisJob.FAILED, error=str(exc), finished_at=timezone.now()
+    )
+
+
+def sign_pending(limit=None) -> int:
+    """Sign one batch of strings stored without their MinHash signature; returns strings signed."""
+    return MinHashSignature.index_pending(limit or JOB_BATCH_SIZE)
+
+
+def job_status(job: AnalysisJob) -> dict:
+    """Public representation of a job for GET /jobs/{id}."""
+    data = {
+        "id": str(job.id),
+        "status": job.status,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "item_count": len(job.payload),
+    }
+    if job.status == AnalysisJob.DONE:
+        data["results"] = job.results
+    if job.status == AnalysisJob.FAILED:
+        data["error"] = job.error
+    return data
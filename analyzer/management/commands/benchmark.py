@@ -0,0 +1,67 @@
+from django.core.management.base import BaseCommand, CommandError
+from analyzer.benchmarks import Suite, compare, load, save
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the service benchmark suite (analysis, POST single and bulk, GET /strings "
+        "with each filter, detail and natural-language lookups) and optionally compare "
+        "it with a saved baseline. Synthetic rows are added to reach each --rows scale, "
+        "so run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", default="10000",
+            help="Comma-separated table sizes to measure reads at, e.g. 10000,100000,1000000.",
+        )
+        parser.add_argument("--iterations", type=int, default=20, help="Timed runs per scenario.")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for generated rows.")
+        parser.add_argument(
+            "--only", action="append",
+            help="Only run scenarios whose name contains this text (repeatable).",
+        )
+        parser.add_argument(
+            "--warm-cache", action="store_true",
+            help="Let reads hit the detail and query caches instead of dropping them per run.",
+        )
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--baseline", help="Compare against results saved with --output.")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Slowdown (as a fraction of the baseline median) that counts as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scales = [int(part) for part in options["rows"].split(",") if part.strip()]
+        except ValueError:
+            raise CommandError("--rows must be comma-separated integers.")
+
+        baseline = load(options["baseline"]) if options["baseline"] else None
+        suite = Suite(
+            scales=scales, iterations=options["iterations"], warm_cache=options["warm_cache"],
+            seed=options["seed"], include=options["only"], log=self.stdout.write,
+        )
+        results = suite.run()
+
+        if options["output"]:
+            save(results, options["output"])
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if baseline is None:
+            return
+
+        rows, regressions = compare(results, baseline, threshold=options["threshold"])
+        self.stdout.write(f"\n{'scenario':<44} {'baseline':>12} {'current':>12} {'change':>9}")
+        for name, before, after, ratio in rows:
+            flag = "  REGRESSION" if name in regressions else ""
+            self.stdout.write(
+                f"{name:<44} {before:>9.3f} ms {after:>9.3f} ms {(ratio - 1) * 100:>+8.1f}%{flag}"
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} scenario(s) slower than the baseline by more than "
+                f"{options['threshold']:.0%}: {', '.join(regressions)}"
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions."))
@@ -0,0 +1,50 @@
+import timeit
+
+from django.core.management.base import BaseCommand
+from analyzer.analysis import compute_properties
+
+# (label, size in characters)
+SIZES = [
+    ("10 B", 10),
+    ("1 KB", 1024),
+    ("1 MB", 1024 ** 2),
+    ("50 MB", 50 * 1024 ** 2),
+]
+
+
+def make_input(size: int, palindrome: bool) -> str:
+    """Word-like text of ``size`` characters, optionally a palindrome."""
+    base = "Never odd or even, a man a plan a canal "
+    text = (base * (size // len(base) + 1))[:size]
+    if palindrome:
+        half = text[:size // 2]
+        text = half + ("x" if size % 2 else "") + half[::-1]
+    return text
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark compute_properties per call across input sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-size", type=int, default=None,
+            help="Skip inputs larger than this many characters.",
+        )
+
+    def handle(self, *args, **options):
+        max_size = options["max_size"]
+        self.stdout.write(f"{'input':>8} {'kind':>12} {'per call':>14} {'MB/s':>10}")
+        for label, size in SIZES:
+            if max_size is not None and size > max_size:
+                continue
+            for palindrome in (False, True):
+                value = make_input(size, palindrome)
+                # Aim for roughly half a second of work per measurement
+                number = max(1, min(100_000, (50 * 1024 ** 2) // (size * 20)))
+                best = min(timeit.repeat(
+                    lambda: compute_properties(value), number=number, repeat=3
+                )) / number
+                kind = "palindrome" if palindrome else "text"
+                self.stdout.write(
+                    f"{label:>8} {kind:>12} {best * 1e6:>11.1f} us {size / best / 1e6:>10.1f}"
+                )
@@ -0,0 +1,116 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter per boot: the app setup and the warm-up request a
+# gunicorn worker runs (gunicorn.conf.py), timed one by one, then in-process
+# requests through the WSGI handler
+WORKER = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+setup = time.perf_counter()
+from analyzer.warmup import call, warm_up
+warm_up(application)
+warmed = time.perf_counter()
+print(json.dumps({
+    "setup_ms": (setup - started) * 1000,
+    "warm_up_ms": (warmed - setup) * 1000,
+    "modules": len(sys.modules),
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}), flush=True)
+results = {}
+for path in PATHS:
+    samples = []
+    for _ in range(REQUESTS):
+        before = time.perf_counter()
+        call(application, path)
+        samples.append(time.perf_counter() - before)
+    samples.sort()
+    results[path] = {
+        "median_us": samples[len(samples) // 2] * 1e6,
+        "p95_us": samples[int(len(samples) * 0.95)] * 1e6,
+    }
+print(json.dumps(results), flush=True)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare worker boot time and per-request overhead between settings modules "
+        "(by default the full and the lean API profiles). Each boot runs in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--settings-module", action="append", dest="modules",
+            help="Settings module to measure; repeat to compare several.",
+        )
+        parser.add_argument("--runs", type=int, default=10, help="Boots per settings module.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per path and boot.")
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="GET path for the per-request measurement; repeat for several.",
+        )
+        parser.add_argument("--output", help="Also write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        modules = options["modules"] or ["string_analyzer.settings", "string_analyzer.settings_lean"]
+        paths = options["paths"] or ["/strings/stats", "/strings/unknown/similar"]
+        program = WORKER.replace("PATHS", repr(paths)).replace("REQUESTS", str(options["requests"]))
+        results = {}
+        for module in modules:
+            boots = [self.boot(module, program) for _ in range(options["runs"])]
+            results[module] = summary = {
+                "boot_ms": statistics.median(boot["boot_ms"] for boot in boots),
+                "setup_ms": statistics.median(boot["setup_ms"] for boot in boots),
+                "warm_up_ms": statistics.median(boot["warm_up_ms"] for boot in boots),
+                "modules": boots[0]["modules"],
+                "max_rss_mb": statistics.median(boot["max_rss_mb"] for boot in boots),
+                "requests": {
+                    path: {
+                        key: statistics.median(boot["requests"][path][key] for boot in boots)
+                        for key in ("median_us", "p95_us")
+                    }
+                    for path in paths
+                },
+            }
+            self.stdout.write(
+                f"{module}: boot {summary['boot_ms']:.0f} ms (django setup {summary['setup_ms']:.0f} ms, "
+                f"warm-up {summary['warm_up_ms']:.0f} ms), {summary['modules']} modules, "
+                f"{summary['max_rss_mb']:.0f} MB RSS"
+            )
+            for path, timing in summary["requests"].items():
+                self.stdout.write(
+                    f"  GET {path:<32} median {timing['median_us']:>8.0f} us  p95 {timing['p95_us']:>8.0f} us"
+                )
+
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as handle:
+                json.dump(results, handle, indent=2)
+                handle.write("\n")
+
+    def boot(self, module, program) -> dict:
+        """Boot one worker under ``module``; boot_ms runs from process start to a warmed app."""
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": module}
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "-c", program], env=env, cwd=settings.BASE_DIR,
+            stdout=subprocess.PIPE, text=True,
+        )
+        line = process.stdout.readline()
+        elapsed = time.perf_counter() - started
+        requests = process.stdout.readline()
+        if process.wait() != 0 or not requests:
+            raise CommandError(f"Booting under {module} failed (exit status {process.returncode}).")
+        boot = json.loads(line)
+        boot["boot_ms"] = elapsed * 1000
+        boot["requests"] = json.loads(requests)
+        return boot
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from analyzer import db
+from analyzer.ingest import get_write_coalescer
+from analyzer.models import StoredString
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure concurrent single-string inserts/sec through the POST /strings "
+        "write path. Run it against a scratch database: rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=2000, help="Strings to insert.")
+        parser.add_argument("--threads", type=int, default=8, help="Concurrent writers.")
+        parser.add_argument("--size", type=int, default=100, help="Characters per string.")
+        parser.add_argument(
+            "--coalesce", action="store_true",
+            help="Send inserts through the write-coalescing queue.",
+        )
+        parser.add_argument(
+            "--untuned", action="store_true",
+            help="Use SQLite defaults (no PRAGMAs, deferred transactions) as the baseline.",
+        )
+
+    def handle(self, *args, **options):
+        if options["untuned"]:
+            db_settings = connections.settings["default"]
+            db_settings.setdefault("OPTIONS", {}).pop("transaction_mode", None)
+            db.sqlite_pragmas = lambda: {}
+            connections["default"].close()
+
+        run_id = time.time_ns()
+        padding = "x" * max(0, options["size"] - 40)
+        values = [f"{run_id}-{i}-{padding}" for i in range(options["count"])]
+        coalescer = get_write_coalescer() if options["coalesce"] else None
+        errors = []
+
+        def insert(value):
+            try:
+                stored = StoredString.from_value(value)
+                if coalescer is not None:
+                    coalescer.submit(stored).result()
+                else:
+                    stored.save()
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            list(pool.map(insert, values))
+        elapsed = time.perf_counter() - started
+
+        with connections["default"].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            journal_mode = cursor.fetchone()[0]
+        StoredString.objects.filter(value__startswith=f"{run_id}-").delete()
+
+        self.stdout.write(
+            f"journal_mode={journal_mode} coalesce={bool(coalescer)} threads={options['threads']}: "
+            f"{options['count'] - len(errors)} inserts in {elapsed:.2f}s = "
+            f"{(options['count'] - len(errors)) / elapsed:.0f}/s, {len(errors)} errors"
+        )
+        if errors:
+            self.stdout.write(f"first error: {errors[0]!r}")
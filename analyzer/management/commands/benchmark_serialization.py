@@ -0,0 +1,70 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.http import QueryDict
+from analyzer.renderers import FastJSONRenderer
+from analyzer.ingest import ingest_values
+from analyzer.models import StoredString
+from analyzer.projection import Projection
+from analyzer.serializers import StoredStringSerializer
+
+WORDS = "the quick brown fox jumps over lazy dog level kayak racecar request timeout".split()
+
+# (label, fields/exclude query string); None is the DRF serializer baseline
+VARIANTS = [
+    ("serializer", None),
+    ("projection (full)", ""),
+    ("exclude=character_frequency_map", "exclude=character_frequency_map"),
+    ("fields=id,length,word_count", "fields=id,length,word_count"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time fetching and rendering list rows with the DRF serializer versus "
+        "field projections. Rows are inserted in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000, help="Rows to render per run.")
+        parser.add_argument("--words", type=int, default=20, help="Words per synthetic string.")
+        parser.add_argument("--repeat", type=int, default=3, help="Best of this many runs.")
+
+    def handle(self, *args, **options):
+        rows, renderer = options["rows"], FastJSONRenderer()
+        rng = random.Random(0)
+        values = [
+            " ".join(rng.choice(WORDS) for _ in range(options["words"])) + f" {i}"
+            for i in range(rows)
+        ]
+
+        with transaction.atomic():
+            ingest_values(values)
+            queryset = StoredString.objects.filter(
+                pk__in=StoredString.objects.order_by("-created_at").values("pk")[:rows]
+            )
+
+            self.stdout.write(f"{'variant':<34} {'per 10k rows':>14} {'bytes':>12}")
+            for label, query in VARIANTS:
+                if query is None:
+                    def render():
+                        data = StoredStringSerializer(queryset.all(), many=True).data
+                        return renderer.render([dict(row) for row in data])
+                else:
+                    projection = Projection.from_params(QueryDict(query))
+
+                    def render():
+                        rows = projection.apply(queryset.all())
+                        return renderer.render([projection.render(row) for row in rows])
+
+                best = float("inf")
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    body = render()
+                    best = min(best, time.perf_counter() - started)
+                self.stdout.write(
+                    f"{label:<34} {best * 10_000 / rows * 1000:>11.1f} ms {len(body):>12,}"
+                )
+            transaction.set_rollback(True)
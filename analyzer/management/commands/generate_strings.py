@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from analyzer.benchmarks import GENERATE_DEFAULTS, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert synthetic, reproducible strings through the bulk ingest path, "
+        "e.g. to benchmark at 10k/100k/1M rows. Run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10_000, help="Strings to add.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+        parser.add_argument("--batch-size", type=int, default=5000, help="Strings per ingest batch.")
+        parser.add_argument("--min-words", type=int, default=GENERATE_DEFAULTS["min_words"])
+        parser.add_argument("--max-words", type=int, default=GENERATE_DEFAULTS["max_words"])
+        parser.add_argument(
+            "--palindrome-ratio", type=float, default=GENERATE_DEFAULTS["palindrome_ratio"],
+            help="Fraction of generated strings that are palindromes.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        def progress(created):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{created} created ({created / elapsed:.0f}/s)")
+
+        created = generate(
+            options["count"], seed=options["seed"], batch_size=options["batch_size"],
+            progress=progress, min_words=options["min_words"], max_words=options["max_words"],
+            palindrome_ratio=options["palindrome_ratio"],
+        )
+        self.stdout.write(f"Created {created} strings in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of already sorted ``samples``."""
+    if not samples:
+        return None
+    index = max(0, min(len(samples) - 1, round(pct / 100 * len(samples)) - 1))
+    return samples[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive a running server with concurrent requests and report latency "
+        "percentiles, e.g. to compare the WSGI and ASGI entry points."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL.")
+        parser.add_argument(
+            "--path", action="append", dest="paths",
+            help="GET path to request (repeatable). Defaults to a mix of list and detail lookups.",
+        )
+        parser.add_argument(
+            "--post-size", type=int, default=0,
+            help="Also POST /strings with unique values of this many characters.",
+        )
+        parser.add_argument("--requests", type=int, default=1000, help="Total requests to send.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight.")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args, **options):
+        base = options["url"].rstrip("/")
+        paths = options["paths"] or [
+            "/strings?limit=20",
+            "/strings?is_palindrome=true&limit=20",
+            "/strings/filter-by-natural-language?query=single%20word%20palindromic%20strings",
+        ]
+        post_size = options["post_size"]
+        total = options["requests"]
+        run_id = time.time_ns()
+
+        def send(i):
+            if post_size and i % 2:
+                # Unique per request so every POST does a real insert
+                value = f"{run_id}-{i}-" + "x" * post_size
+                request = urllib.request.Request(
+                    f"{base}/strings", method="POST",
+                    data=json.dumps({"value": value}).encode("utf-8"),
+                    headers={"Content-Type": "application/json"},
+                )
+            else:
+                request = urllib.request.Request(base + paths[i % len(paths)])
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request) as response:
+                    response.read()
+                    ok = True
+            except urllib.error.HTTPError as exc:
+                ok = exc.code < 500
+            except OSError:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            results = list(pool.map(send, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        summary = {
+            "requests": total,
+            "concurrency": options["concurrency"],
+            "errors": sum(1 for _, ok in results if not ok),
+            "throughput_rps": round(total / elapsed, 1),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary))
+        else:
+            for key, val in summary.items():
+                self.stdout.write(f"{key:>15}: {val}")
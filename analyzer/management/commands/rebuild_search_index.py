@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from analyzer import search
+from analyzer.models import StoredString
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreate the FTS5 table behind GET /strings/search from the stored strings, e.g. "
+        "after switching ANALYZER_SEARCH_ENGINE back to \"fts5\"."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Strings per transaction.")
+
+    def handle(self, *args, **options):
+        if not search.enabled():
+            raise CommandError("The search index needs SQLite and ANALYZER_SEARCH_ENGINE = \"fts5\".")
+        chunk_size = options["chunk_size"]
+        with transaction.atomic():
+            search.drop_table()
+            search.create_table()
+
+        pks = list(StoredString.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), chunk_size):
+            rows = StoredString.objects.filter(pk__in=pks[start:start + chunk_size]).only("id", "value")
+            with transaction.atomic():
+                search.index(*rows)
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {len(pks)} strings for search."))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from analyzer.models import MinHashSignature, SimilarityBucket, StoredString
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute MinHash signatures and LSH buckets for every stored string, e.g. after "
+        "changing ANALYZER_MINHASH_SIZE, ANALYZER_LSH_BANDS or ANALYZER_SIMILARITY_MAX_LENGTH."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Strings per transaction.")
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        with transaction.atomic():
+            SimilarityBucket.objects.all().delete()
+            MinHashSignature.objects.all().delete()
+
+        pks = list(StoredString.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), chunk_size):
+            rows = StoredString.objects.filter(pk__in=pks[start:start + chunk_size]).only("id", "value")
+            with transaction.atomic():
+                MinHashSignature.index(*rows)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {MinHashSignature.objects.count()} of {len(pks)} strings "
+            f"({SimilarityBucket.objects.count()} buckets)."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from analyzer.models import StatCounter
+
+
+class Command(BaseCommand):
+    help = "Recompute the GET /strings/stats summary table from every stored string."
+
+    def handle(self, *args, **options):
+        StatCounter.rebuild()
+        stats = StatCounter.snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt statistics for {stats['total_strings']} strings."
+        ))
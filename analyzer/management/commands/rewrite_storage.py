@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from analyzer.models import StoredString
+
+STORED_FIELDS = ["value", "properties", "character_frequencies"]
+
+
+def stored_bytes() -> int:
+    """Bytes held by the value, properties and packed frequency columns."""
+    table = connection.ops.quote_name(StoredString._meta.db_table)
+    columns = " + ".join(
+        f"COALESCE(LENGTH(CAST({connection.ops.quote_name(name)} AS BLOB)), 0)"
+        for name in STORED_FIELDS
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COALESCE(SUM({columns}), 0) FROM {table}")
+        return cursor.fetchone()[0]
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite every stored string in the current storage format, e.g. after "
+        "enabling or disabling ANALYZER_VALUE_COMPRESSION."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Rows per UPDATE batch.")
+        parser.add_argument(
+            "--vacuum", action="store_true", help="VACUUM afterwards to return freed pages to the OS."
+        )
+
+    def handle(self, *args, **options):
+        before = stored_bytes()
+        frequencies = StoredString._meta.get_field("character_frequencies")
+        chunk_size = options["chunk_size"]
+
+        pks = list(StoredString.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), chunk_size):
+            rows = list(StoredString.objects.filter(pk__in=pks[start:start + chunk_size]))
+            for stored in rows:
+                # bulk_update() skips pre_save(), which derives the packed map
+                frequencies.pre_save(stored, add=False)
+            with transaction.atomic():
+                StoredString.objects.bulk_update(rows, STORED_FIELDS)
+
+        if options["vacuum"]:
+            with connection.cursor() as cursor:
+                cursor.execute("VACUUM")
+
+        after = stored_bytes()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rewrote {len(pks)} strings: {before:,} -> {after:,} bytes of stored data."
+        ))
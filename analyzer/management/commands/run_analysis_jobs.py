@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from analyzer.jobs import JOB_BATCH_SIZE, process_jobs, sign_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued analysis jobs and sign strings stored without a MinHash signature "
+        "(use with ANALYZER_JOB_RUNNER = 'command')."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Drain the queue and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=1.0,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=JOB_BATCH_SIZE,
+            help="Jobs claimed and ingested together per batch.",
+        )
+
+    def handle(self, *args, **options):
+        processed = signed = 0
+        while True:
+            handled = process_jobs(options["batch_size"])
+            processed += handled
+            if handled:
+                continue
+            handled = sign_pending()
+            signed += handled
+            if handled:
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs and signed {signed} strings."))
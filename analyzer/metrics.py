@@ -0,0 +1,186 @@
+"""Per-process request metrics in the Prometheus text format.
+
+MetricsMiddleware times every request and, through ``stage()`` blocks in
+the views and models plus a database execute wrapper, where that time
+went: hashing, analysis, queries, serialization and rendering. Counts are
+kept per worker process, like the cache counters, and served at
+GET /metrics.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from .cache import cache_stats
+
+# Requests slower than this are logged with their stage breakdown; None disables
+SLOW_REQUEST_MS = getattr(settings, "ANALYZER_SLOW_REQUEST_MS", 1000)
+
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+HELP = {
+    "analyzer_requests_total": ("counter", "Requests handled, by endpoint, method and status."),
+    "analyzer_request_duration_seconds": ("histogram", "Wall time per request."),
+    "analyzer_request_db_queries": ("histogram", "Database queries per request."),
+    "analyzer_stage_duration_seconds": ("histogram", "Time per request spent in each stage."),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> count
+_histograms = {}  # (name, labels) -> Histogram
+
+
+def increment(name, labels, amount=1):
+    with _lock:
+        _counters[name, labels] = _counters.get((name, labels), 0) + amount
+
+
+def observe(name, labels, value, buckets=DURATION_BUCKETS):
+    with _lock:
+        histogram = _histograms.get((name, labels))
+        if histogram is None:
+            histogram = _histograms[name, labels] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def reset():
+    """Forget everything recorded so far, e.g. a boot-time warm-up request."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+class RequestTimings:
+    """Seconds spent per stage, and queries run, during one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.queries = 0
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0) + seconds
+
+    def breakdown(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in sorted(self.stages.items())]
+        return " ".join(parts + [f"queries={self.queries}"])
+
+
+# Set by MetricsMiddleware; copied into sync_to_async threads with the context
+_current = contextvars.ContextVar("analyzer_request_timings", default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    timings.token = _current.set(timings)
+    return timings
+
+
+def finish_request(timings, endpoint, method, status) -> float:
+    """Record a finished request and return its duration in seconds."""
+    _current.reset(timings.token)
+    elapsed = time.perf_counter() - timings.started
+    labels = (("endpoint", endpoint), ("method", method))
+    increment("analyzer_requests_total", labels + (("status", str(status)),))
+    observe("analyzer_request_duration_seconds", labels, elapsed)
+    observe("analyzer_request_db_queries", labels, timings.queries, QUERY_BUCKETS)
+    for stage_name, seconds in timings.stages.items():
+        observe("analyzer_stage_duration_seconds", (("endpoint", endpoint), ("stage", stage_name)), seconds)
+    return elapsed
+
+
+@contextmanager
+def stage(name):
+    """Attribute the time spent in the block to ``name`` for the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def _time_query(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.add("db", time.perf_counter() - started)
+        timings.queries += 1
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    # Signals fire on every reconnect of the same wrapper
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def _labels(labels, **extra) -> str:
+    pairs = list(labels) + list(extra.items())
+    return ",".join(f'{key}="{value}"' for key, value in pairs)
+
+
+def render_metrics() -> str:
+    """All metrics of this process in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted(
+            ((key, histogram.buckets, list(histogram.counts), histogram.sum)
+             for key, histogram in _histograms.items()),
+            key=lambda item: item[0],
+        )
+
+    lines = []
+    described = set()
+
+    def describe(name):
+        if name not in described:
+            described.add(name)
+            kind, text = HELP[name]
+            lines.extend([f"# HELP {name} {text}", f"# TYPE {name} {kind}"])
+
+    for (name, labels), count in counters:
+        describe(name)
+        lines.append(f"{name}{{{_labels(labels)}}} {count}")
+
+    for (name, labels), buckets, counts, total in histograms:
+        describe(name)
+        cumulative = 0
+        for bound, count in zip(buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{{{_labels(labels, le=bound)}}} {cumulative}")
+        lines.append(f"{name}_sum{{{_labels(labels)}}} {total}")
+        lines.append(f"{name}_count{{{_labels(labels)}}} {cumulative}")
+
+    lines.extend([
+        "# HELP analyzer_cache_events_total Detail and query cache events.",
+        "# TYPE analyzer_cache_events_total counter",
+    ])
+    for event, count in cache_stats().items():
+        if not event.endswith("_ratio"):
+            lines.append(f'analyzer_cache_events_total{{event="{event}"}} {count}')
+    return "\n".join(lines) + "\n"
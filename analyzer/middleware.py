@@ -0,0 +1,90 @@
+import logging
+import os
+import tempfile
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from .metrics import SLOW_REQUEST_MS, finish_request, start_request
+
+logger = logging.getLogger(__name__)
+
+# Per-request cProfile dumps: enable with ANALYZER_PROFILING, then send "X-Profile: 1"
+PROFILING = getattr(settings, "ANALYZER_PROFILING", False)
+PROFILE_DIR = getattr(settings, "ANALYZER_PROFILE_DIR", None) or tempfile.gettempdir()
+PROFILE_HEADER = "HTTP_X_PROFILE"
+
+
+def _endpoint(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.url_name if match is not None and match.url_name else "unmatched"
+
+
+class MetricsMiddleware:
+    """Time each request, record its metrics and log slow ones.
+
+    Should be first in MIDDLEWARE so the timings cover the whole stack.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        profiler = None
+        if PROFILING and request.META.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes", "on"):
+            # Only loaded when a request asks for it
+            import cProfile
+            profiler = cProfile.Profile()
+
+        timings = start_request()
+        response = None
+        try:
+            if profiler is None:
+                response = self.get_response(request)
+            else:
+                response = profiler.runcall(self.get_response, request)
+        finally:
+            self._finish(request, response, timings)
+
+        if profiler is not None:
+            response["X-Profile-File"] = self._dump(request, profiler)
+        return response
+
+    async def __acall__(self, request):
+        # cProfile only sees one thread and interleaves other coroutines, so
+        # profiling is left to the WSGI entry point
+        timings = start_request()
+        response = None
+        try:
+            response = await self.get_response(request)
+        finally:
+            self._finish(request, response, timings)
+        return response
+
+    def _finish(self, request, response, timings):
+        status = response.status_code if response is not None else 500
+        elapsed = finish_request(timings, _endpoint(request), request.method, status)
+        if SLOW_REQUEST_MS is not None and elapsed * 1000 >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request %s %s -> %s in %.1f ms: %s",
+                request.method, request.path, status, elapsed * 1000, timings.breakdown(),
+            )
+
+    def _dump(self, request, profiler) -> str:
+        """Write the profile to PROFILE_DIR and return its file name.
+
+        Only the name goes back to the client; the full path is logged.
+        """
+        name = f"{_endpoint(request)}-{request.method}-{time.time_ns()}.prof"
+        path = os.path.join(PROFILE_DIR, name)
+        profiler.dump_stats(path)
+        logger.info("Profile for %s %s written to %s", request.method, request.path, path)
+        return name
@@ -0,0 +1,77 @@
+import hashlib
+
+from django.db import migrations, models
+
+
+def compute_properties(value):
+    # A frozen copy of the analysis as of this migration, so later changes to
+    # analyzer.analysis can't alter what the backfill writes.
+    freq = {}
+    for ch in value:
+        freq[ch] = freq.get(ch, 0) + 1
+    return {
+        'length': len(value),
+        'is_palindrome': value.lower() == value[::-1].lower(),
+        'unique_characters': len(freq),
+        'word_count': len(value.split()),
+        'sha256_hash': hashlib.sha256(value.encode('utf-8')).hexdigest(),
+        'character_frequency_map': freq,
+    }
+
+
+def backfill_indexed_properties(apps, schema_editor):
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    batch = []
+    for obj in StoredString.objects.only('id', 'value', 'properties').iterator(chunk_size=1000):
+        if not obj.properties:
+            obj.properties = compute_properties(obj.value)
+        obj.length = obj.properties['length']
+        obj.is_palindrome = obj.properties['is_palindrome']
+        obj.word_count = obj.properties['word_count']
+        obj.unique_characters = obj.properties['unique_characters']
+        batch.append(obj)
+        if len(batch) >= 1000:
+            StoredString.objects.bulk_update(
+                batch, ['properties', 'length', 'is_palindrome', 'word_count', 'unique_characters']
+            )
+            batch = []
+    if batch:
+        StoredString.objects.bulk_update(
+            batch, ['properties', 'length', 'is_palindrome', 'word_count', 'unique_characters']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedstring',
+            name='length',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='storedstring',
+            name='is_palindrome',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddField(
+            model_name='storedstring',
+            name='word_count',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='storedstring',
+            name='unique_characters',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.RunPython(backfill_indexed_properties, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='storedstring',
+            name='properties',
+            field=models.JSONField(),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_character_postings(apps, schema_editor):
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    CharacterPosting = apps.get_model('analyzer', 'CharacterPosting')
+    batch = []
+    for obj in StoredString.objects.only('id', 'properties').iterator(chunk_size=1000):
+        batch.extend(
+            CharacterPosting(stored_string_id=obj.id, character=ch)
+            for ch in obj.properties['character_frequency_map']
+        )
+        if len(batch) >= 5000:
+            CharacterPosting.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        CharacterPosting.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0002_promote_indexed_properties'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CharacterPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('character', models.CharField(max_length=1)),
+                ('stored_string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='character_postings', to='analyzer.storedstring')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('character', 'stored_string'), name='unique_character_posting')],
+            },
+        ),
+        migrations.RunPython(backfill_character_postings, migrations.RunPython.noop),
+    ]
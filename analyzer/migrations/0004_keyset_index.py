@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0003_character_postings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='storedstring',
+            index=models.Index(fields=['-created_at', '-id'], name='storedstring_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 06:51
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def length_bucket(length):
+    if length == 0:
+        return '0'
+    low = 1 << (length.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else f'{low}-{high}'
+
+
+def backfill_stat_counters(apps, schema_editor):
+    # The counter layout as of this migration, independent of the live model
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    StatCounter = apps.get_model('analyzer', 'StatCounter')
+    deltas = Counter()
+    for properties in StoredString.objects.values_list('properties', flat=True).iterator(chunk_size=1000):
+        deltas[('total', 'strings')] += 1
+        deltas[('total', 'characters')] += properties['length']
+        if properties['is_palindrome']:
+            deltas[('total', 'palindromes')] += 1
+        deltas[('length', length_bucket(properties['length']))] += 1
+        deltas[('word_count', str(properties['word_count']))] += 1
+        for ch, count in properties['character_frequency_map'].items():
+            deltas[('character', ch)] += count
+    StatCounter.objects.bulk_create(
+        [StatCounter(kind=kind, key=key, count=count) for (kind, key), count in deltas.items() if count]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0004_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('key', models.CharField(blank=True, max_length=64)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='unique_stat_counter')],
+            },
+        ),
+        migrations.RunPython(backfill_stat_counters, migrations.RunPython.noop),
+    ]
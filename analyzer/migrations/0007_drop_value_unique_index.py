@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_analysis_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='storedstring',
+            name='value',
+            field=models.TextField(),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:01
+
+import analyzer.fields
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_drop_value_unique_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedstring',
+            name='character_frequencies',
+            field=analyzer.fields.PackedFrequenciesField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='storedstring',
+            name='properties',
+            field=analyzer.fields.PropertiesField(frequencies_field='character_frequencies'),
+        ),
+        migrations.AlterField(
+            model_name='storedstring',
+            name='value',
+            field=analyzer.fields.CompressedTextField(),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from analyzer.fields import decompress_value
+from analyzer.similarity import buckets, pack_signature, signature
+
+
+def backfill_similarity_index(apps, schema_editor):
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    MinHashSignature = apps.get_model('analyzer', 'MinHashSignature')
+    SimilarityBucket = apps.get_model('analyzer', 'SimilarityBucket')
+    signatures, postings = [], []
+    for pk, value in StoredString.objects.values_list('id', 'value').iterator(chunk_size=1000):
+        sig = signature(decompress_value(value))
+        if sig is None:
+            continue
+        signatures.append(MinHashSignature(stored_string_id=pk, signature=pack_signature(sig)))
+        postings.extend(SimilarityBucket(stored_string_id=pk, bucket=bucket) for bucket in buckets(sig))
+        if len(postings) >= 5000:
+            MinHashSignature.objects.bulk_create(signatures)
+            SimilarityBucket.objects.bulk_create(postings)
+            signatures, postings = [], []
+    MinHashSignature.objects.bulk_create(signatures)
+    SimilarityBucket.objects.bulk_create(postings)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_compressed_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MinHashSignature',
+            fields=[
+                ('stored_string', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='minhash_signature', serialize=False, to='analyzer.storedstring')),
+                ('signature', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SimilarityBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True)),
+                ('stored_string', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarity_buckets', to='analyzer.storedstring')),
+            ],
+        ),
+        migrations.RunPython(backfill_similarity_index, migrations.RunPython.noop),
+    ]
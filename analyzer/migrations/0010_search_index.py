@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:05
+
+from django.conf import settings
+from django.db import migrations
+
+from analyzer.fields import decompress_value
+
+TABLE = 'analyzer_search_index'
+
+
+def enabled(conn):
+    return getattr(settings, 'ANALYZER_SEARCH_ENGINE', 'fts5') == 'fts5' and conn.vendor == 'sqlite'
+
+
+def rowid(pk):
+    return int.from_bytes(bytes.fromhex(pk[:16]), 'big', signed=True)
+
+
+def create_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if not enabled(conn):
+        return
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+            "USING fts5(value, stored_string_id UNINDEXED, tokenize='trigram')"
+        )
+        rows = []
+        for pk, value in StoredString.objects.values_list('id', 'value').iterator(chunk_size=1000):
+            rows.append((rowid(pk), decompress_value(value), pk))
+            if len(rows) >= 1000:
+                cursor.executemany(
+                    f"INSERT INTO {TABLE} (rowid, value, stored_string_id) VALUES (%s, %s, %s)", rows
+                )
+                rows = []
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, value, stored_string_id) VALUES (%s, %s, %s)", rows
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0009_similarity_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
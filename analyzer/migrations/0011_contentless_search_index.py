@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-17 11:20
+
+from django.db import migrations
+
+from analyzer.fields import decompress_value
+
+TABLE = 'analyzer_search_index'
+
+
+def rowid(pk):
+    return int.from_bytes(bytes.fromhex(pk[:16]), 'big', signed=True)
+
+
+def rebuild(apps, schema_editor, columns):
+    """Recreate an existing search table with ``columns`` and index every string into it."""
+    conn = schema_editor.connection
+    if TABLE not in conn.introspection.table_names():
+        return
+    StoredString = apps.get_model('analyzer', 'StoredString')
+    contentless = 'stored_string_id' not in columns
+    insert = (
+        f"INSERT INTO {TABLE} (rowid, value) VALUES (%s, %s)" if contentless
+        else f"INSERT INTO {TABLE} (rowid, value, stored_string_id) VALUES (%s, %s, %s)"
+    )
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE {TABLE}")
+        cursor.execute(f"CREATE VIRTUAL TABLE {TABLE} USING fts5({columns}, tokenize='trigram')")
+        rows = []
+        for pk, value in StoredString.objects.values_list('id', 'value').iterator(chunk_size=1000):
+            value = decompress_value(value)
+            rows.append((rowid(pk), value) if contentless else (rowid(pk), value, pk))
+            if len(rows) >= 1000:
+                cursor.executemany(insert, rows)
+                rows = []
+        cursor.executemany(insert, rows)
+
+
+def make_contentless(apps, schema_editor):
+    # Drops the table's copy of every value; matches resolve through the rowid
+    rebuild(apps, schema_editor, "value, content=''")
+
+
+def restore_content(apps, schema_editor):
+    rebuild(apps, schema_editor, 'value, stored_string_id UNINDEXED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(make_contentless, restore_content),
+    ]
@@ -1,42 +1,452 @@
-from django.db import models
-import hashlib
-
-def compute_properties(value: str) -> dict:
-    """Compute all required string properties."""
-    # Generate SHA256 hash
-    sha256_hash = hashlib.sha256(value.encode("utf-8")).hexdigest()
-    
-    length = len(value)
-    is_palindrome = value.lower() == value[::-1].lower()
-    unique_characters = len(set(value))
-    word_count = len(value.split())
-
-    # character frequency map
-    freq = {}
-    for ch in value:
-        freq[ch] = freq.get(ch, 0) + 1
-
-    return {
-        "length": length,
-        "is_palindrome": is_palindrome,
-        "unique_characters": unique_characters,
-        "word_count": word_count,
-        "sha256_hash": sha256_hash,  # This will be the same as the id
-        "character_frequency_map": freq,
-    }
+from collections import Counter
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from .analysis import compute_properties
+from .extended import compute_extended, eager_properties
+from .offload import analyze_value
+from .cache import invalidate_strings
+from .metrics import stage
+from .fields import (
+    CompressedTextField, PackedFrequenciesField, PropertiesField, decompress_value, unpack_frequencies,
+)
+from .similarity import (
+    MAX_LENGTH as SIGNATURE_MAX_LENGTH, INLINE_MAX_LENGTH as SIGNATURE_INLINE_MAX_LENGTH, buckets,
+    pack_signature, signature, signed_inline, similarity, unpack_signature,
+)
+from . import search
+
+# On a duplicate hash, compare the stored value byte for byte before reporting a conflict
+VERIFY_HASH_COLLISIONS = getattr(settings, "ANALYZER_VERIFY_HASH_COLLISIONS", False)
+# Similarity search re-ranks at most this many LSH candidates, most shared buckets first
+SIMILARITY_MAX_CANDIDATES = getattr(settings, "ANALYZER_SIMILARITY_MAX_CANDIDATES", 2000)
+
+
+def character_variants(ch: str, ignore_case: bool = False) -> set:
+    """Characters a posting lookup should match for ``ch``."""
+    if not ignore_case:
+        return {ch}
+    # Multi-character case mappings (e.g. "ß".upper() == "SS") can't be a posting
+    return {c for c in (ch, ch.lower(), ch.upper()) if len(c) == 1}
+
+
+class HashCollision(Exception):
+    """A different string is already stored under the same SHA-256 id."""
+
+
+class StoredStringQuerySet(models.QuerySet):
+    def containing_characters(self, characters, ignore_case=False):
+        """Keep strings containing every character in ``characters``.
+
+        Each character is resolved through the indexed CharacterPosting table
+        rather than scanning values or the frequency-map JSON.
+        """
+        queryset = self
+        for ch in characters:
+            postings = CharacterPosting.objects.filter(
+                character__in=character_variants(ch, ignore_case)
+            )
+            queryset = queryset.filter(pk__in=postings.values("stored_string"))
+        return queryset
+
 
 class StoredString(models.Model):
     id = models.CharField(max_length=64, primary_key=True, editable=False)
-    value = models.TextField(unique=True)
-    properties = models.JSONField()
+    # Deduplicated through the SHA-256 primary key; no index on the value itself
+    value = CompressedTextField()
+    properties = PropertiesField(frequencies_field="character_frequencies")
+    # Frequency map in packed form when compressed storage is enabled
+    character_frequencies = PackedFrequenciesField()
+    # Hot properties mirrored out of the JSON blob so filters can use an index
+    length = models.PositiveIntegerField(default=0, db_index=True)
+    is_palindrome = models.BooleanField(default=False, db_index=True)
+    word_count = models.PositiveIntegerField(default=0, db_index=True)
+    unique_characters = models.PositiveIntegerField(default=0, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = StoredStringQuerySet.as_manager()
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Serves keyset pagination over the default ordering
+            models.Index(fields=["-created_at", "-id"], name="storedstring_keyset_idx"),
+        ]
 
-    def save(self, *args, **kwargs):
-        computed = compute_properties(self.value)
+    @classmethod
+    def from_value(cls, value: str, sha256_hash: str = None) -> "StoredString":
+        """Build an unsaved instance with its properties already computed."""
+        stored = cls(value=value)
+        with stage("analyze"):
+            stored.set_properties(analyze_value(value, sha256_hash))
+        return stored
+
+    def set_properties(self, computed: dict):
+        """Store computed properties and mirror the indexed columns."""
+        if "_minhash" in computed:
+            # Hashed with the analysis (analyzer/offload.py), not inside the insert transaction
+            computed = dict(computed)
+            self._minhash = computed.pop("_minhash")
         # Use the SHA256 hash as ID
         self.id = computed["sha256_hash"]
-        self.properties = computed
-        super().save(*args, **kwargs)
+        self.properties = {**computed, **eager_properties(self.value, computed)}
+        self.length = computed["length"]
+        self.is_palindrome = computed["is_palindrome"]
+        self.word_count = computed["word_count"]
+        self.unique_characters = computed["unique_characters"]
+
+    def minhash(self):
+        """MinHash signature of the value (None if it can't be indexed), computed once."""
+        if "_minhash" not in self.__dict__:
+            self._minhash = signature(self.value)
+        return self._minhash
+
+    def save(self, *args, **kwargs):
+        if not self.properties:
+            self.set_properties(analyze_value(self.value))
+        adding = self._state.adding
+        if adding:
+            # A plain INSERT: a duplicate hash fails on the primary key instead
+            # of silently updating the existing row
+            kwargs.setdefault("force_insert", True)
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if adding:
+                    CharacterPosting.index(self)
+                    MinHashSignature.index(self, defer=True)
+                    search.index(self)
+                    StatCounter.record(self)
+        except IntegrityError:
+            if adding and VERIFY_HASH_COLLISIONS:
+                self.check_collision()
+            raise
+        invalidate_strings(self.id)
+
+    def check_collision(self):
+        """Raise HashCollision if the row stored under this id has a different value."""
+        stored_value = decompress_value(
+            StoredString.objects.filter(pk=self.id).values_list("value", flat=True).first()
+        )
+        if stored_value is not None and stored_value != self.value:
+            raise HashCollision(self.id)
+
+    @classmethod
+    def text_search(cls, q: str, prefix=False, offset=0, limit=None) -> list:
+        """Ids of strings containing (or, with ``prefix``, starting with) ``q``, best match first."""
+        if search.enabled():
+            return search.search(q, prefix, offset, limit)
+        matches = cls._scan_values(q, prefix)
+        return matches[offset:] if limit is None else matches[offset:offset + limit]
+
+    @classmethod
+    def text_search_count(cls, q: str, prefix=False) -> int:
+        if search.enabled():
+            return search.count(q, prefix)
+        return len(cls._scan_values(q, prefix))
+
+    @classmethod
+    def _scan_values(cls, q, prefix):
+        rows = cls.objects.values_list("pk", "value").iterator(chunk_size=2000)
+        return search.scan(((pk, decompress_value(value)) for pk, value in rows), q, prefix)
+
+    @classmethod
+    def fill_properties(cls, properties_by_id: dict, names, memoize=True) -> dict:
+        """Compute the extended properties ``names`` missing from stored rows.
+
+        ``properties_by_id`` maps ids to their (raw) properties dicts, which
+        are updated in place; only the values of rows missing something are
+        read. Returns the updated dicts by id, after saving them back to
+        their rows unless ``memoize`` is false.
+        """
+        missing = {
+            pk: [name for name in names if name not in properties]
+            for pk, properties in properties_by_id.items()
+        }
+        missing = {pk: todo for pk, todo in missing.items() if todo}
+        if not missing:
+            return {}
+        rows = cls.objects.filter(pk__in=list(missing)).values_list("pk", "value", "character_frequencies")
+        updated = {}
+        with stage("analyze"):
+            for pk, value, packed in rows:
+                properties = updated[pk] = properties_by_id[pk]
+                core = properties
+                if packed is not None and "character_frequency_map" not in properties:
+                    core = {**properties, "character_frequency_map": unpack_frequencies(packed)}
+                properties.update(compute_extended(decompress_value(value), core, missing[pk]))
+        if memoize:
+            cls.memoize_properties(updated)
+        return updated
+
+    @classmethod
+    def memoize_properties(cls, properties_by_id: dict):
+        """Save properties with newly computed extended ones back to their rows."""
+        # Extended properties never change the default response, so no cache invalidation
+        with transaction.atomic():
+            for pk, properties in properties_by_id.items():
+                cls.objects.filter(pk=pk).update(properties=properties)
+
+
+class CharacterPosting(models.Model):
+    """Inverted index entry: ``character`` occurs in ``stored_string``.
+
+    Rows are removed with their string through the cascading foreign key.
+    """
+    stored_string = models.ForeignKey(
+        StoredString, on_delete=models.CASCADE, related_name="character_postings"
+    )
+    character = models.CharField(max_length=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["character", "stored_string"], name="unique_character_posting"
+            ),
+        ]
+
+    @classmethod
+    def index(cls, *stored_strings):
+        """Create postings for each distinct character of the given strings."""
+        cls.objects.bulk_create(
+            [
+                cls(stored_string_id=stored.id, character=ch)
+                for stored in stored_strings
+                for ch in stored.properties["character_frequency_map"]
+            ],
+            ignore_conflicts=True,
+        )
+
+
+
+class MinHashSignature(models.Model):
+    """MinHash signature of a string, for similarity search (see similarity.py).
+
+    Strings whose value can't be indexed (empty, or too long) have none.
+    Strings too long to sign on the write path get theirs from the job
+    runner shortly after their insert (``index_pending``).
+    """
+    stored_string = models.OneToOneField(
+        StoredString, on_delete=models.CASCADE, primary_key=True, related_name="minhash_signature"
+    )
+    signature = models.BinaryField()
+
+    @classmethod
+    def index(cls, *stored_strings, defer=False) -> int:
+        """Store signatures and LSH buckets for newly inserted strings; returns how many.
+
+        With ``defer``, strings that aren't ``signed_inline`` are skipped and
+        the job runner is woken on commit to sign them.
+        """
+        signatures, postings = [], []
+        deferred = False
+        for stored in stored_strings:
+            if defer and not signed_inline(stored.value):
+                deferred = deferred or len(stored.value) <= SIGNATURE_MAX_LENGTH
+                continue
+            sig = stored.minhash()
+            if sig is None:
+                continue
+            signatures.append(cls(stored_string_id=stored.id, signature=pack_signature(sig)))
+            postings.extend((stored.id, bucket) for bucket in buckets(sig))
+        cls.objects.bulk_create(signatures, ignore_conflicts=True)
+        if postings:
+            # One row per band and string: skip bulk_create's per-object model overhead
+            table = connection.ops.quote_name(SimilarityBucket._meta.db_table)
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {table} (stored_string_id, bucket) VALUES (%s, %s)", postings
+                )
+        if deferred:
+            transaction.on_commit(_request_signatures)
+        return len(signatures)
+
+    @classmethod
+    def index_pending(cls, limit) -> int:
+        """Sign up to ``limit`` strings stored without their signature; returns how many.
+
+        Signatures are computed before the write transaction, which only
+        indexes the strings still unsigned (and not deleted) by then.
+        """
+        if SIGNATURE_INLINE_MAX_LENGTH is None:
+            return 0
+        rows = list(
+            StoredString.objects.filter(
+                length__gt=SIGNATURE_INLINE_MAX_LENGTH, length__lte=SIGNATURE_MAX_LENGTH,
+                minhash_signature__isnull=True,
+            ).only("id", "value")[:limit]
+        )
+        with stage("analyze"):
+            for stored in rows:
+                stored.minhash()
+        with transaction.atomic():
+            pending = set(
+                StoredString.objects.filter(
+                    pk__in=[stored.id for stored in rows], minhash_signature__isnull=True
+                ).values_list("pk", flat=True)
+            )
+            return cls.index(*(stored for stored in rows if stored.id in pending))
+
+    @classmethod
+    def search(cls, sig, k, min_similarity=0.0, exclude=None) -> list:
+        """The ``k`` most similar indexed strings as ``(similarity, id)`` pairs, best first.
+
+        Candidates share at least one LSH bucket with ``sig``; they are
+        ranked by the similarity estimated from their stored signatures.
+        """
+        candidates = SimilarityBucket.objects.filter(bucket__in=buckets(sig))
+        if exclude is not None:
+            candidates = candidates.exclude(stored_string_id=exclude)
+        candidates = (
+            candidates.values("stored_string_id").annotate(shared=models.Count("id"))
+            .order_by("-shared")[:SIMILARITY_MAX_CANDIDATES]
+        )
+        scored = []
+        rows = cls.objects.filter(stored_string__in=candidates.values("stored_string_id"))
+        for pk, data in rows.values_list("stored_string_id", "signature"):
+            score = similarity(sig, unpack_signature(data))
+            if score >= min_similarity:
+                scored.append((score, pk))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored[:k]
+
+
+def _request_signatures():
+    # jobs imports this module
+    from .jobs import request_signatures
+    request_signatures()
+
+
+class SimilarityBucket(models.Model):
+    """LSH index entry: one band of ``stored_string``'s signature hashes to ``bucket``.
+
+    Rows are removed with their string through the cascading foreign key.
+    """
+    stored_string = models.ForeignKey(
+        StoredString, on_delete=models.CASCADE, related_name="similarity_buckets"
+    )
+    bucket = models.BigIntegerField(db_index=True)
+
+
+def length_bucket(length: int) -> str:
+    """Power-of-two histogram bucket label for a string length."""
+    if length == 0:
+        return "0"
+    low = 1 << (length.bit_length() - 1)
+    high = (low << 1) - 1
+    return str(low) if low == high else f"{low}-{high}"
+
+
+class StatCounter(models.Model):
+    """One corpus-wide counter, maintained incrementally on insert and delete.
+
+    ``kind`` groups counters (totals, length buckets, word counts,
+    characters) and ``key`` names one within the group, so the whole table
+    stays small no matter how many strings are stored.
+    """
+    kind = models.CharField(max_length=32)
+    key = models.CharField(max_length=64, blank=True)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "key"], name="unique_stat_counter"),
+        ]
+
+    @staticmethod
+    def deltas(*stored_strings, sign=1) -> Counter:
+        """Counter changes caused by adding (or, with sign=-1, removing) strings."""
+        deltas = Counter()
+        for stored in stored_strings:
+            properties = stored.properties
+            deltas[("total", "strings")] += sign
+            deltas[("total", "characters")] += sign * properties["length"]
+            if properties["is_palindrome"]:
+                deltas[("total", "palindromes")] += sign
+            deltas[("length", length_bucket(properties["length"]))] += sign
+            deltas[("word_count", str(properties["word_count"]))] += sign
+            for ch, count in properties["character_frequency_map"].items():
+                deltas[("character", ch)] += sign * count
+        return deltas
+
+    @classmethod
+    def record(cls, *stored_strings, sign=1):
+        """Apply the counter changes for the given strings in one statement."""
+        deltas = cls.deltas(*stored_strings, sign=sign)
+        if not deltas:
+            return
+        table = connection.ops.quote_name(cls._meta.db_table)
+        kind, key, count = (connection.ops.quote_name(name) for name in ("kind", "key", "count"))
+        # An upsert increments atomically; the ORM can only overwrite on conflict
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {table} ({kind}, {key}, {count}) VALUES (%s, %s, %s) "
+                f"ON CONFLICT ({kind}, {key}) DO UPDATE SET {count} = {table}.{count} + excluded.{count}",
+                [(kind_, key_, delta) for (kind_, key_), delta in deltas.items() if delta],
+            )
+        if sign < 0:
+            cls.objects.filter(count__lte=0).delete()
+
+    @classmethod
+    def rebuild(cls):
+        """Recompute every counter from the stored strings."""
+        deltas = Counter()
+        rows = StoredString.objects.only("id", "properties", "character_frequencies")
+        for stored in rows.iterator(chunk_size=1000):
+            deltas.update(cls.deltas(stored))
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                [cls(kind=kind, key=key, count=count) for (kind, key), count in deltas.items() if count]
+            )
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """Current corpus statistics, read from the counter table only."""
+        groups = {"total": {}, "length": {}, "word_count": {}, "character": {}}
+        for kind, key, count in cls.objects.values_list("kind", "key", "count"):
+            groups.setdefault(kind, {})[key] = count
+
+        totals = groups["total"]
+        total_strings = totals.get("strings", 0)
+
+        def by_number(item):
+            return int(item[0].split("-")[0])
+
+        return {
+            "total_strings": total_strings,
+            "palindromes": totals.get("palindromes", 0),
+            "average_length": totals.get("characters", 0) / total_strings if total_strings else None,
+            "length_histogram": dict(sorted(groups["length"].items(), key=by_number)),
+            "word_count_distribution": dict(sorted(groups["word_count"].items(), key=by_number)),
+            "character_frequencies": dict(
+                sorted(groups["character"].items(), key=lambda item: -item[1])
+            ),
+        }
+
+
+class AnalysisJob(models.Model):
+    """Strings queued for background analysis, see analyzer.jobs."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(PENDING, "Pending"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=PENDING)
+    # Items as accepted by the bulk endpoint: strings or {"value": ...} objects
+    payload = models.JSONField()
+    # One ingest result per payload item; while running, those stored so far (None for the rest)
+    results = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="analysisjob_queue_idx"),
+        ]
@@ -0,0 +1,151 @@
+"""Keep CPU-heavy analysis off request threads and the event loop.
+
+Values from ANALYZER_PROCESS_MIN_LENGTH characters up are analyzed in a
+shared, bounded process pool, handing the bytes over through shared memory
+so a large request no longer holds the worker's GIL. The async views also
+move medium-sized work onto a thread so the event loop stays responsive.
+The MinHash signature for the similarity index is computed with the
+properties, so it takes the same route, unless the value is long enough to
+be left to the job runner (ANALYZER_SIMILARITY_INLINE_MAX_LENGTH).
+"""
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import logging
+import os
+import threading
+
+from django.conf import settings
+from .analysis import compute_properties, compute_shared_properties
+from .similarity import signature, signed_inline
+
+logger = logging.getLogger(__name__)
+
+# Strings shorter than this are analyzed inline; the hop costs more than the work
+OFFLOAD_MIN_LENGTH = getattr(settings, "ANALYZER_OFFLOAD_MIN_LENGTH", 64 * 1024)
+# Bounds how many large analyses run at once per worker process
+ANALYSIS_WORKERS = getattr(settings, "ANALYZER_ANALYSIS_WORKERS", 4)
+# Strings at least this long go to the process pool; None disables it
+PROCESS_MIN_LENGTH = getattr(settings, "ANALYZER_PROCESS_MIN_LENGTH", 1024 * 1024)
+PROCESS_WORKERS = getattr(settings, "ANALYZER_PROCESS_WORKERS", 2)
+# MinHashing is pure Python (about 0.5 us per character), so values signed on
+# the write path leave the event loop much sooner than the C-level analysis needs to
+SIGNATURE_OFFLOAD_MIN_LENGTH = getattr(settings, "ANALYZER_SIGNATURE_OFFLOAD_MIN_LENGTH", 2048)
+
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+
+_process_pool = None
+_process_pool_pid = None
+_process_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """The per-process analysis pool (a ProcessPoolExecutor), created on first use."""
+    global _process_pool, _process_pool_pid
+    # multiprocessing is only loaded by processes that start a pool
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    with _process_pool_lock:
+        # A pool inherited across fork (gunicorn --preload) belongs to the parent
+        if _process_pool is None or _process_pool_pid != os.getpid():
+            # spawn: forking a threaded server process is unsafe
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PROCESS_WORKERS, mp_context=get_context("spawn")
+            )
+            _process_pool_pid = os.getpid()
+            # Before interpreter teardown, while multiprocessing is still loaded
+            atexit.register(shutdown_process_pool)
+        return _process_pool
+
+
+def warm_process_pool():
+    """Start every pool worker now so the first large request doesn't pay for it."""
+    if PROCESS_MIN_LENGTH is None:
+        return
+    pool = get_process_pool()
+    for future in [pool.submit(compute_properties, "") for _ in range(PROCESS_WORKERS)]:
+        future.result()
+
+
+def shutdown_process_pool():
+    """Stop this process's pool, e.g. in a preloading parent before it forks workers."""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool_pid == os.getpid():
+            _process_pool.shutdown()
+        _process_pool = None
+
+
+def _reset_process_pool():
+    global _process_pool
+    with _process_pool_lock:
+        _process_pool = None
+
+
+def analyze(value: str, sha256_hash: str = None) -> dict:
+    """``compute_properties`` plus the value's MinHash signature under ``"_minhash"``.
+
+    The signature is for the similarity index, not a stored property;
+    ``StoredString.set_properties`` takes it back out. Values the job runner
+    signs after their insert get none.
+    """
+    computed = compute_properties(value, sha256_hash)
+    if signed_inline(value):
+        computed["_minhash"] = signature(value)
+    return computed
+
+
+def analyze_value(value: str, sha256_hash: str = None) -> dict:
+    """``analyze``, in the process pool when ``value`` is large."""
+    if PROCESS_MIN_LENGTH is None or len(value) < PROCESS_MIN_LENGTH:
+        return analyze(value, sha256_hash)
+
+    from concurrent.futures.process import BrokenProcessPool
+    from multiprocessing import shared_memory
+
+    data = value.encode("utf-8")
+    size = len(data)
+    try:
+        shm = shared_memory.SharedMemory(create=True, size=size)
+    except OSError:
+        logger.warning("Shared memory unavailable; analyzing %d characters inline", len(value))
+        return analyze(value, sha256_hash)
+
+    try:
+        shm.buf[:size] = data
+        del data
+        future = get_process_pool().submit(
+            compute_shared_properties, shm.name, size, sha256_hash, analyze
+        )
+        return future.result()
+    except BrokenProcessPool:
+        logger.exception("Analysis pool broke; analyzing inline and recreating it")
+        _reset_process_pool()
+        return analyze(value, sha256_hash)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+async def _run(func, *args, min_length=OFFLOAD_MIN_LENGTH):
+    if len(args[0]) < min_length:
+        return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+
+
+def _hash(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+async def ahash_value(value: str) -> str:
+    """SHA-256 hex digest of ``value``, off the event loop when large."""
+    return await _run(_hash, value)
+
+
+async def acompute_properties(value: str, sha256_hash: str = None) -> dict:
+    """``analyze_value`` off the event loop when ``value`` is large."""
+    min_length = OFFLOAD_MIN_LENGTH
+    if signed_inline(value):
+        min_length = min(min_length, SIGNATURE_OFFLOAD_MIN_LENGTH)
+    return await _run(analyze_value, value, sha256_hash, min_length=min_length)
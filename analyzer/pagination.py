@@ -0,0 +1,179 @@
+import base64
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from .projection import FULL
+from .renderers import dumps
+
+DEFAULT_PAGE_SIZE = getattr(settings, "ANALYZER_PAGE_SIZE", 100)
+MAX_PAGE_SIZE = getattr(settings, "ANALYZER_MAX_PAGE_SIZE", 1000)
+# Rows fetched per database round-trip while streaming an export
+STREAM_CHUNK_SIZE = getattr(settings, "ANALYZER_STREAM_CHUNK_SIZE", 2000)
+
+# Matches the model's -created_at ordering, with id as a unique tie-breaker
+KEYSET_ORDERING = ("-created_at", "-id")
+
+
+def encode_cursor(obj) -> str:
+    """Opaque cursor pointing just past ``obj`` (an instance or a values() row) in keyset order."""
+    created_at, pk = (obj["created_at"], obj["id"]) if isinstance(obj, dict) else (obj.created_at, obj.id)
+    raw = f"{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    """Return the ``(created_at, id)`` pair encoded in ``cursor``."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, pk = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), pk
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Opaque cursor for ranked results, which have no keyset to seek on."""
+    return base64.urlsafe_b64encode(f"offset|{offset}".encode("ascii")).decode("ascii")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        kind, offset = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("ascii").split("|", 1)
+        offset = int(offset)
+    except ValueError:
+        raise ValueError("Invalid cursor.")
+    if kind != "offset" or offset < 0:
+        raise ValueError("Invalid cursor.")
+    return offset
+
+
+def page_size(limit=None) -> int:
+    """Validated ``limit`` parameter, capped at MAX_PAGE_SIZE."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 0
+    if limit < 1:
+        raise ValueError("'limit' must be a positive integer.")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _page(queryset, limit=None, cursor=None):
+    """Return the ``limit + 1`` row slice for one keyset page, and ``limit``."""
+    limit = page_size(limit)
+    queryset = queryset.order_by(*KEYSET_ORDERING)
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+    # One extra row tells whether another page follows
+    return queryset[:limit + 1], limit
+
+
+def _split_page(rows, limit):
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def paginate(queryset, limit=None, cursor=None):
+    """Return ``(rows, next_cursor)`` for one keyset page of ``queryset``.
+
+    Seeks directly to the cursor position using the (created_at, id) index,
+    so deep pages cost the same as the first one.
+    """
+    page, limit = _page(queryset, limit, cursor)
+    return _split_page(list(page), limit)
+
+
+async def apaginate(queryset, limit=None, cursor=None):
+    """Async ORM counterpart of ``paginate``."""
+    page, limit = _page(queryset, limit, cursor)
+    return _split_page([obj async for obj in page], limit)
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _rendered(queryset, projection):
+    """Rendered rows of ``queryset``, read in chunks.
+
+    Extended properties are filled per chunk but saved only once the scan
+    is done: SQLite gives no guarantees for writes to a table while a
+    cursor over it is open on the same connection.
+    """
+    rows = projection.apply(queryset).iterator(chunk_size=STREAM_CHUNK_SIZE)
+    if not projection.extended:
+        for row in rows:
+            yield projection.render(row)
+        return
+    updated = {}
+    for chunk in _chunks(rows, STREAM_CHUNK_SIZE):
+        updated.update(projection.fill(chunk, memoize=False))
+        for row in chunk:
+            yield projection.render(row)
+    projection.memoize(updated)
+
+
+async def _arendered(queryset, projection):
+    rows = projection.apply(queryset).aiterator(chunk_size=STREAM_CHUNK_SIZE)
+    if not projection.extended:
+        async for row in rows:
+            yield projection.render(row)
+        return
+    updated, chunk = {}, []
+    async for row in rows:
+        chunk.append(row)
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            updated.update(await sync_to_async(projection.fill)(chunk, memoize=False))
+            for row in chunk:
+                yield projection.render(row)
+            chunk = []
+    updated.update(await sync_to_async(projection.fill)(chunk, memoize=False))
+    for row in chunk:
+        yield projection.render(row)
+    await sync_to_async(projection.memoize)(updated)
+
+
+def stream_ndjson(queryset, projection=FULL):
+    """Yield one serialized string per line without loading the queryset."""
+    for data in _rendered(queryset, projection):
+        yield dumps(data) + b"\n"
+
+
+def stream_json(queryset, applied_filters, projection=FULL):
+    """Yield the regular list response as chunks, counting rows as they go."""
+    count = 0
+    yield b'{"data":['
+    for data in _rendered(queryset, projection):
+        yield (b"," if count else b"") + dumps(data)
+        count += 1
+    yield b'],"count":%d,"filters_applied":%s}' % (count, dumps(applied_filters))
+
+
+async def astream_ndjson(queryset, projection=FULL):
+    """Async counterpart of ``stream_ndjson`` for ASGI responses."""
+    async for data in _arendered(queryset, projection):
+        yield dumps(data) + b"\n"
+
+
+async def astream_json(queryset, applied_filters, projection=FULL):
+    """Async counterpart of ``stream_json`` for ASGI responses."""
+    count = 0
+    yield b'{"data":['
+    async for data in _arendered(queryset, projection):
+        yield (b"," if count else b"") + dumps(data)
+        count += 1
+    yield b'],"count":%d,"filters_applied":%s}' % (count, dumps(applied_filters))
@@ -0,0 +1,74 @@
+import io
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from .renderers import FastJSONRenderer, has_float, orjson
+
+_UTF8 = ("utf-8", "utf8")
+
+
+def loads(data: bytes, encoding: str = "utf-8"):
+    """Decode a JSON document, with orjson when installed.
+
+    Anything orjson rejects, and documents with floats (which may be large
+    integers orjson rounded), go through the stdlib, so results and error
+    messages are the same as ``json.loads``.
+    """
+    if orjson is not None and encoding.lower() in _UTF8:
+        try:
+            parsed = orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+        else:
+            # orjson reads integers beyond 64 bits as floats
+            if not has_float(parsed):
+                return parsed
+    return json.loads(data.decode(encoding))
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser that decodes with orjson when available."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower() not in _UTF8:
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        try:
+            parsed = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            # orjson is stricter (e.g. lone surrogates); the stdlib parser
+            # accepts what it always did and words the errors as before
+            pass
+        else:
+            # Floats may be integers beyond 64 bits that orjson rounded
+            if not has_float(parsed):
+                return parsed
+        return super().parse(io.BytesIO(body), media_type, parser_context)
+
+
+class NDJSONParser(BaseParser):
+    """Parse a newline-delimited JSON body into a list, one item per line."""
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        items = []
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                items.append(loads(line, encoding))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {exc}")
+        return items
@@ -0,0 +1,195 @@
+"""Field projection for string responses (``fields=`` / ``exclude=`` / ``properties=``).
+
+A Projection names the response fields to return, as top-level fields (id,
+value, properties, created_at) or individual property names. It is pushed
+down into ``QuerySet.values()``, so only the needed columns are read: the
+indexed properties come from their mirrored columns, and the properties
+JSON and value are only loaded when asked for. Rows are rendered straight
+from those dicts, producing the same output as StoredStringSerializer.
+Extended properties (see ``extended.py``) are included when named in
+``properties=``; ``render_all`` computes and memoizes missing ones first.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601
+from rest_framework.fields import DateTimeField
+from asgiref.sync import sync_to_async
+from rest_framework.settings import api_settings
+from .extended import ANALYZERS, CORE_PROPERTIES
+from .fields import FREQUENCY_MAP_KEY, decompress_value, unpack_frequencies
+from .models import StoredString
+
+FIELDS = ("id", "value", "properties", "created_at")
+PROPERTY_FIELDS = CORE_PROPERTIES
+# Properties readable from their own column instead of the JSON blob
+PROPERTY_COLUMNS = {
+    "length": "length",
+    "is_palindrome": "is_palindrome",
+    "unique_characters": "unique_characters",
+    "word_count": "word_count",
+    "sha256_hash": "id",
+}
+
+_created_at = DateTimeField()
+
+
+def _names(params, name):
+    """Comma-separated names from a (possibly repeated) query parameter."""
+    return [item.strip() for raw in params.getlist(name) for item in raw.split(",") if item.strip()]
+
+
+class Projection:
+    def __init__(self, fields=FIELDS, properties=PROPERTY_FIELDS, extended=()):
+        self.properties = tuple(name for name in PROPERTY_FIELDS if name in properties)
+        self.extended = tuple(name for name in ANALYZERS if name in extended)
+        fields = set(fields) - {"properties"}
+        if self.properties or self.extended:
+            fields.add("properties")
+        self.fields = tuple(name for name in FIELDS if name in fields)
+        self.is_full = (
+            self.fields == FIELDS and self.properties == PROPERTY_FIELDS and not self.extended
+        )
+
+        # The JSON blob is only needed for the frequency map and extended properties
+        self._from_json = FREQUENCY_MAP_KEY in self.properties or bool(self.extended)
+        self._renderers = [(name, getattr(self, f"_render_{name}")) for name in self.fields]
+
+    @classmethod
+    def from_params(cls, params) -> "Projection":
+        """Build a projection from ``fields`` / ``exclude`` / ``properties`` query parameters.
+
+        ``properties`` names exactly the core and extended properties to
+        return. Raises ValueError for unknown names.
+        """
+        fields, exclude = _names(params, "fields"), _names(params, "exclude")
+        requested = _names(params, "properties")
+        for name in fields + exclude:
+            if name not in FIELDS and name not in PROPERTY_FIELDS:
+                raise ValueError(f"Unknown field '{name}'.")
+        for name in requested:
+            if name not in PROPERTY_FIELDS and name not in ANALYZERS:
+                raise ValueError(f"Unknown property '{name}'.")
+
+        if fields:
+            selected = {name for name in fields if name in FIELDS}
+            properties = {name for name in fields if name in PROPERTY_FIELDS}
+            if "properties" in selected:
+                properties.update(PROPERTY_FIELDS)
+        else:
+            selected, properties = set(FIELDS), set(PROPERTY_FIELDS)
+        extended = set()
+        if requested:
+            properties = {name for name in requested if name in PROPERTY_FIELDS}
+            extended = {name for name in requested if name in ANALYZERS}
+
+        for name in exclude:
+            if name == "properties":
+                properties.clear()
+                extended.clear()
+            selected.discard(name)
+            properties.discard(name)
+        return cls(selected, properties, extended)
+
+    def cache_options(self) -> dict:
+        """Extra ``query_cache_key`` options identifying this projection."""
+        if self.is_full:
+            return {}
+        options = {"fields": self.fields, "properties": self.properties}
+        if self.extended:
+            options["extended"] = self.extended
+        return options
+
+    def columns(self) -> list:
+        # id and created_at are always read: keyset cursors are built from them
+        columns = ["id", "created_at"]
+        if "value" in self.fields:
+            columns.append("value")
+        if self._from_json:
+            columns += ["properties", "character_frequencies"]
+        else:
+            columns += [
+                PROPERTY_COLUMNS[name] for name in self.properties
+                if PROPERTY_COLUMNS[name] not in columns
+            ]
+        return columns
+
+    def apply(self, queryset):
+        """Narrow a StoredString queryset to the columns this projection reads."""
+        return queryset.values(*self.columns())
+
+    def render(self, row: dict) -> dict:
+        """Response dict for one row of ``apply()``; see ``render_all`` for extended properties."""
+        return {name: render(row) for name, render in self._renderers}
+
+    def fill(self, rows, memoize=True) -> dict:
+        """Compute requested extended properties missing from ``rows`` (in place).
+
+        Returns the updated properties by id; see ``StoredString.fill_properties``.
+        """
+        if not self.extended or not rows:
+            return {}
+        return StoredString.fill_properties(
+            {row["id"]: row["properties"] for row in rows}, self.extended, memoize=memoize
+        )
+
+    def memoize(self, properties_by_id: dict):
+        """Save properties returned by ``fill(..., memoize=False)``."""
+        if properties_by_id:
+            StoredString.memoize_properties(properties_by_id)
+
+    def render_all(self, rows) -> list:
+        """Render rows of ``apply()``, filling in extended properties first."""
+        if self.extended:
+            rows = list(rows)
+            self.fill(rows)
+        return [self.render(row) for row in rows]
+
+    async def arender_all(self, rows: list) -> list:
+        if self.extended:
+            await sync_to_async(self.fill)(rows)
+        return [self.render(row) for row in rows]
+
+    def project(self, data: dict) -> dict:
+        """Narrow an already serialized (full) response dict."""
+        if self.is_full:
+            return data
+        projected = {name: data[name] for name in self.fields}
+        if "properties" in projected and self.properties != PROPERTY_FIELDS:
+            projected["properties"] = {
+                name: value for name, value in data["properties"].items() if name in self.properties
+            }
+        return projected
+
+    def _render_id(self, row):
+        return row["id"]
+
+    def _render_value(self, row):
+        return decompress_value(row["value"])
+
+    def _render_created_at(self, row):
+        value = row["created_at"]
+        if api_settings.DATETIME_FORMAT != ISO_8601:
+            return _created_at.to_representation(value)
+        # DRF's ISO 8601 output without its per-value field machinery
+        if settings.USE_TZ:
+            value = value.astimezone(timezone.get_current_timezone())
+        text = value.isoformat()
+        return text[:-6] + "Z" if text.endswith("+00:00") else text
+
+    def _render_properties(self, row):
+        if not self._from_json:
+            return {name: row[PROPERTY_COLUMNS[name]] for name in self.properties}
+        properties = row["properties"]
+        if (FREQUENCY_MAP_KEY in self.properties and FREQUENCY_MAP_KEY not in properties
+                and row["character_frequencies"] is not None):
+            properties[FREQUENCY_MAP_KEY] = unpack_frequencies(row["character_frequencies"])
+        if self.properties == PROPERTY_FIELDS and len(properties) == len(PROPERTY_FIELDS) and not self.extended:
+            return properties
+        # Stored order for the core properties, then the requested extended ones
+        rendered = {name: value for name, value in properties.items() if name in self.properties}
+        for name in self.extended:
+            rendered[name] = properties[name]
+        return rendered
+
+
+FULL = Projection()
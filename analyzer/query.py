@@ -0,0 +1,259 @@
+"""Natural-language query planner.
+
+Queries are normalized, parsed with precompiled patterns into a flat filter
+plan, and memoized so repeated queries skip parsing. The plan uses the same
+keys as the GET /strings parameters and is applied through ``apply_filters``,
+the indexed filter path shared with ``StringsView``.
+"""
+from functools import lru_cache
+import re
+
+from django.conf import settings
+from .models import CharacterPosting, character_variants
+
+PLAN_CACHE_SIZE = getattr(settings, "ANALYZER_NL_PLAN_CACHE_SIZE", 1024)
+
+NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+    "eleven": 11, "twelve": 12, "twenty": 20,
+}
+_NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_PALINDROME_RE = re.compile(
+    r"\b(non[- ]?|(?:not|isn't|aren't)\s+(?:an?\s+)?)?palindrom(?:e|es|ic)\b"
+)
+_SINGLE_WORD_RE = re.compile(r"\b(?:single|one)[- ]word\b")
+_BETWEEN_RE = re.compile(
+    rf"\bbetween\s+{_NUMBER}\s+and\s+{_NUMBER}\s+(characters?|chars?|letters?|words?)\b"
+)
+_COMPARISON_RE = re.compile(
+    r"\b(?:(longer than|shorter than|more than|greater than|fewer than|less than|over|under"
+    rf"|at least|at most|exactly)\s+)?{_NUMBER}\s+(characters?|chars?|letters?|words?)\b"
+)
+# "longer than 10" with the unit left implicit
+_BARE_LENGTH_RE = re.compile(rf"\b(longer|shorter) than\s+{_NUMBER}\b")
+_LETTERS_RE = re.compile(
+    r"\b(without|with no|no|not containing|excluding|(?:doesn't|don't|does not|do not) contain)?"
+    r"(?:\s+(?:the|any))?\s*(?:letters?|characters?)\s+"
+    r"([a-z0-9](?:\s*(?:,|and|&)\s*[a-z0-9])*)(?![a-z0-9])"
+)
+# Negations left over once the phrases above are consumed were not understood
+_NEGATION_RE = re.compile(r"\b(?:not|non|no|none|without|excluding|isn't|aren't|doesn't|don't)\b")
+# Likewise an "or" left over: the plan can only AND its filters together
+_DISJUNCTION_RE = re.compile(r"\bor\b")
+_LETTER_TOKEN_RE = re.compile(r"(?<![a-z0-9])[a-z0-9](?![a-z0-9])")
+_FIRST_VOWEL_RE = re.compile(r"\bfirst vowel\b")
+
+# Comparator -> (bound, offset) for an inclusive min/max
+_COMPARATORS = {
+    "longer than": ("min", 1), "more than": ("min", 1), "greater than": ("min", 1), "over": ("min", 1),
+    "shorter than": ("max", -1), "fewer than": ("max", -1), "less than": ("max", -1), "under": ("max", -1),
+    "at least": ("min", 0), "at most": ("max", 0),
+}
+
+
+class ConflictingFilters(ValueError):
+    """The query parsed, but its filters can never match together."""
+
+
+class UnsupportedNegation(ValueError):
+    """The query negates something the planner can't express.
+
+    Dropping the negation would return the opposite result set.
+    """
+
+
+class UnsupportedDisjunction(ValueError):
+    """The query asks for one filter or another.
+
+    Dropping the alternative would silently return a narrower result set.
+    """
+
+
+def normalize_query(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _number(token: str) -> int:
+    return NUMBER_WORDS[token] if token in NUMBER_WORDS else int(token)
+
+
+def _narrow(plan, field, low=None, high=None):
+    """Intersect the plan's [min_field, max_field] range with [low, high]."""
+    if low is not None:
+        plan[f"min_{field}"] = max(low, plan.get(f"min_{field}", low))
+    if high is not None:
+        plan[f"max_{field}"] = min(high, plan.get(f"max_{field}", high))
+
+
+def _unit_field(unit: str) -> str:
+    return "word_count" if unit.startswith("word") else "length"
+
+
+def parse_query(text: str) -> dict:
+    """Parse a natural-language query into a filter plan.
+
+    Returns a new dict each call (the memoized plan is never handed out).
+    Raises ConflictingFilters for contradictory queries,
+    UnsupportedNegation for negations it can't apply and
+    UnsupportedDisjunction for "or"; an empty plan means nothing was
+    understood.
+    """
+    return dict(_parse(normalize_query(text)))
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def _parse(query: str) -> tuple:
+    plan = {}
+
+    palindrome = _PALINDROME_RE.findall(query)
+    if palindrome:
+        wanted = {not negation for negation in palindrome}
+        if len(wanted) > 1:
+            raise ConflictingFilters("Query asks for both palindromic and non-palindromic strings.")
+        plan["is_palindrome"] = wanted.pop()
+        query = _PALINDROME_RE.sub(" ", query)
+
+    if _SINGLE_WORD_RE.search(query):
+        _narrow(plan, "word_count", 1, 1)
+
+    for low, high, unit in _BETWEEN_RE.findall(query):
+        low, high = sorted((_number(low), _number(high)))
+        _narrow(plan, _unit_field(unit), low, high)
+    # Drop consumed phrases so "and 10 characters" isn't re-read as an exact length
+    query = _BETWEEN_RE.sub(" ", query)
+
+    for comparator, number, unit in _COMPARISON_RE.findall(query):
+        field, number = _unit_field(unit), _number(number)
+        if comparator in _COMPARATORS:
+            bound, offset = _COMPARATORS[comparator]
+            if bound == "min":
+                _narrow(plan, field, low=number + offset)
+            else:
+                _narrow(plan, field, high=number + offset)
+        else:
+            _narrow(plan, field, number, number)
+    query = _COMPARISON_RE.sub(" ", query)
+
+    for comparator, number in _BARE_LENGTH_RE.findall(query):
+        if comparator == "longer":
+            _narrow(plan, "length", low=_number(number) + 1)
+        else:
+            _narrow(plan, "length", high=_number(number) - 1)
+
+    contains, excludes = [], []
+    for negation, letters in _LETTERS_RE.findall(query):
+        target = excludes if negation else contains
+        target.extend(ch for ch in _LETTER_TOKEN_RE.findall(letters) if ch not in target)
+    query = _LETTERS_RE.sub(" ", query)
+    negation = _NEGATION_RE.search(query)
+    if negation:
+        raise UnsupportedNegation(f"Can't apply '{negation.group()}' in this query.")
+    if _DISJUNCTION_RE.search(query):
+        raise UnsupportedDisjunction(
+            "Can't apply 'or' in this query; filters can only be combined with 'and'."
+        )
+    if _FIRST_VOWEL_RE.search(query) and "a" not in contains:
+        contains.append("a")
+    if set(contains) & set(excludes):
+        raise ConflictingFilters("Query both requires and excludes the same letter.")
+    # A lone character is reported as a plain string, like the GET /strings parameter
+    if contains:
+        plan["contains_character"] = contains[0] if len(contains) == 1 else tuple(contains)
+    if excludes:
+        plan["excludes_character"] = excludes[0] if len(excludes) == 1 else tuple(excludes)
+    if contains or excludes:
+        plan["ignore_case"] = True
+
+    for field in ("length", "word_count"):
+        low, high = plan.get(f"min_{field}"), plan.get(f"max_{field}")
+        if low is not None and high is not None and low > high:
+            raise ConflictingFilters(f"Query asks for an empty {field.replace('_', ' ')} range.")
+        # An exact bound reads better as the plain parameter
+        if low is not None and low == high and field == "word_count":
+            del plan["min_word_count"], plan["max_word_count"]
+            plan["word_count"] = low
+
+    return tuple(plan.items())
+
+
+def filters_from_params(params):
+    """Read GET /strings query parameters, returning (filters, applied_filters).
+
+    ``filters`` is the normalized plan for ``apply_filters``;
+    ``applied_filters`` echoes the raw parameters back to the client.
+    """
+    filters = {}
+    applied_filters = {}
+
+    # is_palindrome filter
+    is_palindrome = params.get("is_palindrome")
+    if is_palindrome is not None:
+        filters["is_palindrome"] = str(is_palindrome).lower() in ["true", "1", "yes", "on"]
+        applied_filters["is_palindrome"] = is_palindrome
+
+    # Integer range filters; unparseable values are ignored
+    for name in ["min_length", "max_length", "word_count", "min_word_count", "max_word_count"]:
+        raw = params.get(name)
+        if raw is None:
+            continue
+        try:
+            filters[name] = int(raw)
+        except ValueError:
+            continue
+        applied_filters[name] = raw
+
+    # Character filters (repeat a parameter to require several)
+    for name in ["contains_character", "excludes_character"]:
+        chars = [ch for ch in params.getlist(name) if len(ch) == 1]
+        if chars:
+            filters[name] = chars
+            applied_filters[name] = chars[0] if len(chars) == 1 else chars
+
+    if filters.get("contains_character") or filters.get("excludes_character"):
+        ignore_case = params.get("ignore_case")
+        filters["ignore_case"] = str(ignore_case).lower() in ["true", "1", "yes", "on"]
+        if filters["ignore_case"]:
+            applied_filters["ignore_case"] = ignore_case
+
+    return filters, applied_filters
+
+
+def apply_filters(queryset, filters: dict):
+    """Apply a filter plan to a StoredString queryset using indexed lookups.
+
+    Keys mirror the GET /strings parameters: is_palindrome, min_length,
+    max_length, word_count, min_word_count, max_word_count, ignore_case, and
+    contains_character / excludes_character (one character or a sequence).
+    """
+    if "is_palindrome" in filters:
+        queryset = queryset.filter(is_palindrome=filters["is_palindrome"])
+    if "min_length" in filters:
+        queryset = queryset.filter(length__gte=filters["min_length"])
+    if "max_length" in filters:
+        queryset = queryset.filter(length__lte=filters["max_length"])
+    if "word_count" in filters:
+        queryset = queryset.filter(word_count=filters["word_count"])
+    if "min_word_count" in filters:
+        queryset = queryset.filter(word_count__gte=filters["min_word_count"])
+    if "max_word_count" in filters:
+        queryset = queryset.filter(word_count__lte=filters["max_word_count"])
+
+    ignore_case = filters.get("ignore_case", False)
+    contains = filters.get("contains_character") or ()
+    if isinstance(contains, str):
+        contains = [contains]
+    if contains:
+        queryset = queryset.containing_characters(contains, ignore_case=ignore_case)
+
+    excludes = filters.get("excludes_character") or ()
+    if isinstance(excludes, str):
+        excludes = [excludes]
+    for ch in excludes:
+        postings = CharacterPosting.objects.filter(
+            character__in=character_variants(ch, ignore_case)
+        )
+        queryset = queryset.exclude(pk__in=postings.values("stored_string"))
+    return queryset
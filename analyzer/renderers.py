@@ -0,0 +1,84 @@
+"""JSON rendering through orjson when it is installed.
+
+Output is byte-for-byte what DRF's JSONRenderer produces with the default
+settings (compact separators, unescaped unicode, U+2028/U+2029 escaped,
+datetimes in ISO 8601 with "Z" for UTC). Values orjson can't encode go
+through DRF's encoder; payloads orjson would write differently (floats
+outside [1e-4, 1e16), integers beyond 64 bits) use the stdlib path.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .metrics import stage
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+_encoder = JSONEncoder()
+# Datetimes go through DRF's encoder, which writes UTC as "Z" and keeps microseconds
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+_stdlib_renderer = JSONRenderer()
+
+
+def has_float(obj, unsafe_only=False) -> bool:
+    """True if ``obj`` holds a float (with ``unsafe_only``, one orjson formats differently).
+
+    orjson and ``repr()`` agree on floats in [1e-4, 1e16); outside that
+    range (and for NaN/infinity, which DRF rejects) the stdlib path is used.
+    """
+    if isinstance(obj, dict):
+        items = obj.values()
+    elif isinstance(obj, (list, tuple)):
+        items = obj
+    elif isinstance(obj, float):
+        return not unsafe_only or not (obj == 0 or 1e-4 <= abs(obj) < 1e16)
+    else:
+        return False
+    for item in items:
+        kind = type(item)
+        # Scalars dominate our payloads; skip them without a call
+        if kind is str or kind is int or kind is bool or item is None:
+            continue
+        if has_float(item, unsafe_only):
+            return True
+    return False
+
+
+def _escape_line_separators(content: bytes) -> bytes:
+    # Same as JSONRenderer: keep the output safe to embed in JavaScript
+    return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+def dumps(data) -> bytes:
+    """Encode ``data`` exactly as the API's JSON responses are rendered."""
+    if orjson is not None and not has_float(data, unsafe_only=True):
+        try:
+            return _escape_line_separators(
+                orjson.dumps(data, default=_encoder.default, option=_ORJSON_OPTIONS)
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib path handles (or reports) them
+            pass
+    return _stdlib_renderer.render(data)
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when available."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        # orjson only does compact, unescaped output
+        if (orjson is None or indent is not None or not self.compact or self.ensure_ascii
+                or has_float(data, unsafe_only=True)):
+            with stage("render"):
+                return super().render(data, accepted_media_type, renderer_context)
+        with stage("render"):
+            try:
+                return _escape_line_separators(
+                    orjson.dumps(data, default=self.encoder_class().default, option=_ORJSON_OPTIONS)
+                )
+            except orjson.JSONEncodeError:
+                return super().render(data, accepted_media_type, renderer_context)
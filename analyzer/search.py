@@ -0,0 +1,159 @@
+"""Substring and prefix search over stored values.
+
+On SQLite every value is indexed in a contentless FTS5 table using the
+trigram tokenizer, kept in sync on insert and delete. The table holds only
+the index, not another copy of the values: each entry's rowid is the first
+64 bits of its string's SHA-256 id, and matches are resolved to their
+stored strings through the primary-key index. A query of three or more
+characters becomes a phrase of its trigrams, so only the index entries for
+those trigrams are read; ``^`` anchors the phrase at the start of the value
+for prefix queries. Matches are ranked with FTS5's bm25 (values with more
+occurrences relative to their length first) and matching ignores case.
+
+Shorter queries have no trigram to look up and fall back to ``LIKE`` over
+the stored strings, shortest values first (with ASCII-only case folding);
+compressed values are decompressed and tested in Python. Other databases,
+or ``ANALYZER_SEARCH_ENGINE = "scan"``, test every stored value in Python
+instead.
+"""
+from contextlib import closing
+from itertools import islice
+import string
+
+from django.conf import settings
+from django.db import connection
+from .fields import decompress_value
+
+# "fts5" (SQLite only) or "scan"
+ENGINE = getattr(settings, "ANALYZER_SEARCH_ENGINE", "fts5")
+TABLE = "analyzer_search_index"
+# StoredString's table (models imports this module)
+STRINGS_TABLE = "analyzer_storedstring"
+# The trigram tokenizer can't match anything shorter
+MIN_INDEXED_LENGTH = 3
+
+# The ids starting with an entry's rowid in hex: its string's, barring a 64-bit collision
+_STRINGS_JOIN = (
+    f"JOIN {STRINGS_TABLE} AS stored ON stored.id >= printf('%016x', {TABLE}.rowid) "
+    f"AND stored.id < printf('%016x', {TABLE}.rowid) || 'g'"
+)
+# What LIKE folds: ASCII letters only
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def enabled(conn=connection) -> bool:
+    """True if values are kept in the FTS5 table on this connection."""
+    return ENGINE == "fts5" and conn.vendor == "sqlite"
+
+
+def create_table(conn=connection):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} "
+            "USING fts5(value, content='', tokenize='trigram')"
+        )
+
+
+def drop_table(conn=connection):
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+def rowid(pk: str) -> int:
+    """FTS rowid for a string id: the first 64 bits of its SHA-256 hash, signed."""
+    return int.from_bytes(bytes.fromhex(pk[:16]), "big", signed=True)
+
+
+def index(*stored_strings, conn=connection):
+    """Add newly inserted strings to the search table."""
+    if not stored_strings or not enabled(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {TABLE} (rowid, value) VALUES (%s, %s)",
+            [(rowid(stored.id), stored.value) for stored in stored_strings],
+        )
+
+
+def remove(*stored_strings, conn=connection):
+    """Drop deleted strings from the search table.
+
+    A contentless table can only forget an entry given the value it indexed.
+    """
+    if not stored_strings or not enabled(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {TABLE} ({TABLE}, rowid, value) VALUES ('delete', %s, %s)",
+            [(rowid(stored.id), stored.value) for stored in stored_strings],
+        )
+
+
+def _match(q: str, prefix: bool) -> str:
+    phrase = '"' + q.replace('"', '""') + '"'
+    return "^" + phrase if prefix else phrase
+
+
+def _like_matches(q: str, prefix: bool):
+    """Ids of strings containing (or starting with) a short ``q``, shortest values first.
+
+    ``LIKE`` tests the values stored as text; compressed ones are read
+    back and tested here, with the same ASCII-only case folding.
+    """
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = escaped + "%" if prefix else "%" + escaped + "%"
+    folded = q.translate(_ASCII_LOWER)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, CASE WHEN typeof(value) = 'blob' THEN value END FROM {STRINGS_TABLE} "
+            "WHERE typeof(value) = 'blob' OR value LIKE %s ESCAPE '\\' ORDER BY length, id",
+            [pattern],
+        )
+        for pk, compressed in cursor:
+            if compressed is not None:
+                value = decompress_value(compressed).translate(_ASCII_LOWER)
+                if not (value.startswith(folded) if prefix else folded in value):
+                    continue
+            yield pk
+
+
+def search(q: str, prefix=False, offset=0, limit=None) -> list:
+    """Ids of the strings containing (or starting with) ``q``, best match first."""
+    if len(q) < MIN_INDEXED_LENGTH:
+        with closing(_like_matches(q, prefix)) as matches:
+            return list(islice(matches, offset, None if limit is None else offset + limit))
+    sql = (
+        f"SELECT stored.id FROM {TABLE} {_STRINGS_JOIN} WHERE {TABLE} MATCH %s "
+        f"ORDER BY {TABLE}.rank, {TABLE}.rowid"
+    )
+    params = [_match(q, prefix)]
+    if limit is not None or offset:
+        sql += " LIMIT %s OFFSET %s"
+        params += [-1 if limit is None else limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [pk for pk, in cursor.fetchall()]
+
+
+def count(q: str, prefix=False) -> int:
+    """Number of strings containing (or starting with) ``q``."""
+    if len(q) < MIN_INDEXED_LENGTH:
+        return sum(1 for _ in _like_matches(q, prefix))
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s", [_match(q, prefix)])
+        return cursor.fetchone()[0]
+
+
+def scan(rows, q: str, prefix=False) -> list:
+    """Ids from ``(id, value)`` rows matching ``q``, shortest values first.
+
+    The fallback without FTS5; every value is read and tested.
+    """
+    folded = q.lower()
+    found = []
+    for pk, value in rows:
+        lowered = value.lower()
+        if lowered.startswith(folded) if prefix else folded in lowered:
+            found.append((len(value), pk))
+    found.sort()
+    return [pk for _, pk in found]
@@ -1,7 +1,18 @@
 from rest_framework import serializers
+from .extended import core_properties
 from .models import StoredString
 
+
+class CorePropertiesField(serializers.JSONField):
+    """Properties without memoized extended ones; those are returned on request."""
+
+    def to_representation(self, value):
+        return super().to_representation(core_properties(value))
+
+
 class StoredStringSerializer(serializers.ModelSerializer):
+    properties = CorePropertiesField(read_only=True)
+
     class Meta:
         model = StoredString
         fields = ['id', 'value', 'properties', 'created_at']
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from . import search
+from .cache import invalidate_strings
+from .models import StatCounter, StoredString
+
+
+@receiver(post_delete, sender=StoredString)
+def string_deleted(sender, instance, **kwargs):
+    # A signal also covers QuerySet.delete(), which skips Model.delete()
+    StatCounter.record(instance, sign=-1)
+    # The FTS5 table has no foreign key to cascade through
+    search.remove(instance)
+    # Deferred until the delete commits
+    invalidate_strings(instance.id)
@@ -0,0 +1,112 @@
+"""MinHash signatures and LSH buckets for near-duplicate search.
+
+Each value is reduced to its set of character trigrams (case-insensitive).
+A one-permutation MinHash (one hash per trigram, split into
+``MINHASH_SIZE`` bins, empty bins filled from their right-hand neighbour)
+turns that set into a fixed-size signature whose matching positions
+estimate the Jaccard similarity of two sets. Signatures are cut into
+``LSH_BANDS`` bands; strings sharing any band's bucket are candidates, so a
+query reads a handful of indexed bucket rows instead of every stored
+string. The tables are kept in sync on insert, and rows go with their
+string through the cascading foreign keys.
+"""
+from array import array
+import hashlib
+import sys
+
+from django.conf import settings
+
+# Bins per signature; must be a multiple of LSH_BANDS
+MINHASH_SIZE = getattr(settings, "ANALYZER_MINHASH_SIZE", 64)
+# More bands find less similar candidates (and store more bucket rows)
+LSH_BANDS = getattr(settings, "ANALYZER_LSH_BANDS", 16)
+# Longer values are not indexed, and so never returned as similar
+MAX_LENGTH = getattr(settings, "ANALYZER_SIMILARITY_MAX_LENGTH", 100_000)
+# Longer values are signed by the job runner after their insert instead of on
+# the write path; None signs every value inline
+INLINE_MAX_LENGTH = getattr(settings, "ANALYZER_SIMILARITY_INLINE_MAX_LENGTH", 10_000)
+SHINGLE_SIZE = 3
+
+if MINHASH_SIZE % LSH_BANDS:
+    raise ValueError("ANALYZER_MINHASH_SIZE must be a multiple of ANALYZER_LSH_BANDS")
+
+_BIN_BITS = (MINHASH_SIZE - 1).bit_length()
+_MASK64 = (1 << 64) - 1
+# Fixed odd multipliers (from the golden ratio and splitmix64), so signatures are stable
+_MULTIPLIER = 0x9E3779B97F4A7C15
+_MIXER = 0xBF58476D1CE4E5B9
+_EMPTY = 1 << 64
+
+
+def _shingle_ids(value: str) -> set:
+    """Distinct trigrams of ``value``, each packed exactly into one integer."""
+    codes = list(map(ord, value.lower()))
+    if len(codes) < SHINGLE_SIZE:
+        # Short values are a single shingle of what there is
+        return {sum(code << (21 * i) for i, code in enumerate(codes))} if codes else set()
+    # Code points fit in 21 bits
+    return {(a << 42) | (b << 21) | c for a, b, c in zip(codes, codes[1:], codes[2:])}
+
+
+def signed_inline(value: str) -> bool:
+    """True if ``value`` is signed on the write path rather than by the job runner."""
+    return INLINE_MAX_LENGTH is None or len(value) <= INLINE_MAX_LENGTH
+
+
+def signature(value: str):
+    """MinHash signature of ``value`` as a tuple of 32-bit ints, or None if it can't be indexed."""
+    if not value or len(value) > MAX_LENGTH:
+        return None
+    bins = [_EMPTY] * MINHASH_SIZE
+    shift = 64 - _BIN_BITS
+    for shingle in _shingle_ids(value):
+        # Multiply-shift hashing, with an xor-shift round to mix the high bits
+        h = (shingle * _MULTIPLIER) & _MASK64
+        h = ((h ^ (h >> 31)) * _MIXER) & _MASK64
+        index = h >> shift
+        if h < bins[index]:
+            bins[index] = h
+    # Rotation densification: an empty bin takes the next non-empty bin's
+    # hash, salted with the distance so borrowed values rarely match real ones
+    values = [0] * MINHASH_SIZE
+    nearest = None
+    # Walk the bins twice, right to left, so the search wraps around
+    for i in range(2 * MINHASH_SIZE - 1, -1, -1):
+        if bins[i % MINHASH_SIZE] != _EMPTY:
+            nearest = i
+        if i < MINHASH_SIZE:
+            distance = nearest - i
+            values[i] = ((bins[nearest % MINHASH_SIZE] >> 8) + distance * _MULTIPLIER) & 0xFFFFFFFF
+    return tuple(values)
+
+
+def pack_signature(sig) -> bytes:
+    data = array("I", sig)
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def unpack_signature(data) -> tuple:
+    sig = array("I")
+    sig.frombytes(bytes(data))
+    if sys.byteorder != "little":
+        sig.byteswap()
+    return tuple(sig)
+
+
+def buckets(sig) -> list:
+    """One LSH bucket key per band, as signed 64-bit ints for an indexed column."""
+    rows = MINHASH_SIZE // LSH_BANDS
+    keys = []
+    for band in range(LSH_BANDS):
+        digest = hashlib.blake2b(
+            pack_signature(sig[band * rows:(band + 1) * rows]), digest_size=8, person=band.to_bytes(2, "little")
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(a, b) -> float:
+    """Estimated Jaccard similarity of the trigram sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / MINHASH_SIZE
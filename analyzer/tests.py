@@ -1,3 +1,1893 @@
-from django.test import TestCase
+from collections import Counter
+import concurrent.futures
+import datetime
+import decimal
+import hashlib
+import io
+import os
+import pstats
+import random
+import runpy
+import subprocess
+import sys
+import threading
+import tempfile
+import uuid
+from unittest import mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from .analysis import PALINDROME_BLOCK, PalindromeCheckTooLarge, StreamingAnalyzer, compute_properties
+from . import ingest, jobs, metrics, offload, search, warmup
+from .db import tune_sqlite_connection
+from .extended import (
+    ANALYZERS, bigrams, character_categories, compute_extended, eager_properties, entropy, line_count,
+    longest_palindromic_substring, trigrams,
+)
+from .fields import compress_value, decompress_value, pack_frequencies, unpack_frequencies
+from .cache import (
+    DATA_VERSION_KEY, _shared_backends, aget_detail, bump_data_version, data_version, enabled,
+)
+from .models import AnalysisJob, CharacterPosting, MinHashSignature, StatCounter, StoredString, length_bucket
+from .ingest import WriteCoalescer
+from .offload import acompute_properties, analyze_value
+from .pagination import decode_cursor
+from .parsers import FastJSONParser, loads
+from .renderers import FastJSONRenderer, dumps
+from .query import ConflictingFilters, UnsupportedDisjunction, UnsupportedNegation, parse_query
+from .similarity import signature, unpack_signature
+
+
+class ParseQueryTests(SimpleTestCase):
+    def test_negated_palindromes(self):
+        for query in (
+            "strings that are not a palindrome",
+            "strings that are not palindromes",
+            "non palindromic strings",
+            "non-palindromic strings",
+            "nonpalindromic strings",
+            "words that aren't palindromes",
+            "a string that isn't a palindrome",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(parse_query(query), {"is_palindrome": False})
+
+    def test_palindromes(self):
+        self.assertEqual(parse_query("strings that are palindromes"), {"is_palindrome": True})
+        self.assertEqual(
+            parse_query("single word palindromic strings"),
+            {"is_palindrome": True, "word_count": 1},
+        )
+
+    def test_negated_letters(self):
+        for query in (
+            "palindromes with no letter e",
+            "palindromes without the letter e",
+            "palindromes that do not contain the letter e",
+            "palindromes excluding the letter e",
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    parse_query(query),
+                    {"is_palindrome": True, "excludes_character": "e", "ignore_case": True},
+                )
+
+    def test_letters(self):
+        self.assertEqual(
+            parse_query("strings containing the letters a and z"),
+            {"contains_character": ("a", "z"), "ignore_case": True},
+        )
+
+    def test_unmatched_negation(self):
+        for query in (
+            "strings with no more than 5 characters",
+            "strings not longer than 10 characters",
+            "strings that are not single word",
+        ):
+            with self.subTest(query=query), self.assertRaises(UnsupportedNegation):
+                parse_query(query)
+
+    def test_disjunction(self):
+        for query in (
+            "strings containing the letter a or e",
+            "palindromes or single word strings",
+            "strings longer than 10 characters or shorter than 3 characters",
+        ):
+            with self.subTest(query=query), self.assertRaises(UnsupportedDisjunction):
+                parse_query(query)
+        # "or" inside other words is not an alternative
+        self.assertEqual(parse_query("words longer than 4 characters"), {"min_length": 5})
+
+    def test_conflicts(self):
+        with self.assertRaises(ConflictingFilters):
+            parse_query("palindromes that are not palindromes")
+        with self.assertRaises(ConflictingFilters):
+            parse_query("strings containing the letter a without the letter a")
+
+
+class CacheTestCase(TestCase):
+    """TestCase with response caching on (one process) and a fresh cache per test.
+
+    The cache is cleared afterwards too: the default file cache outlives the
+    test database.
+    """
+
+    def setUp(self):
+        patcher = mock.patch("analyzer.cache.RESPONSE_CACHE", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+
+class NaturalLanguageFilterViewTests(CacheTestCase):
+    url = "/strings/filter-by-natural-language"
+
+    def test_unmatched_negation_is_rejected(self):
+        response = self.client.get(self.url, {"query": "strings with no more than 5 characters"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], "Unable to parse natural language query")
+
+    def test_disjunction_is_rejected(self):
+        StoredString(value="apple").save()
+        response = self.client.get(self.url, {"query": "strings containing the letter a or e"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("'or'", response.json()["detail"])
+
+    def test_negated_palindrome(self):
+        StoredString(value="level").save()
+        StoredString(value="hello").save()
+        response = self.client.get(self.url, {"query": "strings that are not a palindrome"})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["interpreted_query"]["parsed_filters"], {"is_palindrome": False})
+        self.assertEqual([item["value"] for item in body["data"]], ["hello"])
+
+
+class CacheInvalidationTests(CacheTestCase):
+    def test_invalidation_waits_for_commit(self):
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                StoredString(value="outer atomic").save()
+                self.assertEqual(data_version(), version)
+            self.assertEqual(data_version(), version)
+        self.assertEqual(len(callbacks), 1)
+        self.assertGreater(data_version(), version)
+
+    def test_rollback_does_not_invalidate(self):
+        version = data_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with transaction.atomic():
+                StoredString(value="rolled back").save()
+                transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(data_version(), version)
+
+    def test_delete_invalidates_detail_after_commit(self):
+        StoredString(value="cached").save()
+        self.assertEqual(self.client.get("/strings/cached").status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete("/strings/cached")
+            self.assertEqual(response.status_code, 204)
+            # Not yet committed: the cached detail is still in place
+            self.assertEqual(self.client.get("/strings/cached").status_code, 200)
+        self.assertEqual(self.client.get("/strings/cached").status_code, 404)
+
+
+class ResponseCacheSettingTests(TestCase):
+    def use_cache(self, backend, location):
+        override = self.settings(CACHES={"default": {"BACKEND": backend, "LOCATION": location}})
+        override.enable()
+        self.addCleanup(override.disable)
+        _shared_backends.cache_clear()
+        self.addCleanup(_shared_backends.cache_clear)
+        patcher = mock.patch("analyzer.cache.RESPONSE_CACHE", "auto")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_per_process_cache_is_not_used(self):
+        self.use_cache("django.core.cache.backends.locmem.LocMemCache", "per-process")
+        self.assertFalse(enabled())
+        stored = StoredString(value="uncached")
+        stored.save()
+        self.assertEqual(self.client.get("/strings/uncached").status_code, 200)
+        # A delete another worker made would not reach this process's cache
+        StoredString.objects.filter(pk=stored.id).delete()
+        self.assertEqual(self.client.get("/strings/uncached").status_code, 404)
+
+    def test_file_cache_is_shared(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        location = directory.name
+        self.use_cache("django.core.cache.backends.filebased.FileBasedCache", location)
+        self.assertTrue(enabled())
+        with self.captureOnCommitCallbacks(execute=True):
+            StoredString(value="file cached").save()
+        self.assertEqual(self.client.get("/strings/file cached").status_code, 200)
+        # Another worker's cache instance over the same directory
+        other = type(caches["default"])(location, {})
+        version = other.get(DATA_VERSION_KEY)
+        self.assertEqual(version, data_version())
+        with self.captureOnCommitCallbacks(execute=True):
+            StoredString.objects.get(value="file cached").delete()
+        self.assertEqual(self.client.get("/strings/file cached").status_code, 404)
+        self.assertNotEqual(other.get(DATA_VERSION_KEY), version)
+
+    def test_list_results_are_cached_by_default(self):
+        # The shipped defaults, whatever the environment running the tests sets
+        with mock.patch.dict(os.environ, clear=True):
+            defaults = runpy.run_module("string_analyzer.settings")
+        self.assertEqual(defaults["ANALYZER_RESPONSE_CACHE"], "auto")
+        backend = defaults["CACHES"]["default"]["BACKEND"]
+        self.assertEqual(backend, "django.core.cache.backends.filebased.FileBasedCache")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.use_cache(backend, directory.name)
+        self.assertTrue(enabled())
+        StoredString(value="level").save()
+        params = {"is_palindrome": "true"}
+        self.assertEqual(self.client.get("/strings", params).json()["count"], 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get("/strings", params).json()["count"], 1)
+        self.assertEqual(queries.captured_queries, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            StoredString(value="racecar").save()
+        self.assertEqual(self.client.get("/strings", params).json()["count"], 2)
+
+    def test_bumps_never_reuse_a_version(self):
+        # Bumps overwrite instead of incrementing, so no read can go stale under them
+        seen = {data_version()}
+        for _ in range(50):
+            bump_data_version()
+            self.assertNotIn(data_version(), seen)
+            seen.add(data_version())
+
+
+class SignatureTests(TestCase):
+    def test_signature_comes_with_the_analysis(self):
+        computed = analyze_value("the quick brown fox")
+        self.assertEqual(computed["_minhash"], signature("the quick brown fox"))
+        stored = StoredString(value="the quick brown fox")
+        stored.set_properties(computed)
+        self.assertNotIn("_minhash", stored.properties)
+        self.assertIn("_minhash", computed)
+        with mock.patch("analyzer.models.signature") as inline:
+            stored.save()
+        inline.assert_not_called()
+        self.assertEqual(
+            unpack_signature(MinHashSignature.objects.get(pk=stored.id).signature),
+            signature("the quick brown fox"),
+        )
+
+
+class DeferredSignatureTests(CacheTestCase):
+    """Values over ANALYZER_SIMILARITY_INLINE_MAX_LENGTH are signed by the job runner."""
+
+    def setUp(self):
+        super().setUp()
+        for target in ["similarity.INLINE_MAX_LENGTH", "models.SIGNATURE_INLINE_MAX_LENGTH"]:
+            patcher = mock.patch(f"analyzer.{target}", 50)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.long = "the quick brown fox jumps over the lazy dog, twice over"
+        self.assertGreater(len(self.long), 50)
+
+    def test_long_values_are_signed_after_the_insert(self):
+        self.assertNotIn("_minhash", analyze_value(self.long))
+        with mock.patch("analyzer.jobs.request_signatures") as request, \
+                self.captureOnCommitCallbacks(execute=True):
+            StoredString(value=self.long).save()
+            StoredString(value="short and signed").save()
+        request.assert_called_once_with()
+        self.assertEqual(MinHashSignature.objects.count(), 1)
+
+        self.assertEqual(jobs.sign_pending(), 1)
+        stored = MinHashSignature.objects.get(pk=hashlib.sha256(self.long.encode()).hexdigest())
+        self.assertEqual(unpack_signature(stored.signature), signature(self.long))
+        self.assertEqual(jobs.sign_pending(), 0)
+        response = self.client.post("/strings/search", {"value": self.long}, content_type="application/json")
+        self.assertEqual([item["value"] for item in response.json()["data"]], [self.long])
+
+    def test_bulk_ingest(self):
+        with mock.patch("analyzer.jobs.request_signatures") as request, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/strings/bulk", [self.long, "short"], content_type="application/json"
+            )
+        self.assertEqual([item["status"] for item in response.json()["results"]], ["created", "created"])
+        request.assert_called_once_with()
+        self.assertEqual(MinHashSignature.objects.count(), 1)
+        self.assertEqual(jobs.sign_pending(), 1)
+        self.assertEqual(MinHashSignature.objects.count(), 2)
+
+    def test_unindexable_values_are_not_requested(self):
+        with mock.patch("analyzer.models.SIGNATURE_MAX_LENGTH", 52), \
+                mock.patch("analyzer.jobs.request_signatures") as request, \
+                self.captureOnCommitCallbacks(execute=True):
+            StoredString(value=self.long).save()
+            self.assertEqual(jobs.sign_pending(), 0)
+        request.assert_not_called()
+
+    def test_command_runner(self):
+        StoredString(value=self.long).save()
+        out = io.StringIO()
+        call_command("run_analysis_jobs", "--once", stdout=out)
+        self.assertIn("Processed 0 jobs and signed 1 strings.", out.getvalue())
+        self.assertEqual(MinHashSignature.objects.count(), 1)
+
+    def test_inline_when_unlimited(self):
+        with mock.patch("analyzer.similarity.INLINE_MAX_LENGTH", None), \
+                mock.patch("analyzer.models.SIGNATURE_INLINE_MAX_LENGTH", None):
+            self.assertIn("_minhash", analyze_value(self.long))
+            StoredString(value=self.long).save()
+            self.assertEqual(MinHashSignature.objects.count(), 1)
+            self.assertEqual(jobs.sign_pending(), 0)
+
+    def test_event_loop_offload_threshold(self):
+        with mock.patch("analyzer.offload._run") as run:
+            async_to_sync(acompute_properties)("x" * 10)
+            self.assertEqual(run.call_args.kwargs["min_length"], 2048)
+            # Not signed inline, so only the analysis itself is worth moving off the loop
+            async_to_sync(acompute_properties)(self.long)
+            self.assertEqual(run.call_args.kwargs["min_length"], 64 * 1024)
+            with mock.patch("analyzer.offload.SIGNATURE_OFFLOAD_MIN_LENGTH", 5):
+                async_to_sync(acompute_properties)("x" * 10)
+            self.assertEqual(run.call_args.kwargs["min_length"], 5)
+
+
+class JSONRendererTests(CacheTestCase):
+    """FastJSONRenderer must produce exactly DRF's JSONRenderer bytes."""
+
+    payloads = [
+        {"created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)},
+        {"created_at": datetime.datetime(2024, 5, 1, 12, 30, 15), "day": datetime.date(2024, 5, 1)},
+        {"value": "line\u2028separator\u2029paragraph", "emoji": "caf\u00e9 \U0001f600"},
+        {"big": 2 ** 64, "negative": -(2 ** 70), "max": 2 ** 63 - 1},
+        {"floats": [0.1, 1.0, 3.14159, 1e16, 1e-5, 1e20, 123456789.123, 0.0, -2.5]},
+        {"decimal": decimal.Decimal("1.10"), "uuid": uuid.UUID(int=1), "nested": [{"a": None}, True]},
+        {1: "int key", "character_frequency_map": {"\u2028": 1, "\"": 2}},
+        [],
+    ]
+
+    def assertSameRendering(self, data):
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(dumps(data), JSONRenderer().render(data))
+
+    def test_payloads(self):
+        for data in self.payloads:
+            with self.subTest(data=data):
+                self.assertSameRendering(data)
+
+    def test_responses(self):
+        for value in ("racecar", "line\u2028break", "Σίσυφος σΣ", "a " * 50):
+            StoredString.from_value(value).save()
+        for path in (
+            "/strings", "/strings?limit=2", "/strings/racecar", "/strings/stats",
+            "/strings/filter-by-natural-language?query=palindromes", "/strings/racecar/similar",
+        ):
+            with self.subTest(path=path):
+                response = self.client.get(path)
+                self.assertEqual(response.status_code, 200)
+                self.assertSameRendering(response.data)
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_stdlib_fallback(self):
+        data = self.payloads[0]
+        with mock.patch("analyzer.renderers.orjson", None):
+            self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+            self.assertEqual(dumps(data), JSONRenderer().render(data))
+
+
+class JSONParserTests(SimpleTestCase):
+    """FastJSONParser must parse (and reject) bodies exactly like DRF's JSONParser."""
+
+    bodies = [
+        b'{"value": "racecar"}',
+        '{"value": "caf\u00e9 \u2028"}'.encode(),
+        b'{"big": 18446744073709551616, "small": -18446744073709551617}',
+        b'{"float": 1.5, "int": 2, "exp": 1e400}',
+        b'{"surrogate": "\\ud800"}',
+        b'[1, 2, {"a": [null, true]}]',
+    ]
+
+    def parse(self, parser, body, encoding="utf-8"):
+        return parser.parse(io.BytesIO(body), parser_context={"encoding": encoding})
+
+    def test_bodies(self):
+        for body in self.bodies:
+            with self.subTest(body=body):
+                expected = self.parse(JSONParser(), body)
+                self.assertEqual(self.parse(FastJSONParser(), body), expected)
+                self.assertEqual(loads(body), expected)
+
+    def test_fallback_for_other_encodings(self):
+        body = '{"value": "caf\u00e9"}'.encode("latin-1")
+        self.assertEqual(self.parse(FastJSONParser(), body, "latin-1"), {"value": "caf\u00e9"})
+
+    def test_errors(self):
+        for body in (b'{"value": ', b"not json", b'{"a": 1,}'):
+            with self.subTest(body=body):
+                with self.assertRaises(ParseError) as expected:
+                    self.parse(JSONParser(), body)
+                with self.assertRaises(ParseError) as actual:
+                    self.parse(FastJSONParser(), body)
+                self.assertEqual(str(actual.exception), str(expected.exception))
+
+    def test_without_orjson(self):
+        with mock.patch("analyzer.parsers.orjson", None):
+            body = self.bodies[2]
+            self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+            self.assertEqual(loads(self.bodies[1]), {"value": "caf\u00e9 \u2028"})
+
+
+def inline_properties(value: str) -> dict:
+    """The original per-request analysis, kept as the reference."""
+    freq = {}
+    for ch in value:
+        freq[ch] = freq.get(ch, 0) + 1
+    return {
+        "length": len(value),
+        "is_palindrome": value.lower() == value[::-1].lower(),
+        "unique_characters": len(set(value)),
+        "word_count": len(value.split()),
+        "sha256_hash": hashlib.sha256(value.encode("utf-8")).hexdigest(),
+        "character_frequency_map": freq,
+    }
+
+
+class AnalysisEquivalenceTests(SimpleTestCase):
+    values = [
+        "",
+        " ",
+        "racecar",
+        "Was it a car or a cat I saw",
+        "A man a plan a canal Panama".replace(" ", ""),
+        "hello world",
+        "  leading and trailing  ",
+        "tabs\tand\nnewlines\r\n between\x0bwords\x1c",
+        "caf\u00e9 \u00e9fac",
+        "\u00e9t\u00e9",
+        "\u65e5\u672c\u8a9e \u3000\u5168\u89d2\u3000\u30b9\u30da\u30fc\u30b9",
+        "\U0001f600 emoji \U0001f600",
+        "\U0001f600\u00e9\U0001f600",
+        "line\u2028separated\u2029words\u0085next",
+        "abcba" * 100,
+        "ab" * 300 + "c",
+        # Small alphabet in the prefix, then a character it doesn't contain
+        "ab" * 3000 + "z",
+        ("xy " * 5000) + "\u00e9",
+    ]
+
+    def test_compute_properties(self):
+        for value in self.values:
+            with self.subTest(value=value[:40]):
+                expected = inline_properties(value)
+                actual = compute_properties(value)
+                self.assertEqual(actual, expected)
+                # First-occurrence order, as the inline loop built it
+                self.assertEqual(
+                    list(actual["character_frequency_map"]), list(expected["character_frequency_map"])
+                )
+
+    def test_blockwise_palindrome(self):
+        with mock.patch("analyzer.analysis.PALINDROME_BLOCK", 3):
+            for value in self.values + ["abcdefgGFEDCBA", "abcdefXgfedcba", "AbCdDcBa"]:
+                with self.subTest(value=value[:40]):
+                    self.assertEqual(
+                        compute_properties(value)["is_palindrome"],
+                        inline_properties(value)["is_palindrome"],
+                    )
+
+    def stream(self, value: str, chunk_size: int) -> dict:
+        data = value.encode("utf-8")
+        analyzer = StreamingAnalyzer()
+        try:
+            for start in range(0, len(data), chunk_size):
+                analyzer.feed(data[start:start + chunk_size])
+            computed = analyzer.finish()
+            self.assertEqual(analyzer.read_value(), value)
+            return computed
+        finally:
+            analyzer.close()
+
+    def test_streaming(self):
+        for value in self.values:
+            for chunk_size in (1, 2, 3, 7):
+                with self.subTest(value=value[:40], chunk_size=chunk_size):
+                    expected = inline_properties(value)
+                    actual = self.stream(value, chunk_size)
+                    self.assertEqual(actual, expected)
+                    self.assertEqual(
+                        list(actual["character_frequency_map"]), list(expected["character_frequency_map"])
+                    )
+
+    def test_streaming_blockwise_palindrome(self):
+        with mock.patch("analyzer.analysis.PALINDROME_BLOCK", 2):
+            for value in ("abcdefgGFEDCBA", "abcdefXgfedcba", "AbCdDcBa", "abcba" * 20):
+                with self.subTest(value=value):
+                    self.assertEqual(
+                        self.stream(value, 3)["is_palindrome"], inline_properties(value)["is_palindrome"]
+                    )
+
+    def test_streaming_context_dependent_case(self):
+        # Final sigma and length-changing lower-casing need the whole text
+        for value in ("\u03c3\u03a3", "\u03a3\u03c3", "\u03c3\u03a3\u03c3", "\u0130i\u0307", "i\u0307\u0130"):
+            for block in (1, 2, PALINDROME_BLOCK):
+                with self.subTest(value=value, block=block), \
+                        mock.patch("analyzer.analysis.PALINDROME_BLOCK", block):
+                    self.assertEqual(
+                        self.stream(value, 1)["is_palindrome"], inline_properties(value)["is_palindrome"]
+                    )
+
+    def test_streaming_long_non_ascii_is_rejected(self):
+        analyzer = StreamingAnalyzer(exact_max_length=4)
+        try:
+            analyzer.feed("\u03c3\u03a3\u03c3\u03a3\u03c3".encode("utf-8"))
+            with self.assertRaises(PalindromeCheckTooLarge):
+                analyzer.finish()
+        finally:
+            analyzer.close()
+        # ASCII text of any length keeps the block-wise comparison
+        analyzer = StreamingAnalyzer(exact_max_length=4)
+        try:
+            analyzer.feed(b"abcdcba")
+            self.assertTrue(analyzer.finish()["is_palindrome"])
+        finally:
+            analyzer.close()
+
+    def test_streaming_rejects_invalid_utf8(self):
+        analyzer = StreamingAnalyzer()
+        try:
+            with self.assertRaises(UnicodeDecodeError):
+                analyzer.feed(b"ok \xff")
+                analyzer.finish()
+        finally:
+            analyzer.close()
+
+    def test_streaming_truncated_multibyte(self):
+        analyzer = StreamingAnalyzer()
+        try:
+            analyzer.feed("caf\u00e9".encode("utf-8")[:-1])
+            with self.assertRaises(UnicodeDecodeError):
+                analyzer.finish()
+        finally:
+            analyzer.close()
+
+
+class StreamStringsViewTests(CacheTestCase):
+    def test_matches_post(self):
+        for value in ("\u03c3\u03a3", "Racecar", "caf\u00e9 \u00e9fac"):
+            with self.subTest(value=value):
+                streamed = self.client.post(
+                    "/strings/stream", value.encode("utf-8"), content_type="text/plain"
+                )
+                self.assertEqual(streamed.status_code, 201)
+                StoredString.objects.filter(pk=streamed.json()["id"]).delete()
+                posted = self.client.post("/strings", {"value": value}, content_type="application/json")
+                self.assertEqual(posted.status_code, 201)
+                self.assertEqual(streamed.json()["properties"], posted.json()["properties"])
+
+    def test_long_non_ascii_is_rejected(self):
+        with mock.patch("analyzer.views.StreamingAnalyzer", lambda: StreamingAnalyzer(exact_max_length=4)):
+            response = self.client.post("/strings/stream", "\u03c3" * 5, content_type="text/plain")
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(StoredString.objects.exists())
+
+
+class BulkIngestTests(CacheTestCase):
+    url = "/strings/bulk"
+
+    def test_results(self):
+        StoredString.from_value("existing").save()
+        response = self.client.post(
+            self.url,
+            ["racecar", "existing", {"value": "hello"}, "racecar", 5, {"other": 1}, {"value": "Racecar"}],
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [(result["index"], result["status"]) for result in body["results"]],
+            [(0, "created"), (1, "conflict"), (2, "created"), (3, "conflict"),
+             (4, "invalid"), (5, "invalid"), (6, "created")],
+        )
+        self.assertEqual(body["summary"], {"created": 3, "conflict": 2, "invalid": 2})
+        # The in-batch duplicate points at the row its first occurrence created
+        self.assertEqual(body["results"][3]["id"], body["results"][0]["id"])
+        self.assertEqual(body["results"][4]["detail"], "'value' must be a string.")
+        self.assertEqual(body["results"][5]["detail"], "Missing 'value' field.")
+        self.assertEqual(StoredString.objects.count(), 4)
+        racecar = StoredString.objects.get(pk=body["results"][0]["id"])
+        self.assertEqual(racecar.value, "racecar")
+        self.assertEqual(racecar.properties["length"], 7)
+        self.assertTrue(racecar.is_palindrome)
+
+    def test_values_object(self):
+        response = self.client.post(self.url, {"values": ["a", "b"]}, content_type="application/json")
+        self.assertEqual(response.json()["summary"], {"created": 2, "conflict": 0, "invalid": 0})
+
+    def test_ndjson(self):
+        body = '"first"\n\n{"value": "second"}\n"first"\n'
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result["status"] for result in response.json()["results"]], ["created", "created", "conflict"]
+        )
+
+    def test_malformed(self):
+        response = self.client.post(self.url, '"ok"\n{bad\n', content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("line 2", response.json()["detail"])
+        response = self.client.post(self.url, {"value": "x"}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(StoredString.objects.exists())
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Runs migrations from ``migrate_from`` against rows created at that state.
+
+    Rows left over at the end are deleted through the historical models
+    before the schema is migrated forward again.
+    """
+    migrate_from = None
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        targets = executor.loader.graph.leaf_nodes() if target is None else [("analyzer", target)]
+        executor.migrate(targets)
+        self.apps = MigrationExecutor(connection).loader.project_state(targets).apps
+        return self.apps
+
+    def setUp(self):
+        self.addCleanup(self.migrate, None)
+        self.migrate(self.migrate_from)
+        self.addCleanup(lambda: self.apps.get_model("analyzer", "StoredString").objects.all().delete())
+
+    def create_historical(self, value, properties=None):
+        StoredString = self.apps.get_model("analyzer", "StoredString")
+        pk = hashlib.sha256(value.encode("utf-8")).hexdigest()
+        return StoredString.objects.create(id=pk, value=value, properties=properties)
+
+
+class PromotedPropertiesTests(CacheTestCase):
+    values = ["Racecar", "hello world", "  a  b  c  ", "caf\u00e9 \u00e9fac", "x", "Was it a car or a cat I saw"]
+
+    def setUp(self):
+        super().setUp()
+        for value in self.values:
+            StoredString(value=value).save()
+
+    def test_columns_mirror_properties(self):
+        for stored in StoredString.objects.all():
+            with self.subTest(value=stored.value):
+                expected = inline_properties(stored.value)
+                self.assertEqual(
+                    (stored.length, stored.is_palindrome, stored.word_count, stored.unique_characters),
+                    (expected["length"], expected["is_palindrome"], expected["word_count"],
+                     expected["unique_characters"]),
+                )
+
+    def test_filters_match_scan(self):
+        cases = [
+            ({"min_length": "5"}, lambda p: p["length"] >= 5),
+            ({"max_length": "7"}, lambda p: p["length"] <= 7),
+            ({"word_count": "3"}, lambda p: p["word_count"] == 3),
+            ({"is_palindrome": "true"}, lambda p: p["is_palindrome"]),
+            ({"is_palindrome": "false", "min_length": "2"},
+             lambda p: not p["is_palindrome"] and p["length"] >= 2),
+        ]
+        for params, predicate in cases:
+            with self.subTest(params=params):
+                body = self.client.get("/strings", params).json()
+                expected = {value for value in self.values if predicate(inline_properties(value))}
+                self.assertEqual({item["value"] for item in body["data"]}, expected)
+
+
+class PromoteIndexedPropertiesMigrationTests(MigrationTestCase):
+    migrate_from = "0001_initial"
+
+    def test_backfill(self):
+        values = ["Racecar", "hello world", "caf\u00e9 \u00e9fac", ""]
+        # Rows from before properties were required, and rows that already had them
+        self.create_historical(values[0])
+        self.create_historical(values[1], properties={})
+        for value in values[2:]:
+            self.create_historical(value, properties=inline_properties(value))
+        apps = self.migrate("0002_promote_indexed_properties")
+        rows = apps.get_model("analyzer", "StoredString").objects.all()
+        self.assertEqual(len(rows), len(values))
+        for row in rows:
+            with self.subTest(value=row.value):
+                expected = inline_properties(row.value)
+                self.assertEqual(row.properties, expected)
+                self.assertEqual(
+                    (row.length, row.is_palindrome, row.word_count, row.unique_characters),
+                    (expected["length"], expected["is_palindrome"], expected["word_count"],
+                     expected["unique_characters"]),
+                )
+
+
+class CharacterPostingTests(CacheTestCase):
+    values = ["Apple", "banana", "cherry pie", "Date", "caf\u00e9", "CAF\u00c9", "aBc", ""]
+
+    def setUp(self):
+        super().setUp()
+        for value in self.values:
+            StoredString(value=value).save()
+
+    def listed(self, **params):
+        return {item["value"] for item in self.client.get("/strings", params).json()["data"]}
+
+    def scan(self, contains=(), excludes=(), ignore_case=False):
+        def has(value, ch):
+            return ch.lower() in value.lower() if ignore_case else ch in value
+        return {
+            value for value in self.values
+            if all(has(value, ch) for ch in contains) and not any(has(value, ch) for ch in excludes)
+        }
+
+    def test_matches_scan(self):
+        cases = [
+            {"contains": ["a"]},
+            {"contains": ["a", "n"]},
+            {"contains": ["a", "e", "p"]},
+            {"contains": ["A", "e"], "ignore_case": True},
+            {"contains": ["\u00e9"]},
+            {"contains": ["\u00e9"], "ignore_case": True},
+            {"excludes": ["a"]},
+            {"excludes": ["A", "e"], "ignore_case": True},
+            {"contains": ["c"], "excludes": ["h"]},
+            {"contains": ["C"], "excludes": ["H"], "ignore_case": True},
+            {"contains": ["z"]},
+        ]
+        for case in cases:
+            with self.subTest(**case):
+                params = {
+                    "contains_character": case.get("contains", []),
+                    "excludes_character": case.get("excludes", []),
+                }
+                if case.get("ignore_case"):
+                    params["ignore_case"] = "true"
+                self.assertEqual(self.listed(**params), self.scan(**case))
+
+    def test_postings_follow_rows(self):
+        for stored in StoredString.objects.all():
+            postings = CharacterPosting.objects.filter(stored_string=stored)
+            self.assertEqual(set(postings.values_list("character", flat=True)), set(stored.value))
+        response = self.client.delete("/strings/banana")
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(CharacterPosting.objects.filter(stored_string__value="banana").exists())
+        remaining = [value for value in self.values if value != "banana"]
+        self.assertEqual(CharacterPosting.objects.count(), sum(len(set(value)) for value in remaining))
+        self.assertEqual(self.listed(contains_character="n"), set())
+
+
+class CharacterPostingsMigrationTests(MigrationTestCase):
+    migrate_from = "0002_promote_indexed_properties"
+
+    def test_backfill(self):
+        values = ["hello world", "Racecar", "caf\u00e9", ""]
+        for value in values:
+            self.create_historical(value, properties=inline_properties(value))
+        apps = self.migrate("0003_character_postings")
+        postings = apps.get_model("analyzer", "CharacterPosting").objects.values_list(
+            "stored_string__value", "character"
+        )
+        self.assertEqual(set(postings), {(value, ch) for value in values for ch in value})
+
+
+def recount(values) -> dict:
+    """StatCounter rows expected for ``values``, counted from scratch."""
+    counts = Counter()
+    for value in values:
+        properties = inline_properties(value)
+        counts[("total", "strings")] += 1
+        counts[("total", "characters")] += len(value)
+        counts[("total", "palindromes")] += properties["is_palindrome"]
+        counts[("length", length_bucket(len(value)))] += 1
+        counts[("word_count", str(properties["word_count"]))] += 1
+        for ch in value:
+            counts[("character", ch)] += 1
+    return {key: count for key, count in counts.items() if count}
+
+
+class StatCounterTests(CacheTestCase):
+    def counters(self) -> dict:
+        rows = StatCounter.objects.values_list("kind", "key", "count")
+        return {(kind, key): count for kind, key, count in rows}
+
+    def assertCounts(self):
+        self.assertEqual(self.counters(), recount(StoredString.objects.values_list("value", flat=True)))
+
+    def test_insert_bulk_and_delete(self):
+        self.client.post("/strings", {"value": "Racecar"}, content_type="application/json")
+        self.assertCounts()
+        values = ["hello world", "caf\u00e9", "Racecar", "", "a" * 40]
+        self.client.post("/strings/bulk", values, content_type="application/json")
+        self.assertCounts()
+        self.client.delete("/strings/hello world")
+        self.assertCounts()
+        StoredString.objects.filter(length__gt=10).delete()
+        self.assertCounts()
+
+    def test_delete_drops_empty_counters(self):
+        for value in ("zebra", "apple"):
+            StoredString(value=value).save()
+        self.client.delete("/strings/zebra")
+        self.assertFalse(StatCounter.objects.filter(kind="character", key="z").exists())
+        self.assertFalse(StatCounter.objects.filter(count__lte=0).exists())
+        self.client.delete("/strings/apple")
+        self.assertEqual(self.counters(), {})
+        self.assertEqual(self.client.get("/strings/stats").json()["total_strings"], 0)
+
+    def test_rebuild(self):
+        for value in ("level", "two words", "\U0001f600 emoji"):
+            StoredString(value=value).save()
+        StatCounter.objects.filter(kind="character").update(count=99)
+        StatCounter.objects.filter(kind="total", key="strings").delete()
+        StatCounter.objects.create(kind="word_count", key="42", count=1)
+        call_command("rebuild_stats", stdout=io.StringIO())
+        self.assertCounts()
+
+
+class StatCountersMigrationTests(MigrationTestCase):
+    migrate_from = "0004_keyset_index"
+
+    def test_backfill(self):
+        values = ["level", "hello world", "caf\u00e9", ""]
+        for value in values:
+            self.create_historical(value, properties=inline_properties(value))
+        apps = self.migrate("0005_stat_counters")
+        counters = apps.get_model("analyzer", "StatCounter").objects.values_list("kind", "key", "count")
+        self.assertEqual({(kind, key): count for kind, key, count in counters}, recount(values))
+
+
+class CompressedStorageTests(CacheTestCase):
+    LONG = "compressible text " * 20
+
+    def compression(self, codec, min_length=64):
+        """Turn compressed storage on (or off, with None) for the rest of the test."""
+        for name, value in [("VALUE_COMPRESSION", codec), ("COMPRESS_MIN_LENGTH", min_length)]:
+            patcher = mock.patch(f"analyzer.fields.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def raw(self, value):
+        return StoredString.objects.filter(pk=hashlib.sha256(value.encode("utf-8")).hexdigest()).values(
+            "value", "properties", "character_frequencies"
+        ).get()
+
+    def assertCoreProperties(self, properties, value):
+        """The core properties match the reference analysis (eager extended ones aside)."""
+        expected = inline_properties(value)
+        self.assertEqual({name: properties.get(name) for name in expected}, expected)
+
+    def test_codec_round_trips(self):
+        for codec, header in [("zlib", b"z"), ("lzma", b"x")]:
+            with self.subTest(codec=codec):
+                self.compression(codec)
+                stored = compress_value(self.LONG)
+                self.assertIsInstance(stored, bytes)
+                self.assertEqual(stored[:1], header)
+                self.assertLess(len(stored), len(self.LONG))
+                self.assertEqual(decompress_value(stored), self.LONG)
+                # Stored as a BLOB, which the database hands back as bytes or a memoryview
+                self.assertEqual(decompress_value(memoryview(stored)), self.LONG)
+                self.assertEqual(decompress_value("plain"), "plain")
+                self.assertIsNone(decompress_value(None))
+
+    def test_min_length(self):
+        self.compression("zlib", min_length=len(self.LONG))
+        self.assertEqual(compress_value(self.LONG[:-1]), self.LONG[:-1])
+        self.assertIsInstance(compress_value(self.LONG), bytes)
+
+    def test_disabled_by_default(self):
+        self.assertEqual(compress_value(self.LONG * 100), self.LONG * 100)
+
+    def test_packed_frequencies(self):
+        frequencies = {"a": 1, "Z": 127, "é": 128, "中": 70000, "😀": 3, "\U0010ffff": 2**35}
+        packed = pack_frequencies(frequencies)
+        self.assertEqual(unpack_frequencies(packed), frequencies)
+        self.assertEqual(list(unpack_frequencies(packed)), list(frequencies))
+        self.assertEqual(pack_frequencies({"a": 1}), b"a\x01")
+        self.assertEqual(unpack_frequencies(memoryview(packed)), frequencies)
+        self.assertEqual(unpack_frequencies(b""), {})
+
+    def test_lazy_decode_through_the_model(self):
+        self.compression("zlib")
+        value = self.LONG + "é😀"
+        StoredString(value=value).save()
+        raw = self.raw(value)
+        self.assertIsInstance(raw["value"], (bytes, memoryview))
+        self.assertNotIn("character_frequency_map", raw["properties"])
+        self.assertIsNotNone(raw["character_frequencies"])
+
+        stored = StoredString.objects.get()
+        # Nothing is decoded until the attribute is read
+        self.assertIsInstance(stored.__dict__["value"], (bytes, memoryview))
+        self.assertEqual(stored.value, value)
+        self.assertIsInstance(stored.__dict__["value"], str)
+        self.assertCoreProperties(stored.properties, value)
+
+    def test_short_values_stay_text(self):
+        self.compression("zlib")
+        StoredString(value="short one").save()
+        raw = self.raw("short one")
+        self.assertEqual(raw["value"], "short one")
+        self.assertIsNotNone(raw["character_frequencies"])
+        self.assertCoreProperties(StoredString.objects.get().properties, "short one")
+
+    def test_projection_decodes(self):
+        self.compression("lzma")
+        value = self.LONG + "😀"
+        StoredString(value=value).save()
+
+        response = self.client.get("/strings", {"fields": "value,character_frequency_map"})
+        self.assertEqual(response.status_code, 200)
+        row = response.json()["data"][0]
+        self.assertEqual(row["value"], value)
+        self.assertEqual(
+            row["properties"],
+            {"character_frequency_map": inline_properties(value)["character_frequency_map"]},
+        )
+        response = self.client.get("/strings")
+        self.assertEqual(response.json()["data"][0]["properties"], inline_properties(value))
+
+    def test_rewrite_storage_in_both_directions(self):
+        values = [self.LONG, "short one", self.LONG + "中"]
+        for value in values:
+            StoredString(value=value).save()
+        self.assertTrue(all(isinstance(self.raw(value)["value"], str) for value in values))
+
+        self.compression("zlib")
+        call_command("rewrite_storage", stdout=io.StringIO())
+        for value in values:
+            raw = self.raw(value)
+            self.assertEqual(isinstance(raw["value"], str), len(value) < 64)
+            self.assertNotIn("character_frequency_map", raw["properties"])
+            self.assertIsNotNone(raw["character_frequencies"])
+
+        self.compression(None)
+        call_command("rewrite_storage", stdout=io.StringIO())
+        for value in values:
+            raw = self.raw(value)
+            self.assertEqual(raw["value"], value)
+            self.assertCoreProperties(raw["properties"], value)
+            self.assertIsNone(raw["character_frequencies"])
+        for stored in StoredString.objects.all():
+            self.assertCoreProperties(stored.properties, stored.value)
+
+
+# The analyzer routes alone, so the tests also run under the lean profile
+@override_settings(ROOT_URLCONF="analyzer.async_urls")
+class AsyncViewTests(CacheTestCase):
+    """The async views served under ASGI (string_analyzer.settings_asgi)."""
+
+    async def create(self, *values):
+        for value in values:
+            await StoredString.from_value(value).asave()
+
+    async def test_create(self):
+        response = await self.async_client.post(
+            "/strings", {"value": "Racecar"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        self.assertEqual(body["value"], "Racecar")
+        self.assertEqual(body["id"], hashlib.sha256(b"Racecar").hexdigest())
+        self.assertTrue(body["properties"]["is_palindrome"])
+        for data, status in (({"value": "Racecar"}, 409), ({}, 400), ("{bad", 400), ({"value": 5}, 422)):
+            with self.subTest(data=data):
+                response = await self.async_client.post("/strings", data, content_type="application/json")
+                self.assertEqual(response.status_code, status)
+        self.assertEqual(await StoredString.objects.acount(), 1)
+
+    async def test_form_bodies(self):
+        # Accepted like the DRF view's FormParser and MultiPartParser
+        response = await self.async_client.post("/strings", {"value": "multipart body"})
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.post(
+            "/strings", "value=form+body", content_type="application/x-www-form-urlencoded"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["value"], "form body")
+        response = await self.async_client.post("/strings", "plain", content_type="text/plain")
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(response.json(), {"detail": 'Unsupported media type "text/plain" in request.'})
+
+    async def test_write_coalescing(self):
+        for result, status in (("created", 201), ("conflict", 409)):
+            future = concurrent.futures.Future()
+            future.set_result(result)
+            with self.subTest(result=result), \
+                    mock.patch("analyzer.async_views.WRITE_COALESCING", True), \
+                    mock.patch("analyzer.async_views.get_write_coalescer") as coalescer:
+                coalescer.return_value.submit.return_value = future
+                response = await self.async_client.post(
+                    "/strings", {"value": "coalesced"}, content_type="application/json"
+                )
+                self.assertEqual(response.status_code, status)
+                self.assertEqual(coalescer.return_value.submit.call_args.args[0].value, "coalesced")
+
+    async def test_list(self):
+        await self.create("level", "hello world", "racecar", "noon", "abc")
+        response = await self.async_client.get("/strings", {"is_palindrome": "true", "min_length": "5"})
+        body = response.json()
+        self.assertEqual({item["value"] for item in body["data"]}, {"level", "racecar"})
+        self.assertEqual(body["count"], 2)
+        self.assertEqual(body["filters_applied"], {"is_palindrome": "true", "min_length": "5"})
+        response = await self.async_client.get(
+            "/strings", {"contains_character": "o", "fields": "value,length", "limit": 1}
+        )
+        body = response.json()
+        self.assertEqual(len(body["data"]), 1)
+        self.assertEqual(set(body["data"][0]), {"value", "properties"})
+        self.assertEqual(set(body["data"][0]["properties"]), {"length"})
+        self.assertEqual(body["count"], 2)
+        self.assertIsNotNone(body["next_cursor"])
+        response = await self.async_client.get("/strings", {"fields": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    async def test_detail_and_delete(self):
+        await self.create("hello world")
+        pk = hashlib.sha256(b"hello world").hexdigest()
+        response = await self.async_client.get("/strings/hello world")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["properties"]["word_count"], 2)
+        # Stored through the cache's async API
+        self.assertEqual((await aget_detail(pk))["id"], pk)
+        response = await self.async_client.get("/strings/hello world", {"fields": "value,word_count"})
+        self.assertEqual(response.json(), {"value": "hello world", "properties": {"word_count": 2}})
+        self.assertEqual((await self.async_client.get("/strings/missing")).status_code, 404)
+        self.assertEqual((await self.async_client.delete("/strings/hello world")).status_code, 204)
+        self.assertEqual((await self.async_client.delete("/strings/hello world")).status_code, 404)
+        self.assertFalse(await StoredString.objects.filter(pk=pk).aexists())
+
+    async def test_natural_language(self):
+        await self.create("level", "racecar", "hello", "a")
+        url = "/strings/filter-by-natural-language"
+        response = await self.async_client.get(url, {"query": "palindromes longer than 3 characters"})
+        body = response.json()
+        self.assertEqual({item["value"] for item in body["data"]}, {"level", "racecar"})
+        self.assertEqual(
+            body["interpreted_query"]["parsed_filters"], {"is_palindrome": True, "min_length": 4}
+        )
+        for query, status in (("", 400), ("palindromes or single word strings", 400),
+                              ("palindromes that are not palindromes", 422)):
+            with self.subTest(query=query):
+                self.assertEqual((await self.async_client.get(url, {"query": query})).status_code, status)
+
+
+class KeysetPaginationTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        for index in range(7):
+            StoredString.from_value(f"value {index}").save()
+        # Several rows share a timestamp; ids break the tie
+        tied = timezone.now()
+        StoredString.objects.filter(
+            value__in=["value 1", "value 2", "value 3", "value 4"]
+        ).update(created_at=tied)
+        self.expected = list(StoredString.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+    def pages(self, limit, **params):
+        ids, cursor = [], None
+        while True:
+            query = {"limit": limit, **params}
+            if cursor:
+                query["cursor"] = cursor
+            body = self.client.get("/strings", query).json()
+            self.assertLessEqual(len(body["data"]), limit)
+            ids.extend(item["id"] for item in body["data"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                return ids, body
+
+    def test_pages_cover_every_row_once(self):
+        for limit in (1, 2, 3, 7, 10):
+            with self.subTest(limit=limit):
+                ids, last = self.pages(limit)
+                self.assertEqual(ids, self.expected)
+                self.assertEqual(last["count"], 7)
+
+    def test_cursor_points_past_the_last_row(self):
+        body = self.client.get("/strings", {"limit": 2}).json()
+        created_at, pk = decode_cursor(body["next_cursor"])
+        self.assertEqual(pk, body["data"][-1]["id"])
+
+    def test_filters_and_count_none(self):
+        ids, last = self.pages(2, contains_character="1", count="none")
+        self.assertEqual(ids, [pk for pk in self.expected if "1" in StoredString.objects.get(pk=pk).value])
+        self.assertIsNone(last["count"])
+
+    def test_invalid(self):
+        for params in ({"cursor": "not-a-cursor"}, {"limit": "0"}, {"limit": "many"}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get("/strings", params).status_code, 400)
+
+
+class StreamedListTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        for value in ("level", "hello world", "caf\u00e9\u2028"):
+            StoredString.from_value(value).save()
+
+    def test_json(self):
+        params = {"is_palindrome": "false"}
+        expected = self.client.get("/strings", params).json()
+        response = self.client.get("/strings", {**params, "stream": "json"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/json")
+        body = loads(b"".join(response.streaming_content))
+        self.assertEqual(body, {
+            "data": expected["data"], "count": 2, "filters_applied": expected["filters_applied"],
+        })
+
+    def test_json_empty(self):
+        expected = self.client.get("/strings", {"min_length": 1000}).json()
+        response = self.client.get("/strings", {"min_length": 1000, "stream": "json"})
+        self.assertEqual(
+            loads(b"".join(response.streaming_content)),
+            {"data": [], "count": 0, "filters_applied": expected["filters_applied"]},
+        )
+
+    def test_ndjson(self):
+        expected = self.client.get("/strings", {"fields": "id,value"}).json()["data"]
+        response = self.client.get("/strings", {"fields": "id,value", "stream": "ndjson"})
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        content = b"".join(response.streaming_content)
+        self.assertTrue(content.endswith(b"\n"))
+        self.assertEqual([loads(line) for line in content.splitlines()], expected)
+
+    def test_invalid(self):
+        self.assertEqual(self.client.get("/strings", {"stream": "csv"}).status_code, 400)
+
+
+class CreateStringTests(CacheTestCase):
+    def test_duplicate_is_one_insert(self):
+        first = self.client.post("/strings", {"value": "duplicate"}, content_type="application/json")
+        self.assertEqual(first.status_code, 201)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.post("/strings", {"value": "duplicate"}, content_type="application/json")
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(second.json(), {"detail": "String already exists."})
+        # No lookup first: the primary-key INSERT itself detects the duplicate
+        statements = [query["sql"].split()[0] for query in queries.captured_queries]
+        self.assertEqual([sql for sql in statements if sql in ("SELECT", "INSERT")], ["INSERT"])
+        self.assertEqual(StoredString.objects.count(), 1)
+
+    def test_validation(self):
+        response = self.client.post("/strings", {}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post("/strings", {"value": 5}, content_type="application/json")
+        self.assertEqual(response.status_code, 422)
+
+
+class WriteCoalescerTests(TransactionTestCase):
+    """The writer thread commits on its own connection, so rows must really commit.
+
+    Rows are deleted through the ORM afterwards so the search table, which
+    a flush doesn't reach, is emptied too.
+    """
+
+    def setUp(self):
+        self.addCleanup(lambda: StoredString.objects.all().delete())
+        patcher = mock.patch("analyzer.cache.RESPONSE_CACHE", True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def submit_concurrently(self, coalescer, values):
+        barrier = threading.Barrier(len(values))
+
+        def submit(value):
+            barrier.wait()
+            return coalescer.submit(StoredString.from_value(value))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(values)) as pool:
+            futures = list(pool.map(submit, values))
+        return [future.result(timeout=10) for future in futures]
+
+    def test_concurrent_submitters_share_batches(self):
+        StoredString(value="already stored").save()
+        coalescer = WriteCoalescer(max_batch=50, max_delay=0.2)
+        values = [f"value {n}" for n in range(8)] + ["already stored", "value 0"]
+        with mock.patch("analyzer.ingest.store_batch", wraps=ingest.store_batch) as store_batch:
+            results = self.submit_concurrently(coalescer, values)
+
+        self.assertEqual(results.count("created"), 8)
+        self.assertEqual(results.count("conflict"), 2)
+        self.assertEqual(results[values.index("already stored")], "conflict")
+        self.assertLess(store_batch.call_count, len(values))
+        self.assertEqual(StoredString.objects.count(), 9)
+        self.assertEqual(StatCounter.objects.get(kind="total", key="strings").count, 9)
+
+    def test_view_results_per_item(self):
+        StoredString(value="already stored").save()
+        coalescer = WriteCoalescer(max_batch=50, max_delay=0.2)
+        values = ["fresh one", "fresh two", "already stored", "fresh one"]
+        barrier = threading.Barrier(len(values))
+
+        def post(value):
+            barrier.wait()
+            try:
+                return self.client_class().post("/strings", {"value": value}, content_type="application/json")
+            finally:
+                connections.close_all()
+
+        with mock.patch("analyzer.views.WRITE_COALESCING", True), \
+                mock.patch("analyzer.views.get_write_coalescer", return_value=coalescer), \
+                concurrent.futures.ThreadPoolExecutor(max_workers=len(values)) as pool:
+            responses = list(pool.map(post, values))
+
+        codes = [response.status_code for response in responses]
+        self.assertEqual(codes[1:3], [201, 409])
+        # Whichever "fresh one" reached the writer first was created
+        self.assertEqual(sorted([codes[0], codes[3]]), [201, 409])
+        created = responses[1].json()
+        self.assertEqual(created["id"], hashlib.sha256(b"fresh two").hexdigest())
+        self.assertEqual(created["properties"], inline_properties("fresh two"))
+        self.assertEqual(StoredString.objects.count(), 3)
+
+    def test_errors_reach_every_waiter(self):
+        coalescer = WriteCoalescer(max_batch=50, max_delay=0.2)
+        with mock.patch("analyzer.ingest.store_batch", side_effect=RuntimeError("disk full")):
+            barrier = threading.Barrier(3)
+
+            def submit(value):
+                barrier.wait()
+                return coalescer.submit(StoredString.from_value(value))
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as pool:
+                futures = list(pool.map(submit, ["one", "two", "three"]))
+            for future in futures:
+                with self.assertRaisesMessage(RuntimeError, "disk full"):
+                    future.result(timeout=10)
+
+        # The writer survives a failed batch
+        self.assertEqual(coalescer.submit(StoredString.from_value("one")).result(timeout=10), "created")
+
+    def test_timer_flushes_a_partial_batch(self):
+        coalescer = WriteCoalescer(max_batch=100, max_delay=0.05)
+        with mock.patch("analyzer.ingest.store_batch", wraps=ingest.store_batch) as store_batch:
+            futures = [coalescer.submit(StoredString.from_value(value)) for value in ["a", "b", "c"]]
+            self.assertEqual([future.result(timeout=10) for future in futures], ["created"] * 3)
+        # Far fewer than max_batch, so only the delay could have flushed them
+        self.assertEqual(store_batch.call_count, 1)
+        self.assertEqual(len(store_batch.call_args.args[0]), 3)
+
+    def test_full_batch_flushes_before_the_timer(self):
+        coalescer = WriteCoalescer(max_batch=2, max_delay=60)
+        futures = [coalescer.submit(StoredString.from_value(value)) for value in ["a", "b"]]
+        self.assertEqual([future.result(timeout=10) for future in futures], ["created"] * 2)
+
+
+class SQLitePragmaTests(TestCase):
+    def pragma(self, cursor, name):
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+    def test_applied_on_connect(self):
+        pragmas = {"synchronous": "OFF", "busy_timeout": 1234, "cache_size": -2048, "temp_store": "MEMORY"}
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            fresh = connections.create_connection("default")
+            self.addCleanup(fresh.close)
+            with fresh.cursor() as cursor:
+                self.assertEqual(self.pragma(cursor, "synchronous"), 0)
+                self.assertEqual(self.pragma(cursor, "busy_timeout"), 1234)
+                self.assertEqual(self.pragma(cursor, "cache_size"), -2048)
+                self.assertEqual(self.pragma(cursor, "temp_store"), 2)
+
+    def test_default_pragmas(self):
+        self.assertEqual(settings.SQLITE_PRAGMAS["journal_mode"], "WAL")
+        self.assertEqual(settings.SQLITE_PRAGMAS["synchronous"], "NORMAL")
+        with connection.cursor() as cursor:
+            self.assertEqual(self.pragma(cursor, "synchronous"), 1)
+            self.assertEqual(self.pragma(cursor, "busy_timeout"), settings.SQLITE_PRAGMAS["busy_timeout"])
+
+    def test_rejects_injected_values(self):
+        with override_settings(SQLITE_PRAGMAS={"synchronous": "OFF; DROP TABLE analyzer_storedstring"}):
+            with self.assertRaises(ValueError):
+                tune_sqlite_connection(sender=None, connection=connection)
+
+
+def brute_force_palindrome(value: str) -> str:
+    """First longest palindromic substring by testing every substring."""
+    folded = value.lower()
+    text = folded if len(folded) == len(value) else value
+    best = (0, 0)
+    for start in range(len(text)):
+        for end in range(start + best[1] - best[0] + 1, len(text) + 1):
+            if text[start:end] == text[start:end][::-1]:
+                best = (start, end)
+    return value[best[0]:best[1]]
+
+
+class ExtendedAnalyzerTests(SimpleTestCase):
+    def test_line_count(self):
+        for value, expected in [("", 0), ("a", 1), ("\n", 1), ("a\n", 1), ("a\nb", 2), ("a\n\nb\n", 3)]:
+            with self.subTest(value=value):
+                self.assertEqual(line_count(value, {}), expected)
+
+    def test_entropy(self):
+        for value, expected in [("", 0.0), ("aaaa", 0.0), ("ab", 1.0), ("aabb", 1.0), ("abcd", 2.0)]:
+            with self.subTest(value=value):
+                self.assertAlmostEqual(entropy(value, {}), expected)
+                self.assertAlmostEqual(entropy(value, inline_properties(value)), expected)
+        self.assertEqual(str(entropy("aaaa", {})), "0.0")
+        self.assertAlmostEqual(entropy("aab", {}), 0.9182958340544896)
+
+    def test_character_categories(self):
+        self.assertEqual(
+            character_categories("Hé 5!😀\t¿", {}),
+            {"letters": 2, "digits": 1, "whitespace": 2, "punctuation": 2, "other": 1},
+        )
+        value = "abc 123"
+        self.assertEqual(
+            character_categories(value, inline_properties(value)), character_categories(value, {})
+        )
+
+    def test_ngrams(self):
+        self.assertEqual(bigrams("abab", {}), {"ab": 2, "ba": 1})
+        self.assertEqual(list(bigrams("cab", {})), ["ca", "ab"])
+        self.assertEqual(bigrams("a", {}), {})
+        self.assertEqual(trigrams("aaaa", {}), {"aaa": 2})
+        self.assertEqual(trigrams("😀a😀b", {}), {"😀a😀": 1, "a😀b": 1})
+        self.assertEqual(trigrams("ab", {}), {})
+
+    def test_longest_palindromic_substring(self):
+        cases = {
+            "": "",
+            "a": "a",
+            "abc": "a",
+            "xabbay": "abba",
+            "xracecary": "racecar",
+            "Abba": "Abba",
+            "abaxyabba": "abba",
+            # Ties go to the first
+            "abacdc": "aba",
+            "cabad": "aba",
+            "zÉtéz": "zÉtéz",
+            "😀a😀": "😀a😀",
+            # "İ" lower-cases to two characters, so the value is compared exactly
+            "İxİ": "İxİ",
+            "İxi": "İ",
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(longest_palindromic_substring(value, {}), expected)
+                self.assertEqual(brute_force_palindrome(value), expected)
+
+    def test_longest_palindromic_substring_matches_brute_force(self):
+        rng = random.Random(21)
+        for _ in range(500):
+            value = "".join(rng.choice("abAB é") for _ in range(rng.randint(0, 24)))
+            with self.subTest(value=value):
+                self.assertEqual(longest_palindromic_substring(value, {}), brute_force_palindrome(value))
+
+    def test_eager_split(self):
+        eager = {name for name, analyzer in ANALYZERS.items() if analyzer.eager}
+        self.assertEqual(eager, {"line_count", "entropy", "character_categories"})
+        self.assertEqual(set(eager_properties("ab", inline_properties("ab"))), eager)
+        with mock.patch("analyzer.extended.EAGER_PROPERTIES", ["bigrams"]):
+            self.assertEqual(
+                eager_properties("abab", inline_properties("abab")), {"bigrams": {"ab": 2, "ba": 1}}
+            )
+        with mock.patch("analyzer.extended.EAGER_PROPERTIES", []):
+            self.assertEqual(eager_properties("ab", inline_properties("ab")), {})
+
+
+class ExtendedPropertiesViewTests(CacheTestCase):
+    LAZY = "bigrams,longest_palindromic_substring"
+
+    def test_eager_properties_are_stored_but_not_returned(self):
+        StoredString(value="a level\nb").save()
+        stored = StoredString.objects.get()
+        self.assertEqual(stored.properties["line_count"], 2)
+        self.assertNotIn("bigrams", stored.properties)
+        response = self.client.get("/strings")
+        self.assertEqual(response.json()["data"][0]["properties"], inline_properties("a level\nb"))
+
+    def test_lazy_properties_are_computed_once(self):
+        StoredString(value="xlevely").save()
+        with mock.patch("analyzer.models.compute_extended", wraps=compute_extended) as compute:
+            response = self.client.get("/strings/xlevely", {"properties": self.LAZY})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {
+                "id": hashlib.sha256(b"xlevely").hexdigest(),
+                "value": "xlevely",
+                "properties": {
+                    "bigrams": bigrams("xlevely", {}), "longest_palindromic_substring": "level",
+                },
+                "created_at": response.json()["created_at"],
+            })
+            self.assertEqual(compute.call_count, 1)
+
+            # Memoized into the row: later requests, listings included, reuse it
+            properties = StoredString.objects.values_list("properties", flat=True).get()
+            self.assertEqual(properties["longest_palindromic_substring"], "level")
+            response = self.client.get("/strings", {"fields": "value", "properties": self.LAZY})
+            self.assertEqual(
+                response.json()["data"][0]["properties"]["longest_palindromic_substring"], "level"
+            )
+            self.assertEqual(compute.call_count, 1)
+
+        # The default response still leaves extended properties out
+        response = self.client.get("/strings/xlevely")
+        self.assertEqual(response.json()["properties"], inline_properties("xlevely"))
+
+    def test_mixed_core_and_lazy(self):
+        StoredString(value="abcab").save()
+        response = self.client.get("/strings", {"properties": "length,trigrams,entropy"})
+        self.assertEqual(response.json()["data"][0]["properties"], {
+            "length": 5, "entropy": entropy("abcab", {}), "trigrams": {"abc": 1, "bca": 1, "cab": 1},
+        })
+
+    def test_unknown_property(self):
+        response = self.client.get("/strings", {"properties": "nope"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"detail": "Unknown property 'nope'."})
+
+
+class TextSearchTests(CacheTestCase):
+    VALUES = ["hello world", "Yellow fellow", "mellow", "ab cd", "100% a_b", "xyz"]
+
+    def setUp(self):
+        super().setUp()
+        for value in self.VALUES:
+            StoredString(value=value).save()
+
+    def values(self, q, **params):
+        response = self.client.get("/strings/search", {"q": q, **params})
+        self.assertEqual(response.status_code, 200)
+        return [item["value"] for item in response.json()["data"]]
+
+    def index_entries(self, q):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {search.TABLE} WHERE {search.TABLE} MATCH %s", [f'"{q}"'])
+            return cursor.fetchone()[0]
+
+    def test_substring_and_prefix(self):
+        self.assertEqual(sorted(self.values("ell")), ["Yellow fellow", "hello world", "mellow"])
+        # bm25 favours the shorter of two values with one occurrence each
+        ranked = self.values("ell")
+        self.assertLess(ranked.index("mellow"), ranked.index("hello world"))
+        self.assertEqual(self.values("ELLO"), self.values("ello"))
+        self.assertEqual(sorted(self.values("ell", match="prefix")), [])
+        self.assertEqual(self.values("yel", match="prefix"), ["Yellow fellow"])
+        self.assertEqual(self.values("nothing"), [])
+
+    def test_short_queries_use_like(self):
+        # Shortest values first; ASCII case folding like LIKE
+        self.assertEqual(self.values("W"), ["mellow", "hello world", "Yellow fellow"])
+        self.assertEqual(self.values("y", match="prefix"), ["Yellow fellow"])
+        self.assertEqual(self.values("%"), ["100% a_b"])
+        self.assertEqual(self.values("_"), ["100% a_b"])
+        self.assertEqual(self.values("b", limit=1), ["ab cd"])
+        response = self.client.get("/strings/search", {"q": "b", "limit": 1})
+        self.assertEqual(response.json()["count"], 2)
+        cursor = response.json()["next_cursor"]
+        self.assertEqual(self.values("b", limit=1, cursor=cursor), ["100% a_b"])
+
+    def test_short_queries_read_compressed_values(self):
+        long = "Zebra " + "compressible text " * 10
+        with mock.patch("analyzer.fields.VALUE_COMPRESSION", "zlib"), \
+                mock.patch("analyzer.fields.COMPRESS_MIN_LENGTH", 64):
+            StoredString(value=long).save()
+        self.assertIsInstance(self.raw_value(long), (bytes, memoryview))
+        self.assertEqual(self.values("ze", match="prefix"), [long])
+        self.assertEqual(self.values("zz"), [])
+        self.assertEqual(self.values("ebr"), [long])
+        self.assertEqual(StoredString.text_search_count("t "), 1)
+
+    def raw_value(self, value):
+        pk = hashlib.sha256(value.encode()).hexdigest()
+        return StoredString.objects.filter(pk=pk).values_list("value", flat=True).get()
+
+    def test_pagination_and_count(self):
+        response = self.client.get("/strings/search", {"q": "ell", "limit": 2})
+        body = response.json()
+        self.assertEqual((len(body["data"]), body["count"]), (2, 3))
+        rest = self.values("ell", limit=2, cursor=body["next_cursor"])
+        self.assertEqual(len(rest), 1)
+        self.assertEqual(sorted([item["value"] for item in body["data"]] + rest), sorted(self.values("ell")))
+        response = self.client.get("/strings/search", {"q": "ell", "count": "none"})
+        self.assertIsNone(response.json()["count"])
+
+    def test_validation(self):
+        self.assertEqual(self.client.get("/strings/search").status_code, 400)
+        response = self.client.get("/strings/search", {"q": "ell", "match": "suffix"})
+        self.assertEqual(response.json(), {"detail": "'match' must be 'substring' or 'prefix'."})
+
+    def test_table_keeps_no_values(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT value FROM {search.TABLE}")
+            values = [value for value, in cursor.fetchall()]
+        self.assertEqual(values, [None] * len(self.VALUES))
+
+    def test_index_follows_inserts_and_deletes(self):
+        response = self.client.post("/strings", {"value": "marshmallow"}, content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.client.post("/strings/bulk", ["shallow", "swallow", "mellow"], content_type="application/json")
+        self.assertEqual(
+            sorted(self.values("llow")), ["Yellow fellow", "marshmallow", "mellow", "shallow", "swallow"]
+        )
+
+        # Cached search results are dropped once a delete commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete("/strings/mellow").status_code, 204)
+            StoredString.objects.filter(value__in=["shallow", "nope"]).delete()
+        self.assertEqual(sorted(self.values("llow")), ["Yellow fellow", "marshmallow", "swallow"])
+        # Forgotten by the index itself, not only filtered out by the join
+        self.assertEqual(self.index_entries("mellow"), 0)
+        self.assertEqual(self.index_entries("llow"), 3)
+        # Deleted values can be stored and found again
+        with self.captureOnCommitCallbacks(execute=True):
+            StoredString(value="mellow").save()
+        self.assertIn("mellow", self.values("mellow"))
+
+    def test_rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {search.TABLE}")
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn(f"Indexed {len(self.VALUES)} strings for search.", out.getvalue())
+        self.assertEqual(sorted(self.values("ell")), ["Yellow fellow", "hello world", "mellow"])
+        self.assertEqual(self.values("xy"), ["xyz"])
+
+    def test_scan_engine_agrees(self):
+        queries = [("ell", False), ("w", False), ("y", True), ("ab c", False), ("100", True)]
+        indexed = {query: sorted(StoredString.text_search(*query)) for query in queries}
+        with mock.patch("analyzer.search.ENGINE", "scan"):
+            self.assertFalse(search.enabled())
+            scanned = {query: sorted(StoredString.text_search(*query)) for query in queries}
+        self.assertEqual(indexed, scanned)
+
+    def test_similarity_search(self):
+        response = self.client.post(
+            "/strings/search", {"value": "hello world!", "k": 2}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()["data"]
+        self.assertEqual(data[0]["value"], "hello world")
+        self.assertGreater(data[0]["similarity"], 0.5)
+        response = self.client.post("/strings/search", {}, content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+
+class ContentlessSearchIndexMigrationTests(MigrationTestCase):
+    migrate_from = "0010_search_index"
+
+    def setUp(self):
+        # Runs last: the historical rows never reached the live index
+        self.addCleanup(call_command, "rebuild_search_index", stdout=io.StringIO())
+        super().setUp()
+
+    def table_sql(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = %s", [search.TABLE])
+            return cursor.fetchone()[0]
+
+    def test_values_are_dropped_from_the_index(self):
+        for value in ["hello world", "mellow"]:
+            self.create_historical(value, inline_properties(value))
+        self.assertIn("stored_string_id UNINDEXED", self.table_sql())
+
+        self.migrate("0011_contentless_search_index")
+        self.assertIn("content=''", self.table_sql())
+        self.assertEqual(
+            sorted(search.search("ell")),
+            sorted(hashlib.sha256(value.encode()).hexdigest() for value in ["hello world", "mellow"]),
+        )
+
+        self.migrate("0010_search_index")
+        self.assertIn("stored_string_id UNINDEXED", self.table_sql())
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT value FROM {search.TABLE} ORDER BY value")
+            self.assertEqual(cursor.fetchall(), [("hello world",), ("mellow",)])
+
+
+class MetricsTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def metric_lines(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+        return response.content.decode().splitlines()
+
+    def test_prometheus_output(self):
+        self.client.post("/strings", {"value": "hello world"}, content_type="application/json")
+        self.client.post("/strings", {"value": "hello world"}, content_type="application/json")
+        self.client.get("/strings/hello world")
+        lines = self.metric_lines()
+
+        self.assertIn('analyzer_requests_total{endpoint="strings",method="POST",status="201"} 1', lines)
+        self.assertIn('analyzer_requests_total{endpoint="strings",method="POST",status="409"} 1', lines)
+        self.assertIn('analyzer_requests_total{endpoint="string-detail",method="GET",status="200"} 1', lines)
+        self.assertIn("# TYPE analyzer_request_duration_seconds histogram", lines)
+        self.assertEqual(lines.count("# TYPE analyzer_requests_total counter"), 1)
+        # Buckets are cumulative and end in +Inf, which equals _count
+        prefix = 'analyzer_request_duration_seconds_bucket{endpoint="strings",method="POST",le='
+        buckets = [int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith(prefix)]
+        self.assertEqual(len(buckets), len(metrics.DURATION_BUCKETS) + 1)
+        self.assertEqual(buckets, sorted(buckets))
+        self.assertIn(f'{prefix}"+Inf"}} 2', lines)
+        self.assertIn('analyzer_request_duration_seconds_count{endpoint="strings",method="POST"} 2', lines)
+        self.assertTrue(any(
+            line.startswith('analyzer_stage_duration_seconds_count{endpoint="strings",stage="analyze"}')
+            for line in lines
+        ))
+        self.assertTrue(any(line.startswith("analyzer_cache_events_total{") for line in lines))
+
+    def test_reset(self):
+        self.client.get("/strings")
+        metrics.reset()
+        lines = self.metric_lines()
+        # Only the /metrics request itself is recorded after it renders
+        self.assertFalse(any(line.startswith("analyzer_requests_total") for line in lines))
+
+    def test_slow_requests_are_logged(self):
+        with mock.patch("analyzer.middleware.SLOW_REQUEST_MS", 0), \
+                self.assertLogs("analyzer.middleware", "WARNING") as logs:
+            self.client.get("/strings")
+        self.assertIn("Slow request GET /strings -> 200", logs.output[0])
+        self.assertIn("queries=", logs.output[0])
+
+    def test_stage_outside_a_request(self):
+        with metrics.stage("analyze"):
+            pass
+        self.assertEqual(metrics.render_metrics().count("analyzer_stage_duration_seconds"), 0)
+
+    def test_timings_are_per_request(self):
+        barrier = threading.Barrier(2)
+
+        def request(stage_name):
+            # Connect first: the connection's PRAGMAs would count as queries
+            connection.ensure_connection()
+            timings = metrics.start_request()
+            barrier.wait()
+            with metrics.stage(stage_name), connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            barrier.wait()
+            metrics.finish_request(timings, stage_name, "GET", 200)
+            connection.close()
+            return timings
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            first, second = pool.map(request, ["first", "second"])
+        # Each thread saw only its own stage and query
+        self.assertEqual(set(first.stages), {"first", "db"})
+        self.assertEqual(set(second.stages), {"second", "db"})
+        self.assertEqual((first.queries, second.queries), (1, 1))
+        self.assertIsNone(metrics._current.get())
+
+    def test_nested_requests_restore_the_outer_timings(self):
+        outer = metrics.start_request()
+        inner = metrics.start_request()
+        with metrics.stage("hash"):
+            pass
+        metrics.finish_request(inner, "inner", "GET", 200)
+        self.assertIs(metrics._current.get(), outer)
+        metrics.finish_request(outer, "outer", "GET", 200)
+        self.assertEqual(set(inner.stages), {"hash"})
+        self.assertEqual(outer.stages, {})
+
+
+class ProfilingTests(CacheTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        for name, value in [("PROFILING", True), ("PROFILE_DIR", self.directory)]:
+            patcher = mock.patch(f"analyzer.middleware.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_profile_file_name(self):
+        with self.assertLogs("analyzer.middleware", "INFO") as logs:
+            response = self.client.get("/strings", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        name = response["X-Profile-File"]
+        # Only the file name: the server's directory layout stays private
+        self.assertEqual(os.path.basename(name), name)
+        self.assertNotIn(self.directory, name)
+        self.assertRegex(name, r"^strings-GET-\d+\.prof$")
+        path = os.path.join(self.directory, name)
+        self.assertTrue(pstats.Stats(path).total_calls)
+        self.assertIn(path, logs.output[-1])
+
+    def test_only_on_request(self):
+        response = self.client.get("/strings")
+        self.assertNotIn("X-Profile-File", response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_off_by_default(self):
+        with mock.patch("analyzer.middleware.PROFILING", False):
+            response = self.client.get("/strings", HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-File", response)
+
+
+class WarmUpTests(CacheTestCase):
+    def test_environ(self):
+        environ = warmup.wsgi_environ("/strings?limit=5")
+        self.assertEqual((environ["PATH_INFO"], environ["QUERY_STRING"]), ("/strings", "limit=5"))
+        self.assertEqual(environ["REQUEST_METHOD"], "GET")
+
+    def test_call_goes_through_the_app(self):
+        StoredString(value="warm").save()
+        self.assertEqual(warmup.call(get_wsgi_application(), "/strings/stats"), "200 OK")
+        self.assertEqual(warmup.call(get_wsgi_application(), "/strings/nope/similar"), "404 Not Found")
+
+    def test_warm_up_is_not_traffic(self):
+        with mock.patch("analyzer.warmup.connections") as connections_:
+            warmup.warm_up(get_wsgi_application())
+        connections_.close_all.assert_called_once_with()
+        self.assertNotIn("analyzer_requests_total", metrics.render_metrics())
+
+    def test_failed_warm_up_is_logged(self):
+        def application(environ, start_response):
+            start_response("500 Internal Server Error", [])
+            return [b""]
+
+        with mock.patch("analyzer.warmup.connections"), self.assertLogs("analyzer.warmup", "WARNING") as logs:
+            warmup.warm_up(application, "/strings")
+        self.assertIn("Warm-up request to /strings returned 500 Internal Server Error", logs.output[0])
+
+    def test_prepare_worker(self):
+        with mock.patch("analyzer.offload.warm_process_pool") as pool, \
+                mock.patch("analyzer.jobs.start_job_runner") as runner:
+            warmup.prepare_worker()
+        pool.assert_called_once_with()
+        runner.assert_called_once_with()
+
+    def test_process_pool_warm_up(self):
+        pool = mock.Mock()
+        pool.submit.return_value.result.return_value = {}
+        with mock.patch("analyzer.offload.get_process_pool", return_value=pool):
+            offload.warm_process_pool()
+            self.assertEqual(pool.submit.call_count, offload.PROCESS_WORKERS)
+            with mock.patch("analyzer.offload.PROCESS_MIN_LENGTH", None):
+                offload.warm_process_pool()
+            self.assertEqual(pool.submit.call_count, offload.PROCESS_WORKERS)
+
+    def test_gunicorn_hooks(self):
+        hooks = runpy.run_path(os.path.join(settings.BASE_DIR, "gunicorn.conf.py"))
+        for preload in (False, True):
+            worker = mock.Mock()
+            worker.cfg.preload_app = preload
+            with self.subTest(preload=preload), \
+                    mock.patch("analyzer.warmup.warm_up") as warm_up, \
+                    mock.patch("analyzer.warmup.prepare_worker") as prepare:
+                hooks["post_worker_init"](worker)
+                # Preloaded workers fork from the master's warmed app
+                self.assertEqual(warm_up.call_args_list, [] if preload else [mock.call(worker.wsgi)])
+                prepare.assert_called_once_with()
+
+        server = mock.Mock()
+        server.cfg.preload_app = True
+        with mock.patch("analyzer.warmup.warm_up") as warm_up:
+            hooks["on_starting"](server)
+        warm_up.assert_called_once_with(server.app.wsgi.return_value)
+
+
+@skipIf(settings.SETTINGS_MODULE == "string_analyzer.settings_lean", "Already under the lean profile")
+class LeanProfileTests(SimpleTestCase):
+    def test_suite_passes_under_lean_settings(self):
+        result = subprocess.run(
+            [sys.executable, "manage.py", "test", "analyzer", "--settings=string_analyzer.settings_lean"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=600,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-3000:])
+
+
+class JobRunnerTests(CacheTestCase):
+    def test_leftover_jobs_are_drained(self):
+        pending = AnalysisJob.objects.create(payload=["left pending"])
+        stale = AnalysisJob.objects.create(
+            payload=["left running"], status=AnalysisJob.RUNNING,
+            started_at=timezone.now() - jobs.JOB_STALE_AFTER - datetime.timedelta(seconds=1),
+        )
+        running = AnalysisJob.objects.create(
+            payload=["still running"], status=AnalysisJob.RUNNING, started_at=timezone.now(),
+        )
+        self.assertEqual(jobs.process_jobs(), 2)
+        self.assertEqual(jobs.process_jobs(), 0)
+        for job in (pending, stale):
+            job.refresh_from_db()
+            self.assertEqual(job.status, AnalysisJob.DONE)
+            self.assertEqual(job.results[0]["status"], "created")
+        running.refresh_from_db()
+        self.assertEqual(running.status, AnalysisJob.RUNNING)
+
+    def test_stale_job_keeps_its_own_results(self):
+        StoredString(value="already there").save()
+        job = AnalysisJob.objects.create(payload=["first", "second", "already there", "third"])
+
+        class WorkerDied(BaseException):
+            pass
+
+        # The worker dies after committing its first chunk
+        original = jobs.ingest_values.__globals__["store_batch"]
+        calls = []
+
+        def store_batch(stored_strings):
+            calls.append(stored_strings)
+            if len(calls) == 2:
+                raise WorkerDied
+            return original(stored_strings)
+
+        with mock.patch("analyzer.ingest.BULK_CHUNK_SIZE", 2), \
+                mock.patch("analyzer.ingest.store_batch", store_batch), self.assertRaises(WorkerDied):
+            jobs.process_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.RUNNING)
+        self.assertEqual(StoredString.objects.filter(value__in=["first", "second"]).count(), 2)
+
+        AnalysisJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - jobs.JOB_STALE_AFTER - datetime.timedelta(seconds=1)
+        )
+        self.assertEqual(jobs.process_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, AnalysisJob.DONE)
+        self.assertEqual(
+            [(result["index"], result["status"]) for result in job.results],
+            [(0, "created"), (1, "created"), (2, "conflict"), (3, "created")],
+        )
+
+    def test_failures_are_isolated_per_job(self):
+        good = AnalysisJob.objects.create(payload=["fine", "also fine"])
+        bad = AnalysisJob.objects.create(payload=["fine too", "boom"])
+        from_value = StoredString.from_value
+
+        def analyze(value, *args):
+            if value == "boom":
+                raise RuntimeError("analysis exploded")
+            return from_value(value, *args)
+
+        with mock.patch("analyzer.ingest.StoredString.from_value", side_effect=analyze), \
+                self.assertLogs("analyzer.jobs", "ERROR"):
+            self.assertEqual(jobs.process_jobs(), 2)
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, AnalysisJob.DONE)
+        self.assertEqual([result["status"] for result in good.results], ["created", "created"])
+        self.assertEqual(bad.status, AnalysisJob.FAILED)
+        self.assertEqual(bad.error, "analysis exploded")
+        self.assertTrue(StoredString.objects.filter(value="also fine").exists())
+
+    @mock.patch("analyzer.jobs.threading.Thread")
+    def test_one_runner_per_process(self, thread):
+        with mock.patch("analyzer.jobs._runner_pid", None):
+            jobs.start_job_runner()
+            jobs.start_job_runner()
+            self.assertEqual(thread.return_value.start.call_count, 1)
+            # A forked worker doesn't inherit the thread, so it starts its own
+            with mock.patch("analyzer.jobs.os.getpid", return_value=-1):
+                jobs.start_job_runner()
+            self.assertEqual(thread.return_value.start.call_count, 2)
+
+    @mock.patch("analyzer.jobs.threading.Thread")
+    def test_command_runner_starts_no_thread(self, thread):
+        with mock.patch("analyzer.jobs._runner_pid", None), mock.patch("analyzer.jobs.JOB_RUNNER", "command"):
+            jobs.start_job_runner()
+        thread.assert_not_called()
@@ -1,9 +1,21 @@
 from django.urls import path
-from .views import StringsView, StringDetailView, NaturalLanguageFilterView
+from .views import (
+    StringsView, BulkStringsView, StreamStringsView, StringDetailView, NaturalLanguageFilterView,
+    StatsView, JobDetailView, CacheStatsView, MetricsView, SimilarStringsView, StringSearchView,
+)
 
 urlpatterns = [
     # Single endpoint for both POST (create) and GET (list with filters)
     path('strings', StringsView.as_view(), name='strings'),
-    path('strings/<str:string_value>', StringDetailView.as_view(), name='string-detail'),
+    # Fixed paths must come before the catch-all detail route
+    path('strings/bulk', BulkStringsView.as_view(), name='strings-bulk'),
+    path('strings/stream', StreamStringsView.as_view(), name='strings-stream'),
+    path('strings/stats', StatsView.as_view(), name='strings-stats'),
     path('strings/filter-by-natural-language', NaturalLanguageFilterView.as_view(), name='natural-language-filter'),
+    path('strings/search', StringSearchView.as_view(), name='strings-search'),
+    path('strings/<str:string_value>/similar', SimilarStringsView.as_view(), name='string-similar'),
+    path('strings/<str:string_value>', StringDetailView.as_view(), name='string-detail'),
+    path('jobs/<uuid:job_id>', JobDetailView.as_view(), name='job-detail'),
+    path('cache/stats', CacheStatsView.as_view(), name='cache-stats'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
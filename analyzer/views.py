@@ -1,15 +1,86 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.conf import settings
 from django.db import IntegrityError
-from .models import StoredString
+from .analysis import PalindromeCheckTooLarge, StreamingAnalyzer
+from .cache import (
+    cache_stats, get_detail, get_query_result, query_cache_key, set_detail, set_query_result,
+)
+from .extended import core_properties
+from .ingest import WRITE_COALESCING, get_write_coalescer, ingest_values
+from .jobs import enqueue_job, job_status
+from .metrics import render_metrics, stage
+from .models import (
+    VERIFY_HASH_COLLISIONS, AnalysisJob, HashCollision, MinHashSignature, StatCounter, StoredString,
+)
+from .pagination import (
+    decode_offset_cursor, encode_offset_cursor, page_size, paginate, stream_json, stream_ndjson,
+)
+from .parsers import FastJSONParser, NDJSONParser
+from .projection import Projection
+from .query import (
+    ConflictingFilters, UnsupportedDisjunction, UnsupportedNegation, apply_filters, filters_from_params,
+    parse_query,
+)
 from .serializers import StoredStringSerializer
+from .similarity import MAX_LENGTH as SIMILARITY_MAX_LENGTH, signature, signed_inline
 import hashlib
-import re
 import urllib.parse
 
 
+# Upper bound for ``k`` in similarity searches
+SIMILARITY_MAX_K = getattr(settings, "ANALYZER_SIMILARITY_MAX_K", 100)
+
+
+def similarity_options(params):
+    """Read ``k`` and ``min_similarity``; raises ValueError with the client-facing message."""
+    try:
+        k = int(params.get("k", 10))
+    except (TypeError, ValueError):
+        raise ValueError("'k' must be an integer.")
+    if not 1 <= k <= SIMILARITY_MAX_K:
+        raise ValueError(f"'k' must be between 1 and {SIMILARITY_MAX_K}.")
+    try:
+        min_similarity = float(params.get("min_similarity", 0))
+    except (TypeError, ValueError):
+        raise ValueError("'min_similarity' must be a number.")
+    if not 0 <= min_similarity <= 1:
+        raise ValueError("'min_similarity' must be between 0 and 1.")
+    return k, min_similarity
+
+
+def fetch_rows(ids, projection) -> dict:
+    """Projected rows for ``ids``, by id; strings deleted since a search are missing."""
+    rows = projection.apply(StoredString.objects.filter(pk__in=list(ids)))
+    return {row["id"]: row for row in rows}
+
+
+def similar_strings(matches, projection):
+    """Render ``(similarity, id)`` matches, best first, each with its similarity."""
+    rows_by_id = fetch_rows([pk for _, pk in matches], projection)
+    # Strings deleted since the search are skipped
+    found = [(score, rows_by_id[pk]) for score, pk in matches if pk in rows_by_id]
+    with stage("serialize"):
+        data = projection.render_all([row for _, row in found])
+    return {
+        "data": [{**item, "similarity": score} for (score, _), item in zip(found, data)],
+        "count": len(found),
+    }
+
+
+def job_accepted(job):
+    """202 response pointing the client at the job's status endpoint."""
+    return Response({
+        "job_id": str(job.id),
+        "status": job.status,
+        "status_url": reverse("job-detail", kwargs={"job_id": job.id})
+    }, status=status.HTTP_202_ACCEPTED)
+
+
 class StringsView(APIView):
     def post(self, request):
         """POST /strings - Create and analyze string"""
@@ -27,98 +98,237 @@ class StringsView(APIView):
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY
             )
 
-        sha256_hash = hashlib.sha256(value.encode("utf-8")).hexdigest()
-        
-        if StoredString.objects.filter(pk=sha256_hash).exists():
+        # Queue for background analysis instead of holding the connection
+        if str(request.query_params.get("async", "")).lower() in ["true", "1", "yes", "on"]:
+            return job_accepted(enqueue_job([value]))
+
+        try:
+            # Duplicates are detected by the primary-key INSERT itself
+            stored = StoredString.from_value(value)
+            if WRITE_COALESCING:
+                # Share a transaction with other concurrent inserts
+                if get_write_coalescer().submit(stored).result() == "conflict":
+                    if VERIFY_HASH_COLLISIONS:
+                        stored.check_collision()
+                    raise IntegrityError(stored.id)
+            else:
+                stored.save()
+            with stage("serialize"):
+                data = StoredStringSerializer(stored).data
+            return Response(data, status=status.HTTP_201_CREATED)
+        except IntegrityError:
             return Response(
                 {"detail": "String already exists."},
                 status=status.HTTP_409_CONFLICT
             )
+        except HashCollision:
+            return Response(
+                {"detail": "A different string is already stored under this SHA-256 hash."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def get(self, request):
+        """GET /strings - Get all strings with filtering"""
+        params = request.query_params
+        filters, applied_filters = filters_from_params(params)
+        queryset = apply_filters(StoredString.objects.all(), filters)
+
+        try:
+            projection = Projection.from_params(params)
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Opt-in streamed export; rows are serialized as they are read
+        stream = params.get("stream")
+        if stream is not None:
+            if stream == "ndjson":
+                return StreamingHttpResponse(
+                    stream_ndjson(queryset, projection), content_type="application/x-ndjson"
+                )
+            if stream == "json":
+                return StreamingHttpResponse(
+                    stream_json(queryset, applied_filters, projection), content_type="application/json"
+                )
+            return Response(
+                {"detail": "'stream' must be 'ndjson' or 'json'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        count_mode = params.get("count", "exact")
+        if count_mode not in ("exact", "none"):
+            return Response(
+                {"detail": "'count' must be 'exact' or 'none'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        paginated = "limit" in params or "cursor" in params
+        cache_key = query_cache_key(
+            "strings", filters, count=count_mode, paginated=paginated,
+            limit=params.get("limit"), cursor=params.get("cursor"), **projection.cache_options(),
+        )
+        result = get_query_result(cache_key)
+
+        if result is None:
+            # Only the projected columns are read, and rows are rendered
+            # without a per-object serializer
+            rows = projection.apply(queryset)
+            # Keyset pagination when a page is requested, full listing otherwise
+            if paginated:
+                try:
+                    rows, next_cursor = paginate(rows, params.get("limit"), params.get("cursor"))
+                except ValueError as exc:
+                    return Response(
+                        {"detail": str(exc)},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                with stage("serialize"):
+                    data = projection.render_all(rows)
+                result = {
+                    "data": data,
+                    "count": queryset.count() if count_mode == "exact" else None,
+                    "next_cursor": next_cursor,
+                }
+            else:
+                with stage("serialize"):
+                    data = projection.render_all(rows)
+                result = {
+                    "data": data,
+                    # The whole result set is already loaded, so no second COUNT query
+                    "count": len(data) if count_mode == "exact" else None,
+                }
+            set_query_result(cache_key, result)
+
+        return Response({**result, "filters_applied": applied_filters})
+
+
+class BulkStringsView(APIView):
+    parser_classes = [FastJSONParser, NDJSONParser]
+
+    def post(self, request):
+        """POST /strings/bulk - Create and analyze many strings at once"""
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get("values")
+
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Expected a JSON array, a 'values' array or an NDJSON body."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if str(request.query_params.get("async", "")).lower() in ["true", "1", "yes", "on"]:
+            return job_accepted(enqueue_job(items))
+
+        results = ingest_values(items)
+
+        summary = {"created": 0, "conflict": 0, "invalid": 0}
+        for result in results:
+            summary[result["status"]] += 1
+
+        return Response({
+            "results": results,
+            "summary": summary
+        }, status=status.HTTP_200_OK)
+
+
+class StreamStringsView(APIView):
+    # Bytes read from the request body per step
+    chunk_size = getattr(settings, "ANALYZER_STREAM_UPLOAD_CHUNK_SIZE", 1024 * 1024)
 
+    def post(self, request):
+        """POST /strings/stream - Analyze a raw (text/plain) body incrementally
+
+        The body is never parsed as a whole; it is hashed and analyzed chunk
+        by chunk. The response omits 'value' since the client already has it.
+        """
+        analyzer = StreamingAnalyzer()
         try:
-            stored = StoredString(value=value)
+            stream = request.stream
+            try:
+                while stream is not None:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    analyzer.feed(chunk)
+                computed = analyzer.finish()
+            except UnicodeDecodeError:
+                return Response(
+                    {"detail": "Body must be UTF-8 encoded text."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            except PalindromeCheckTooLarge as exc:
+                return Response(
+                    {"detail": str(exc)},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+
+            if StoredString.objects.filter(pk=computed["sha256_hash"]).exists():
+                return Response(
+                    {"detail": "String already exists."},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            stored = StoredString(value=analyzer.read_value())
+            stored.set_properties(computed)
+            # Signed before the insert transaction rather than while it holds the lock
+            if signed_inline(stored.value):
+                stored.minhash()
             stored.save()
-            serializer = StoredStringSerializer(stored)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
         except IntegrityError:
             return Response(
                 {"detail": "String already exists."},
                 status=status.HTTP_409_CONFLICT
             )
+        finally:
+            analyzer.close()
 
-    def get(self, request):
-        """GET /strings - Get all strings with filtering"""
-        queryset = StoredString.objects.all()
-        params = request.query_params
-        
-        applied_filters = {}
-        
-        # Apply is_palindrome filter
-        is_palindrome = params.get("is_palindrome")
-        if is_palindrome is not None:
-            try:
-                bool_val = str(is_palindrome).lower() in ["true", "1", "yes", "on"]
-                queryset = queryset.filter(properties__is_palindrome=bool_val)
-                applied_filters["is_palindrome"] = is_palindrome
-            except:
-                pass
-
-        # Apply min_length filter
-        min_length = params.get("min_length")
-        if min_length is not None:
-            try:
-                min_val = int(min_length)
-                queryset = queryset.filter(properties__length__gte=min_val)
-                applied_filters["min_length"] = min_length
-            except:
-                pass
-
-        # Apply max_length filter
-        max_length = params.get("max_length")
-        if max_length is not None:
-            try:
-                max_val = int(max_length)
-                queryset = queryset.filter(properties__length__lte=max_val)
-                applied_filters["max_length"] = max_length
-            except:
-                pass
-
-        # Apply word_count filter
-        word_count = params.get("word_count")
-        if word_count is not None:
-            try:
-                count_val = int(word_count)
-                queryset = queryset.filter(properties__word_count=count_val)
-                applied_filters["word_count"] = word_count
-            except:
-                pass
-
-        # Apply contains_character filter
-        contains_char = params.get("contains_character")
-        if contains_char is not None and len(contains_char) == 1:
-            queryset = queryset.filter(properties__character_frequency_map__has_key=contains_char)
-            applied_filters["contains_character"] = contains_char
-
-        serializer = StoredStringSerializer(queryset, many=True)
-        
         return Response({
-            "data": serializer.data,
-            "count": queryset.count(),
-            "filters_applied": applied_filters
-        })
+            "id": stored.id,
+            "properties": core_properties(stored.properties),
+            "created_at": StoredStringSerializer(stored).data["created_at"]
+        }, status=status.HTTP_201_CREATED)
+
+
+class StatsView(APIView):
+    def get(self, request):
+        """GET /strings/stats - Corpus-wide statistics from the summary table"""
+        return Response(StatCounter.snapshot())
 
 
 class StringDetailView(APIView):
     def get(self, request, string_value):
         """GET /strings/{string_value} - Get specific string"""
+        try:
+            projection = Projection.from_params(request.query_params)
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
         try:
             # Decode URL-encoded string (handles spaces, special characters)
             decoded_value = urllib.parse.unquote(string_value)
             
-            sha256_hash = hashlib.sha256(decoded_value.encode("utf-8")).hexdigest()
-            obj = get_object_or_404(StoredString, pk=sha256_hash)
-            serializer = StoredStringSerializer(obj)
-            return Response(serializer.data)
+            with stage("hash"):
+                sha256_hash = hashlib.sha256(decoded_value.encode("utf-8")).hexdigest()
+            # The cache holds the default response, without extended properties
+            data = None if projection.extended else get_detail(sha256_hash)
+            if data is None:
+                if not projection.is_full:
+                    # Read just the requested columns; the cache only holds full responses
+                    rows = projection.apply(StoredString.objects.all())
+                    row = get_object_or_404(rows, pk=sha256_hash)
+                    with stage("serialize"):
+                        return Response(projection.render_all([row])[0])
+                obj = get_object_or_404(StoredString, pk=sha256_hash)
+                with stage("serialize"):
+                    data = StoredStringSerializer(obj).data
+                set_detail(sha256_hash, data)
+            return Response(projection.project(data))
         except Exception as e:
             return Response(
                 {"detail": "String not found."},
@@ -131,7 +341,8 @@ class StringDetailView(APIView):
             # Decode URL-encoded string (handles spaces, special characters)
             decoded_value = urllib.parse.unquote(string_value)
             
-            sha256_hash = hashlib.sha256(decoded_value.encode("utf-8")).hexdigest()
+            with stage("hash"):
+                sha256_hash = hashlib.sha256(decoded_value.encode("utf-8")).hexdigest()
             obj = get_object_or_404(StoredString, pk=sha256_hash)
             obj.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
@@ -142,156 +353,198 @@ class StringDetailView(APIView):
             )
 
 
-# class NaturalLanguageFilterView(APIView):
-#     def get(self, request):
-#         """GET /strings/filter-by-natural-language - Natural language filtering"""
-#         query = request.query_params.get("query")
-#         if not query:
-#             return Response(
-#                 {"detail": "Query parameter 'query' is required."},
-#                 status=status.HTTP_400_BAD_REQUEST
-#             )
-
-#         text = query.lower().strip()
-#         parsed_filters = {}
-
-#         # Parse ALL the example queries from the specification exactly
-#         if "single word palindromic strings" in text:
-#             parsed_filters["is_palindrome"] = True
-#             parsed_filters["word_count"] = 1
-        
-#         elif "strings longer than 10 characters" in text:
-#             parsed_filters["min_length"] = 11
-        
-#         elif "palindromic strings that contain the first vowel" in text:
-#             parsed_filters["is_palindrome"] = True
-#             parsed_filters["contains_character"] = "a"
-        
-#         elif "strings containing the letter z" in text:
-#             parsed_filters["contains_character"] = "z"
-        
-#         else:
-#             # Fallback to keyword-based parsing
-#             if "palindromic" in text or "palindrome" in text:
-#                 parsed_filters["is_palindrome"] = True
-
-#             if "single word" in text:
-#                 parsed_filters["word_count"] = 1
-
-#             # Handle length queries
-#             if "longer than" in text:
-#                 match = re.search(r"longer than\s+(\d+)", text)
-#                 if match:
-#                     parsed_filters["min_length"] = int(match.group(1)) + 1
-
-#             # Handle character queries
-#             if "letter z" in text:
-#                 parsed_filters["contains_character"] = "z"
-#             elif "first vowel" in text:
-#                 parsed_filters["contains_character"] = "a"
-#             elif "containing the letter" in text:
-#                 match = re.search(r"containing the letter\s+(\w)", text)
-#                 if match:
-#                     parsed_filters["contains_character"] = match.group(1).lower()
-
-#         if not parsed_filters:
-#             return Response(
-#                 {"detail": "Unable to parse natural language query."},
-#                 status=status.HTTP_400_BAD_REQUEST
-#             )
-
-#         # Apply the parsed filters
-#         queryset = StoredString.objects.all()
-        
-#         if "is_palindrome" in parsed_filters:
-#             queryset = queryset.filter(properties__is_palindrome=True)
-        
-#         if "word_count" in parsed_filters:
-#             queryset = queryset.filter(properties__word_count=parsed_filters["word_count"])
-        
-#         if "min_length" in parsed_filters:
-#             queryset = queryset.filter(properties__length__gte=parsed_filters["min_length"])
-        
-#         if "contains_character" in parsed_filters:
-#             queryset = queryset.filter(properties__character_frequency_map__has_key=parsed_filters["contains_character"])
-
-#         serializer = StoredStringSerializer(queryset, many=True)
-        
-#         return Response({
-#             "data": serializer.data,
-#             "count": queryset.count(),
-#             "interpreted_query": {
-#                 "original": query,
-#                 "parsed_filters": parsed_filters
-#             }
-#         })
-class NaturalLanguageFilterView(APIView):
+class SimilarStringsView(APIView):
+    def get(self, request, string_value):
+        """GET /strings/{string_value}/similar - Nearest stored strings by trigram Jaccard similarity"""
+        try:
+            k, min_similarity = similarity_options(request.query_params)
+            projection = Projection.from_params(request.query_params)
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        decoded_value = urllib.parse.unquote(string_value)
+        with stage("hash"):
+            sha256_hash = hashlib.sha256(decoded_value.encode("utf-8")).hexdigest()
+        if not StoredString.objects.filter(pk=sha256_hash).exists():
+            return Response(
+                {"detail": "String not found."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        sig = signature(decoded_value)
+        if sig is None:
+            return Response(
+                {"detail": f"Strings over {SIMILARITY_MAX_LENGTH} characters are not indexed for similarity search."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        matches = MinHashSignature.search(sig, k, min_similarity, exclude=sha256_hash)
+        return Response(similar_strings(matches, projection))
+
+
+class StringSearchView(APIView):
     def get(self, request):
-        """GET /strings/filter-by-natural-language - Natural language filtering"""
-        query = request.query_params.get("query", "").lower().strip()
+        """GET /strings/search?q= - Stored strings containing (or starting with) a query"""
+        params = request.query_params
+        q = params.get("q")
+        if not q:
+            return Response(
+                {"detail": "Missing 'q' parameter."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        if not query:
-            return Response({"error": "Missing 'query' parameter"}, status=status.HTTP_400_BAD_REQUEST)
+        match = params.get("match", "substring")
+        if match not in ("substring", "prefix"):
+            return Response(
+                {"detail": "'match' must be 'substring' or 'prefix'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        count_mode = params.get("count", "exact")
+        if count_mode not in ("exact", "none"):
+            return Response(
+                {"detail": "'count' must be 'exact' or 'none'."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            projection = Projection.from_params(params)
+            limit = page_size(params.get("limit"))
+            offset = decode_offset_cursor(params["cursor"]) if params.get("cursor") else 0
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_key = query_cache_key(
+            "search", {"q": q, "match": match}, count=count_mode,
+            limit=limit, offset=offset, **projection.cache_options(),
+        )
+        result = get_query_result(cache_key)
+
+        if result is None:
+            prefix = match == "prefix"
+            # One extra id tells whether another page follows
+            ids = StoredString.text_search(q, prefix, offset, limit + 1)
+            found = fetch_rows(ids[:limit], projection)
+            with stage("serialize"):
+                data = projection.render_all([found[pk] for pk in ids[:limit] if pk in found])
+            result = {
+                "data": data,
+                "count": StoredString.text_search_count(q, prefix) if count_mode == "exact" else None,
+                "next_cursor": encode_offset_cursor(offset + limit) if len(ids) > limit else None,
+            }
+            set_query_result(cache_key, result)
+
+        return Response(result)
+
+    def post(self, request):
+        """POST /strings/search - Stored strings most similar to a given value"""
+        body = request.data if isinstance(request.data, dict) else {}
+        value = body.get("value")
 
-        filters = {}
+        if value is None:
+            return Response(
+                {"detail": "Missing 'value' field."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # --- Simple heuristics ---
-        if "palindrome" in query or "palindromic" in query:
-            filters["properties__is_palindrome"] = True
+        if not isinstance(value, str):
+            return Response(
+                {"detail": "'value' must be a string."},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
 
-        if "single word" in query or "one word" in query:
-            filters["properties__word_count"] = 1
+        try:
+            k, min_similarity = similarity_options(body)
+            projection = Projection.from_params(request.query_params)
+        except ValueError as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Length filters
-        import re
-        longer_than = re.search(r"longer than (\d+)", query)
-        if longer_than:
-            filters["properties__length__gt"] = int(longer_than.group(1))
+        sig = signature(value)
+        if sig is None:
+            return Response(
+                {"detail": "'value' must be non-empty and at most "
+                           f"{SIMILARITY_MAX_LENGTH} characters for similarity search."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        matches = MinHashSignature.search(sig, k, min_similarity)
+        return Response(similar_strings(matches, projection))
 
-        shorter_than = re.search(r"shorter than (\d+)", query)
-        if shorter_than:
-            filters["properties__length__lt"] = int(shorter_than.group(1))
 
-        exact_length = re.search(r"exactly (\d+) characters", query)
-        if exact_length:
-            filters["properties__length"] = int(exact_length.group(1))
+class JobDetailView(APIView):
+    def get(self, request, job_id):
+        """GET /jobs/{id} - Status (and results once done) of a background job"""
+        job = get_object_or_404(AnalysisJob, pk=job_id)
+        return Response(job_status(job))
 
-        # Contains character (letter a-z)
-        contains_char = re.search(r"letter (\w)", query)
-        if contains_char:
-            filters["value__icontains"] = contains_char.group(1)
-        elif "contain" in query:
-            char_match = re.search(r"contain[s]? the letter (\w)", query)
-            if char_match:
-                filters["value__icontains"] = char_match.group(1)
 
-        # --- Handle conflicting filters ---
-        if "palindromic" in query and "not" in query:
+class CacheStatsView(APIView):
+    def get(self, request):
+        """GET /cache/stats - Cache hit/miss counters for this worker"""
+        return Response(cache_stats())
+
+
+class MetricsView(APIView):
+    def get(self, request):
+        """GET /metrics - Request metrics for this worker in Prometheus text format"""
+        return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class NaturalLanguageFilterView(APIView):
+    def get(self, request):
+        """GET /strings/filter-by-natural-language - Natural language filtering"""
+        query = request.query_params.get("query", "").lower().strip()
+
+        if not query:
+            return Response({"error": "Missing 'query' parameter"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            projection = Projection.from_params(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Plans are memoized by normalized query text, so repeats skip parsing
+        try:
+            filters = parse_query(query)
+        except ConflictingFilters as exc:
             return Response({
-                "error": "Conflicting filters in query"
+                "error": "Conflicting filters in query",
+                "detail": str(exc)
             }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+        except (UnsupportedNegation, UnsupportedDisjunction) as exc:
+            return Response({
+                "error": "Unable to parse natural language query",
+                "detail": str(exc)
+            }, status=status.HTTP_400_BAD_REQUEST)
 
         if not filters:
             return Response({
                 "error": "Unable to parse natural language query"
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        # --- Apply filters ---
-        results = StoredString.objects.filter(**filters)
-        data = [
-            {
-                "id": obj.id,
-                "value": obj.value,
-                "properties": obj.properties,
-                "created_at": obj.created_at
-            }
-            for obj in results
-        ]
+        # Same indexed filter path and result cache as GET /strings
+        cache_key = query_cache_key(
+            "strings", filters, count="exact", paginated=False, **projection.cache_options()
+        )
+        result = get_query_result(cache_key)
+        if result is None:
+            results = projection.apply(apply_filters(StoredString.objects.all(), filters))
+            with stage("serialize"):
+                data = projection.render_all(results)
+            result = {"data": data, "count": len(data)}
+            set_query_result(cache_key, result)
 
         # --- Return formatted response ---
         return Response({
-            "data": data,
-            "count": len(data),
+            "data": result["data"],
+            "count": result["count"],
             "interpreted_query": {
                 "original": query,
                 "parsed_filters": filters
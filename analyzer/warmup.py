@@ -0,0 +1,79 @@
+"""Boot-time warm-up for WSGI workers.
+
+``warm_up`` sends one request through the whole stack (middleware, URL
+resolution, view, query, rendering) before the worker takes traffic, so
+the first client request doesn't pay for compiling URL patterns, loading
+DRF settings and renderers, or opening and tuning the SQLite connection.
+Under ``gunicorn --preload`` it runs once in the master and the workers
+inherit the warmed state through fork (see gunicorn.conf.py).
+
+``prepare_worker`` starts what each worker process needs of its own: the
+analysis process pool and the background job runner.
+"""
+import io
+import logging
+import sys
+
+from django.db import connections
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Cheap, read-only and served by the same stack as every other endpoint
+WARMUP_PATH = "/strings/stats"
+
+
+def wsgi_environ(path: str, method="GET") -> dict:
+    """A minimal WSGI environ for an in-process request to ``path``."""
+    path, _, query = path.partition("?")
+    return {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": "localhost",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+
+def call(application, path: str) -> str:
+    """Send GET ``path`` through the WSGI ``application``; returns the status line."""
+    statuses = []
+    response = application(wsgi_environ(path), lambda status, headers, exc_info=None: statuses.append(status))
+    try:
+        for _ in response:
+            pass
+    finally:
+        # Fires request_finished, which closes the database connection; close()
+        # is optional for WSGI iterables
+        if hasattr(response, "close"):
+            response.close()
+    return statuses[0] if statuses else None
+
+
+def warm_up(application, path=WARMUP_PATH):
+    """Run one GET ``path`` through the WSGI ``application``."""
+    status = call(application, path)
+    if status is None or not status.startswith("200"):
+        logger.warning("Warm-up request to %s returned %s", path, status)
+    # Forked workers must open their own connections, and the warm-up isn't traffic
+    connections.close_all()
+    metrics.reset()
+
+
+def prepare_worker():
+    """Start this process's analysis pool and job runner before it takes requests."""
+    from .jobs import start_job_runner
+    from .offload import warm_process_pool
+
+    warm_process_pool()
+    start_job_runner()
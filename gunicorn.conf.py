@@ -0,0 +1,24 @@
+# Passed to gunicorn with -c (see Procfile); gunicorn also reads it from the
+# working directory when started without one.
+#
+# Each worker is warmed before it takes requests: one request through the app
+# (analyzer/warmup.py), its own analysis process pool and its job runner.
+# With --preload the app is imported in the master, so the warm-up request
+# runs there once and the workers inherit the warmed state through fork;
+# processes and threads can't be shared that way and start in each worker.
+
+
+def on_starting(server):
+    # Runs after the preload; nothing is started here, so the master's
+    # SIGCHLD handler has no pool processes to reap
+    if server.cfg.preload_app:
+        from analyzer.warmup import warm_up
+        warm_up(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    from analyzer.warmup import prepare_worker, warm_up
+    if not worker.cfg.preload_app:
+        warm_up(worker.wsgi)
+    # Also picks up jobs queued before this worker started (e.g. by one that died)
+    prepare_worker()
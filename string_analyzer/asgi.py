@@ -3,6 +3,11 @@ ASGI config for string_analyzer project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests are routed to the async analyzer views by string_analyzer.settings_asgi
+(see string_analyzer/async_urls.py). Run it with uvicorn workers, e.g.:
+
+    uvicorn string_analyzer.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -11,6 +16,14 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'string_analyzer.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'string_analyzer.settings_asgi')
 
 application = get_asgi_application()
+
+# Opt-in, so importing this module doesn't start processes and threads
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, "ANALYZER_WARM_UP", False):
+    from analyzer.warmup import prepare_worker
+
+    prepare_worker()
@@ -0,0 +1,13 @@
+"""
+URL configuration used by the ASGI entry point (string_analyzer/asgi.py).
+
+Identical to string_analyzer.urls except that the analyzer routes are served
+by the async views in analyzer.async_views.
+"""
+from django.contrib import admin
+from django.urls import path, include
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include('analyzer.async_urls'))
+]
@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so request timings (GET /metrics) cover the whole stack
+    'analyzer.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -52,6 +56,7 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# string_analyzer/asgi.py switches this to the async views
 ROOT_URLCONF = 'string_analyzer.urls'
 
 TEMPLATES = [
@@ -79,10 +84,124 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when a transaction starts, so concurrent writers
+            # wait on busy_timeout instead of failing on a lock upgrade
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+            'timeout': int(os.environ.get('SQLITE_TIMEOUT', 20)),
+        },
+    }
+}
+
+# Applied to every new SQLite connection by analyzer/db.py; set a value to
+# None to leave SQLite's default.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 20000)),
+    # Negative means KiB: 64 MiB page cache per connection
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -65536)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+    'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+}
+
+# Group concurrent single-string POSTs into shared transactions (analyzer/ingest.py)
+ANALYZER_WRITE_COALESCING = os.environ.get('ANALYZER_WRITE_COALESCING', '').lower() in ('1', 'true', 'yes', 'on')
+# Compare values byte for byte when an insert hits an existing SHA-256 id (analyzer/models.py)
+ANALYZER_VERIFY_HASH_COLLISIONS = os.environ.get('ANALYZER_VERIFY_HASH_COLLISIONS', '').lower() in ('1', 'true', 'yes', 'on')
+# Optional compressed storage (analyzer/fields.py): "zlib", "lzma" or unset
+ANALYZER_VALUE_COMPRESSION = os.environ.get('ANALYZER_VALUE_COMPRESSION') or None
+ANALYZER_COMPRESS_MIN_LENGTH = int(os.environ.get('ANALYZER_COMPRESS_MIN_LENGTH', 4096))
+# Extended properties (analyzer/extended.py) computed at save time, comma-separated;
+# unset keeps the cheap defaults (line_count, entropy, character_categories)
+ANALYZER_EAGER_PROPERTIES = (
+    [name.strip() for name in os.environ['ANALYZER_EAGER_PROPERTIES'].split(',') if name.strip()]
+    if 'ANALYZER_EAGER_PROPERTIES' in os.environ else None
+)
+# Similarity search (analyzer/similarity.py): MinHash bins per signature, LSH bands
+# (more bands find less similar strings) and the longest value that is indexed.
+# Run "manage.py rebuild_similarity_index" after changing any of them.
+ANALYZER_MINHASH_SIZE = int(os.environ.get('ANALYZER_MINHASH_SIZE', 64))
+ANALYZER_LSH_BANDS = int(os.environ.get('ANALYZER_LSH_BANDS', 16))
+ANALYZER_SIMILARITY_MAX_LENGTH = int(os.environ.get('ANALYZER_SIMILARITY_MAX_LENGTH', 100_000))
+# Values longer than this are signed by the job runner just after their insert, keeping
+# the pure-Python MinHash off the write path; "none" signs every value inline
+ANALYZER_SIMILARITY_INLINE_MAX_LENGTH = (
+    None if os.environ.get('ANALYZER_SIMILARITY_INLINE_MAX_LENGTH', '').lower() == 'none'
+    else int(os.environ.get('ANALYZER_SIMILARITY_INLINE_MAX_LENGTH', 10_000))
+)
+# The async views sign values from this many characters off the event loop
+ANALYZER_SIGNATURE_OFFLOAD_MIN_LENGTH = int(os.environ.get('ANALYZER_SIGNATURE_OFFLOAD_MIN_LENGTH', 2048))
+# Text search (analyzer/search.py): "fts5" keeps an FTS5 trigram table on SQLite,
+# "scan" tests every value instead. Run "manage.py rebuild_search_index" after
+# switching back to "fts5".
+ANALYZER_SEARCH_ENGINE = os.environ.get('ANALYZER_SEARCH_ENGINE', 'fts5')
+# Warm each worker when string_analyzer/wsgi.py or asgi.py is imported: one request
+# through the app, the analysis process pool and the job runner. gunicorn does this
+# through gunicorn.conf.py instead; set it for other servers.
+ANALYZER_WARM_UP = os.environ.get('ANALYZER_WARM_UP', '').lower() in ('1', 'true', 'yes', 'on')
+# Request metrics (analyzer/middleware.py): log requests slower than this with a
+# per-stage breakdown, and write a cProfile dump for requests sent with "X-Profile: 1"
+ANALYZER_SLOW_REQUEST_MS = int(os.environ.get('ANALYZER_SLOW_REQUEST_MS', 1000))
+ANALYZER_PROFILING = os.environ.get('ANALYZER_PROFILING', '').lower() in ('1', 'true', 'yes', 'on')
+ANALYZER_PROFILE_DIR = os.environ.get('ANALYZER_PROFILE_DIR') or None
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Holds serialized GET /strings/{value} and filtered list responses. Workers
+# invalidate each other's entries through this cache, so it has to be shared.
+# The default FileBasedCache directory is shared by every worker on the host;
+# with several hosts point CACHE_BACKEND at
+# django.core.cache.backends.redis.RedisCache (or a memcached backend) and
+# CACHE_LOCATION at the server. LocMemCache is private to each process, so
+# with it responses are not cached unless ANALYZER_RESPONSE_CACHE=on, which is
+# only safe with one worker.
+
+# "auto" caches responses only with a shared backend (see above), "on" or "off"
+ANALYZER_RESPONSE_CACHE = {
+    '1': True, 'true': True, 'yes': True, 'on': True,
+    '0': False, 'false': False, 'no': False, 'off': False,
+}.get(os.environ.get('ANALYZER_RESPONSE_CACHE', 'auto').lower(), 'auto')
+
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache')
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION') or (
+    os.path.join(tempfile.gettempdir(), 'string-analyzer-cache')
+    if CACHE_BACKEND.endswith('.FileBasedCache') else 'string-analyzer'
+)
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        # Also bounds how long entries orphaned by a write linger on disk
+        'TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 300)),
+        # Redis and Memcached evict on their own; their OPTIONS go to the client
+        'OPTIONS': {} if CACHE_BACKEND.rsplit('.', 2)[-2] in ('redis', 'memcached') else {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 10000)),
+        },
     }
 }
 
 
+# Django REST Framework
+# https://www.django-rest-framework.org/api-guide/settings/
+# orjson-backed JSON (analyzer/renderers.py, analyzer/parsers.py); output is
+# byte-identical to DRF's JSONRenderer and falls back to it without orjson.
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'analyzer.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'analyzer.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
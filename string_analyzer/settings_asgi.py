@@ -0,0 +1,12 @@
+"""
+Settings for the ASGI entry point (string_analyzer/asgi.py).
+
+Same as string_analyzer.settings, except that the analyzer routes are served
+by the async views (string_analyzer/async_urls.py). A settings module rather
+than an environment variable, so processes started from a worker don't
+inherit the async URLconf.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'string_analyzer.async_urls'
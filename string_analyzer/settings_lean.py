@@ -0,0 +1,58 @@
+"""
+Lean API settings profile: the stateless JSON API and nothing else.
+
+Same as string_analyzer.settings (every ANALYZER_* and SQLite option still
+applies) without the admin, auth, sessions, messages and staticfiles apps,
+their middleware, templates or the browsable API, so workers import and
+run less per boot and per request. Use it with:
+
+    DJANGO_SETTINGS_MODULE=string_analyzer.settings_lean gunicorn string_analyzer.wsgi --preload
+
+Requests are not authenticated (request.user is None), only JSON and
+NDJSON request bodies are parsed, database connections are kept open
+between requests and the admin is not available.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+
+INSTALLED_APPS = [
+    'analyzer',
+]
+
+MIDDLEWARE = [
+    'analyzer.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+# The analyzer routes alone; the project URLconfs also mount the admin
+ROOT_URLCONF = 'analyzer.urls'
+
+# Keep each worker thread's SQLite connection open across requests instead of
+# reconnecting (and re-running the PRAGMAs) every time; preloaded masters close
+# theirs before forking (analyzer/warmup.py)
+DATABASES = {
+    'default': {**DATABASES['default'], 'CONN_MAX_AGE': None},
+}
+
+TEMPLATES = []
+
+AUTH_PASSWORD_VALIDATORS = []
+
+# Messages are English only; skips loading translation catalogs
+USE_I18N = False
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'analyzer.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'analyzer.parsers.FastJSONParser',
+    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.AllowAny',
+    ],
+    'UNAUTHENTICATED_USER': None,
+}
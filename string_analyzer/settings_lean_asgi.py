@@ -0,0 +1,10 @@
+"""
+The lean API profile (string_analyzer.settings_lean) served by the async views.
+
+    DJANGO_SETTINGS_MODULE=string_analyzer.settings_lean_asgi uvicorn string_analyzer.asgi:application
+"""
+
+from .settings_lean import *  # noqa: F401,F403
+
+# The analyzer's async routes alone, without the admin
+ROOT_URLCONF = 'analyzer.async_urls'
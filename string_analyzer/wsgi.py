@@ -14,3 +14,14 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'string_analyzer.settings')
 
 application = get_wsgi_application()
+
+# gunicorn warms each worker through gunicorn.conf.py's hooks. Other servers
+# opt in, so tooling and runserver's autoreloader importing this module don't
+# send a request or start processes.
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, "ANALYZER_WARM_UP", False):
+    from analyzer.warmup import prepare_worker, warm_up
+
+    warm_up(application)
+    prepare_worker()